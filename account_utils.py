@@ -0,0 +1,113 @@
+"""Account deletion.
+
+All of a user's rows are removed with set-based DELETEs in dependency order
+(task_tag -> task -> archived tasks -> tag -> budget -> summaries, history
+archives, caps and category spend -> sync tombstones -> user) instead of loading ORM collections.
+Large accounts are purged in chunks, committing after each chunk, by the
+background scheduler so the HTTP request and every transaction stay short.
+"""
+from sqlalchemy import func, select
+
+
+def count_user_rows(db, Task, Budget, user_id):
+    """Number of task + budget rows owned by a user."""
+    tasks = db.session.execute(select(func.count()).select_from(Task).where(Task.user_id == user_id)).scalar()
+    budgets = db.session.execute(select(func.count()).select_from(Budget).where(Budget.user_id == user_id)).scalar()
+    return (tasks or 0) + (budgets or 0)
+
+
+def _unlink_series(db, table, user_id):
+    """Clear occurrence -> series master links so chunks can be deleted in any order."""
+    db.session.execute(
+        table.update()
+        .where(table.c.user_id == user_id, table.c.series_id.isnot(None))
+        .values(series_id=None)
+    )
+
+
+def _delete_tasks(db, Task, task_tag, user_id, chunk_size):
+    task_table = Task.__table__
+    if not chunk_size:
+        owned = select(Task.id).where(Task.user_id == user_id)
+        db.session.execute(task_tag.delete().where(task_tag.c.task_id.in_(owned)))
+        db.session.execute(task_table.delete().where(task_table.c.user_id == user_id))
+        return
+
+    _unlink_series(db, task_table, user_id)
+    while True:
+        ids = db.session.execute(select(Task.id).where(Task.user_id == user_id).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        db.session.execute(task_tag.delete().where(task_tag.c.task_id.in_(ids)))
+        db.session.execute(task_table.delete().where(task_table.c.id.in_(ids)))
+        db.session.commit()
+
+
+def _delete_budgets(db, Budget, user_id, chunk_size):
+    budget_table = Budget.__table__
+    if not chunk_size:
+        db.session.execute(budget_table.delete().where(budget_table.c.user_id == user_id))
+        return
+
+    _unlink_series(db, budget_table, user_id)
+    while True:
+        ids = db.session.execute(select(Budget.id).where(Budget.user_id == user_id).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        db.session.execute(budget_table.delete().where(budget_table.c.id.in_(ids)))
+        db.session.commit()
+
+
+def purge_user(db, User, Task, Budget, Tag, task_tag, user_id, chunk_size=None):
+    """Delete a user and everything they own.
+
+    Without ``chunk_size`` everything happens in the caller's transaction
+    (the caller commits). With it, each chunk is committed separately.
+    """
+    _delete_tasks(db, Task, task_tag, user_id, chunk_size)
+    archived, archived_links = db.metadata.tables["archived_task"], db.metadata.tables["archived_task_tag"]
+    db.session.execute(archived_links.delete().where(
+        archived_links.c.task_id.in_(select(archived.c.id).where(archived.c.user_id == user_id))
+    ))
+    db.session.execute(archived.delete().where(archived.c.user_id == user_id))
+    tag_table = Tag.__table__
+    db.session.execute(tag_table.delete().where(tag_table.c.user_id == user_id))
+    _delete_budgets(db, Budget, user_id, chunk_size)
+    for name in ("budget_summary", "budget_history_archive", "budget_cap", "category_spend"):
+        table = db.metadata.tables[name]
+        db.session.execute(table.delete().where(table.c.user_id == user_id))
+    tombstones = db.metadata.tables["sync_tombstone"]
+    db.session.execute(tombstones.delete().where(tombstones.c.user_id == user_id))
+    user_table = User.__table__
+    db.session.execute(user_table.delete().where(user_table.c.id == user_id))
+    if chunk_size:
+        db.session.commit()
+
+
+def mark_for_deletion(user):
+    """Disable an account now and free its email; data is purged in the background."""
+    user.pending_deletion = True
+    user.email = f"deleted+{user.id}@deleted.invalid"
+    user.verification_token = None
+    user.reset_token = None
+    user.notifications_enabled = False
+
+
+def purge_pending_accounts(app, db, User, Task, Budget, Tag, task_tag, chunk_size):
+    """Scheduler job: finish deleting every account marked for deletion."""
+    with app.app_context():
+        purged = 0
+        user_ids = db.session.execute(select(User.id).where(User.pending_deletion.is_(True))).scalars().all()
+        for user_id in user_ids:
+            try:
+                purge_user(db, User, Task, Budget, Tag, task_tag, user_id, chunk_size=chunk_size)
+                purged += 1
+            except Exception as e:
+                print(f"Error purging account {user_id}: {e}")
+                import traceback
+                traceback.print_exc()
+                db.session.rollback()
+
+        if purged:
+            print(f"🗑️ Purged {purged} deleted account(s)")
+        return purged
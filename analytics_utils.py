@@ -0,0 +1,212 @@
+"""Budget analytics over a user's whole ledger, vectorised with NumPy.
+
+A user's transactions are loaded once as columnar arrays (day, category
+code, income flag, amount converted to the user's currency at that day's
+rate). Period series, per-category rolling averages, month-over-month
+deltas and the current month's spend forecast are then computed with
+``np.bincount`` and cumulative sums, never with per-row Python loops.
+"""
+import calendar
+
+import numpy as np
+
+
+class Ledger:
+    """Columnar view of one user's transactions, sorted by date."""
+
+    __slots__ = ("days", "category_codes", "categories", "is_income", "amounts", "transactions")
+
+    def __init__(self, days, category_codes, categories, is_income, amounts, transactions=None):
+        self.days = days                      # datetime64[D]
+        self.category_codes = category_codes  # int index into categories
+        self.categories = categories          # list of category names
+        self.is_income = is_income            # bool
+        self.amounts = amounts                # float64, in the target currency
+        # transactions the rows stand for (a compacted summary row is several)
+        self.transactions = len(amounts) if transactions is None else transactions
+
+    def __len__(self):
+        return len(self.amounts)
+
+
+def load_ledger(session, Budget, user_id, to_currency, convert, extra=()):
+    """Load a user's transactions as a Ledger.
+
+    ``convert(amounts, currencies, days)`` converts whole columns into
+    ``to_currency`` at each transaction's as-of rate. ``extra`` rows
+    (date, category, type, amount, currency), e.g. virtual occurrences of
+    recurring transactions, are merged in; an optional sixth column is the
+    number of transactions the row stands for (compacted monthly summaries).
+    """
+    rows = (
+        session.query(Budget.date, Budget.category, Budget.type, Budget.amount, Budget.currency)
+        .filter(Budget.user_id == user_id, Budget.date.isnot(None))
+        .order_by(Budget.date)
+        .all()
+    )
+    transactions = len(rows) + sum(r[5] if len(r) > 5 else 1 for r in extra)
+    if extra:
+        rows = sorted([*rows, *(r[:5] for r in extra)], key=lambda r: r[0])
+    if not rows:
+        empty = np.array([], dtype=np.int64)
+        return Ledger(empty.astype("datetime64[D]"), empty, [], empty.astype(bool), empty.astype(np.float64))
+
+    dates, categories, types, amounts, currencies = zip(*rows)
+    days = np.array(dates, dtype="datetime64[s]").astype("datetime64[D]")
+    names, codes = np.unique(np.array(categories, dtype=object), return_inverse=True)
+
+    return Ledger(
+        days,
+        codes.astype(np.int64),
+        [str(n) for n in names],
+        np.array(types, dtype=object) == "income",
+        convert(amounts, [c or to_currency for c in currencies], days),
+        transactions,
+    )
+
+
+def _json_list(values):
+    """Round to cents and turn NaN into None for JSON."""
+    return [None if v != v else round(v, 2) for v in np.asarray(values, dtype=np.float64).tolist()]
+
+
+def _month_axis(ledger, today):
+    """(month index per row, first month, number of months up to today's month)."""
+    months = ledger.days.astype("datetime64[M]")
+    current = np.datetime64(today, "M")
+    first = months.min() if len(ledger) else current
+    last = max(months.max(), current) if len(ledger) else current
+    index = (months - first).astype(np.int64)
+    return index, first, int((last - first).astype(np.int64)) + 1
+
+
+def _week_axis(ledger, today):
+    """Like _month_axis, for Monday-based weeks (1970-01-01 was a Thursday)."""
+    weeks = (ledger.days.astype(np.int64) + 3) // 7
+    current = (np.datetime64(today, "D").astype(np.int64) + 3) // 7
+    first = weeks.min() if len(ledger) else current
+    last = max(int(weeks.max()), int(current)) if len(ledger) else current
+    return weeks - first, first, int(last - first) + 1
+
+
+def period_series(ledger, today, period="month"):
+    """Income, expense and net per month (``YYYY-MM``) or week (Monday date)."""
+    if period == "week":
+        index, first, n = _week_axis(ledger, today)
+        labels = ((np.arange(n) + first) * 7 - 3).astype("datetime64[D]").astype(str).tolist()
+    else:
+        index, first, n = _month_axis(ledger, today)
+        labels = (first + np.arange(n)).astype(str).tolist()
+
+    income = np.bincount(index, weights=np.where(ledger.is_income, ledger.amounts, 0.0), minlength=n).astype(np.float64)
+    expense = np.bincount(index, weights=np.where(ledger.is_income, 0.0, ledger.amounts), minlength=n).astype(np.float64)
+    return {"labels": labels, "income": income, "expense": expense, "net": income - expense}
+
+
+def category_trends(ledger, today, window=3):
+    """Monthly expense per category with a rolling mean and month-over-month change."""
+    index, first, n = _month_axis(ledger, today)
+    k = len(ledger.categories)
+    expense = ~ledger.is_income
+
+    # one bincount over (category, month) cells, reshaped to a k x n matrix
+    cells = ledger.category_codes[expense] * n + index[expense]
+    totals = np.bincount(cells, weights=ledger.amounts[expense], minlength=k * n).astype(np.float64).reshape(k, n)
+
+    # rolling mean over the trailing `window` months (shorter at the start)
+    csum = np.cumsum(np.pad(totals, ((0, 0), (1, 0))), axis=1)
+    hi = np.arange(1, n + 1)
+    lo = np.maximum(hi - window, 0)
+    rolling = (csum[:, hi] - csum[:, lo]) / (hi - lo)
+
+    delta = np.full_like(totals, np.nan)
+    delta[:, 1:] = np.diff(totals, axis=1)
+    previous = np.full_like(totals, np.nan)
+    previous[:, 1:] = totals[:, :-1]
+    pct = np.divide(delta * 100.0, previous, out=np.full_like(totals, np.nan), where=previous > 0)
+
+    return {
+        "months": (first + np.arange(n)).astype(str).tolist(),
+        "totals": totals,
+        "rolling": rolling,
+        "delta": delta,
+        "pct": pct,
+    }
+
+
+def forecast_month(ledger, today, monthly_expense, window=3):
+    """Project this month's total spend.
+
+    The month-to-date run rate is blended with the mean of the previous
+    ``window`` months, trusting the run rate more as the month progresses.
+    """
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    elapsed = today.day
+    current = np.datetime64(today, "M")
+    today_day = np.datetime64(today, "D")
+
+    mask = (~ledger.is_income) & (ledger.days.astype("datetime64[M]") == current) & (ledger.days <= today_day)
+    spent = float(ledger.amounts[mask].sum())
+    run_rate = spent / elapsed * days_in_month
+
+    history = monthly_expense[:-1][-window:]
+    trailing = float(history.mean()) if len(history) else None
+    weight = elapsed / days_in_month
+    projected = run_rate if trailing is None else weight * run_rate + (1 - weight) * trailing
+
+    return {
+        "month": str(current),
+        "spent": round(spent, 2),
+        "projected": round(max(projected, spent), 2),
+        "run_rate": round(run_rate, 2),
+        "trailing_average": None if trailing is None else round(trailing, 2),
+        "days_elapsed": elapsed,
+        "days_in_month": days_in_month,
+    }
+
+
+def budget_analytics(ledger, today, period="month", window=3, months=24):
+    """Everything the analytics API returns, limited to the last ``months`` months (0 = all)."""
+    series = period_series(ledger, today, period)
+    monthly = series if period == "month" else period_series(ledger, today, "month")
+    trends = category_trends(ledger, today, window)
+    forecast = forecast_month(ledger, today, monthly["expense"], window)
+
+    if months:
+        keep = slice(-months, None)
+        if period == "week":
+            # roughly the same time span in weeks
+            series_keep = slice(-(months * 52 // 12 + 1), None)
+        else:
+            series_keep = keep
+    else:
+        keep = series_keep = slice(None)
+
+    categories = []
+    for code, name in enumerate(ledger.categories):
+        totals = trends["totals"][code, keep]
+        if not totals.any():
+            continue
+        categories.append({
+            "name": name,
+            "total": round(float(totals.sum()), 2),
+            "monthly": _json_list(totals),
+            "rolling_average": _json_list(trends["rolling"][code, keep]),
+            "mom_delta": _json_list(trends["delta"][code, keep]),
+            "mom_pct": _json_list(trends["pct"][code, keep]),
+        })
+    categories.sort(key=lambda c: c["total"], reverse=True)
+
+    return {
+        "period": period,
+        "window": window,
+        "transactions": ledger.transactions,
+        "series": {
+            "labels": series["labels"][series_keep],
+            "income": _json_list(series["income"][series_keep]),
+            "expense": _json_list(series["expense"][series_keep]),
+            "net": _json_list(series["net"][series_keep]),
+        },
+        "categories": {"months": trends["months"][keep], "items": categories},
+        "forecast": forecast,
+    }
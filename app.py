@@ -1,6 +1,6 @@
 from flask import (
     Flask, render_template, redirect, url_for,
-    flash, request, jsonify
+    flash, request, jsonify, make_response, stream_with_context
 )
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import (
@@ -8,18 +8,22 @@ from flask_login import (
     logout_user, current_user
 )
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.datastructures import MultiDict
 
 from config import Config
 from forms import LoginForm, RegisterForm, TaskForm, BudgetForm
 
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import case, func, or_
+from sqlalchemy.exc import OperationalError
+import click
+import heapq
 import math
 import requests
-import time
 import csv
 import os
 from io import StringIO, BytesIO
+from urllib.parse import parse_qsl, urlsplit
 from openpyxl import Workbook
 
 # -------------------------------------------------
@@ -36,47 +40,17 @@ def now_ist_naive():
 # -------------------------------------------------
 # Currency Helpers
 # -------------------------------------------------
-_rates_cache = {"ts": 0, "rates": {}, "base": None}
-
-
-def get_conversion_rates(base="USD"):
-    """Cached conversion rates for up to 10 minutes."""
-    now = time.time()
-
-    if _rates_cache.get("ts", 0) + 600 > now and _rates_cache.get("base") == base:
-        return _rates_cache["rates"]
-
-    try:
-        res = requests.get(
-            f"https://api.exchangerate.host/latest?base={base}",
-            timeout=5
-        )
-        res.raise_for_status()
-        data = res.json()
-        rates = data.get("rates", {})
-        _rates_cache.update({"ts": now, "rates": rates, "base": base})
-        return rates
-    except Exception:
-        # fallback
-        return {"USD": 1.0, "INR": 1.0}
-
-
-def convert_amount(amount, from_cur, to_cur, rates):
-    """Convert between currencies; fallback returns original amount."""
-    try:
-        if from_cur == to_cur:
-            return float(amount)
-
-        rf = rates.get(from_cur)
-        rt = rates.get(to_cur)
-
-        if rf and rt:
-            amount_usd = float(amount) / float(rf)
-            return amount_usd * float(rt)
-    except Exception:
-        pass
-
-    return float(amount)
+def fetch_latest_rates(base="USD"):
+    """Latest provider rates (units per ``base``); raises if none are returned."""
+    res = requests.get(
+        f"https://api.exchangerate.host/latest?base={base}",
+        timeout=5
+    )
+    res.raise_for_status()
+    rates = res.json().get("rates") or {}
+    if not rates:
+        raise ValueError("provider returned no rates")
+    return rates
 
 
 # -------------------------------------------------
@@ -85,7 +59,17 @@ def convert_amount(amount, from_cur, to_cur, rates):
 app = Flask(__name__)
 app.config.from_object(Config)
 
-db = SQLAlchemy(app)
+# Reads of @read_only views can go to the replica bind (see replica_utils)
+from replica_utils import RoutingSession, read_only, register_sticky_writes, sync_sqlite_replica, REPLICA_BIND
+db = SQLAlchemy(app, session_options={"class_": RoutingSession})
+register_sticky_writes(app, db)
+
+# WAL, pragmas and a writer queue for SQLite installs (see sqlite_utils)
+from sqlite_utils import PROFILES as SQLITE_PROFILES, register_sqlite_profile, sqlite_maintenance, is_busy_error
+if app.config['SQLITE_PROFILE'] not in SQLITE_PROFILES:
+    raise RuntimeError(f"SQLITE_PROFILE must be one of {', '.join(SQLITE_PROFILES)}")
+with app.app_context():
+    sqlite_writer_queue = register_sqlite_profile(app, db)
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 
@@ -110,12 +94,55 @@ limiter = Limiter(
 
 from models import create_models
 from email_utils import generate_token, confirm_token, send_verification_email, send_password_reset_email
+from cache_utils import create_cache, make_cache_key, get_or_compute, register_version_listeners, bump_data_version
+from schema_utils import upgrade_schema
+from etag_utils import make_etag, csrf_epoch, csrf_last_modified, not_modified, add_validators
+from assets_utils import load_manifest, asset_url, send_precompressed
+from read_models import TaskView, task_views, archived_task_views, summary_rows, budget_rows, budget_amounts, occurrence_views, budget_occurrences
+from recurrence_utils import normalize_rule, preset_name, from_stamp, exdates, add_exdate, merge_exdates, is_occurrence
+from ical_utils import new_calendar_token, feed_chunks, feed_window
+from sync_utils import register_sync_listeners, record_tombstones, changes_since, prune_tombstones
+from search_utils import init_search, parse_terms, search_tasks, search_transactions
+from filter_utils import TYPES as BUDGET_TYPES, BudgetFilter
+from account_utils import count_user_rows, purge_user, mark_for_deletion, purge_pending_accounts
+from tag_utils import init_tags, gc_unused_tags, suggest_tags_for
+from analytics_utils import load_ledger, budget_analytics
+from fx_utils import rate_book, import_rates, read_rates_csv, refresh_rates
+from partition_utils import (
+    init_budget_partitions, migrate_budget_partitions, ensure_budget_partitions, archive_budget_partitions,
+)
+from bitmap_utils import TagBitmapIndex, load_user_tags, parse_tag_filter, tags_match, register_tag_index_listeners
+from cap_utils import (
+    register_cap_listeners, record_spend, spend_rows, raised_alerts, evaluate_caps, cap_overview, rebuild_spend,
+    send_cap_alerts,
+)
+from archive_utils import archive_done_tasks, restore_tasks
+from compaction_utils import (
+    YEAR_CHOICES as COMPACT_YEAR_CHOICES, compact_budget_history, user_archives, restore_archive,
+)
+
+(User, Task, Budget, Tag, FxRate, SyncTombstone, BudgetCap, CategorySpend, ArchivedTask,
+ BudgetSummary, BudgetArchive) = create_models(db)
+task_tag = db.metadata.tables["task_tag"]
+archived_task_tag = db.metadata.tables["archived_task_tag"]
 
-User, Task, Budget, Tag = create_models(db)
+# Per-user summary cache, invalidated through User.data_version
+cache = create_cache(app.config)
+register_version_listeners(db, User, Task, Budget, BudgetCap)
+
+# updated_at for retagged tasks and tombstones for deletes (delta sync)
+register_sync_listeners(db, Task, Budget, SyncTombstone)
+
+# Per-user tag -> task bitmaps for the task list tag filter
+tag_index = TagBitmapIndex(app.config['TAG_INDEX_MAX_BYTES'])
+register_tag_index_listeners(db, tag_index, Task)
+
+# Running monthly spend per category, checked against the user's caps on write
+register_cap_listeners(db, User, Budget, BudgetCap, CategorySpend, FxRate)
 
 # Initialize Automatic Notification Scheduler
 from apscheduler.schedulers.background import BackgroundScheduler
-from notification_utils import check_and_send_notifications
+from notification_utils import check_and_send_notifications, NOTIFICATION_MODES
 
 scheduler = BackgroundScheduler()
 scheduler.add_job(
@@ -126,6 +153,40 @@ scheduler.add_job(
     name='Check and send task notifications',
     replace_existing=True
 )
+
+
+def purge_deleted_accounts():
+    return purge_pending_accounts(
+        app, db, User, Task, Budget, Tag, task_tag, app.config['ACCOUNT_PURGE_CHUNK_SIZE']
+    )
+
+
+# Finishes background account deletions, including ones interrupted by a restart
+scheduler.add_job(
+    func=purge_deleted_accounts,
+    trigger="interval",
+    minutes=app.config['ACCOUNT_PURGE_INTERVAL_MINUTES'],
+    id='account_purge',
+    name='Purge deleted accounts',
+    replace_existing=True
+)
+# Emails cap alerts raised by transaction writes (kept out of the request)
+scheduler.add_job(
+    func=lambda: send_cap_alerts(app, db, mail, User, BudgetCap),
+    trigger="interval",
+    minutes=app.config['BUDGET_ALERT_INTERVAL_MINUTES'],
+    id='budget_alerts',
+    name='Send budget cap alerts',
+    replace_existing=True
+)
+scheduler.add_job(
+    func=lambda: gc_unused_tags(app, db, Tag, task_tag, archived_task_tag),
+    trigger="interval",
+    hours=app.config['TAG_GC_INTERVAL_HOURS'],
+    id='tag_gc',
+    name='Prune unused tags',
+    replace_existing=True
+)
 scheduler.start()
 
 print(f"🔔 Notification scheduler started - checking every {app.config['NOTIFICATION_CHECK_INTERVAL_HOURS']} hour(s)")
@@ -137,19 +198,231 @@ atexit.register(lambda: scheduler.shutdown())
 # Auto-initialize database tables on first request (for free tier deployment)
 with app.app_context():
     db.create_all()
+    upgrade_schema(db)
+    init_tags(db, Task, Tag, task_tag)
+    init_budget_partitions(db, app.config['BUDGET_PARTITION_MONTHS_AHEAD'])
+    init_search(db)
+
+    # Offline FX seed for a fresh fx_rate table
+    seed_csv = app.config['FX_SEED_CSV']
+    if seed_csv and not os.path.exists(seed_csv):
+        print(f"Error loading FX rates: FX_SEED_CSV {seed_csv} does not exist")
+    elif seed_csv and not db.session.query(FxRate.id).first():
+        seeded = import_rates(db.session, FxRate, read_rates_csv(seed_csv), "csv")
+        db.session.commit()
+        print(f"💱 Loaded {seeded} FX rate(s) from {seed_csv}")
+
+    # Running category totals for transactions written before caps existed
+    if not db.session.query(CategorySpend.user_id).first() and db.session.query(Budget.id).first():
+        rebuilt = rebuild_spend(db.session, User, Budget, BudgetSummary, CategorySpend, FxRate)
+        db.session.commit()
+        print(f"💸 Built monthly category spend for {rebuilt} user(s)")
+
+# Stores today's provider rates; first run once the tables exist
+scheduler.add_job(
+    func=lambda: refresh_rates(app, db, FxRate, fetch_latest_rates),
+    trigger="interval",
+    hours=app.config['FX_REFRESH_INTERVAL_HOURS'],
+    next_run_time=datetime.now(),
+    id='fx_refresh',
+    name='Refresh FX rates',
+    replace_existing=True
+)
+
+
+def archive_tasks_job():
+    return archive_done_tasks(
+        app, db, User, Task, ArchivedTask, task_tag, archived_task_tag, SyncTombstone,
+        app.config['TASK_ARCHIVE_AFTER_DAYS'], app.config['TASK_ARCHIVE_BATCH_SIZE'],
+    )
+
+
+# Moves long-completed tasks out of the task table (TASK_ARCHIVE_AFTER_DAYS=0 disables)
+scheduler.add_job(
+    func=archive_tasks_job,
+    trigger="interval",
+    hours=app.config['TASK_ARCHIVE_INTERVAL_HOURS'],
+    id='task_archive',
+    name='Archive completed tasks',
+    replace_existing=True
+)
+
+
+# Rolls opted-in users' old transactions into monthly summaries (see compaction_utils)
+scheduler.add_job(
+    func=lambda: compact_budget_history(app, db, User, Budget, BudgetSummary, BudgetArchive, SyncTombstone),
+    trigger="interval",
+    hours=app.config['BUDGET_COMPACT_INTERVAL_HOURS'],
+    id='budget_compaction',
+    name='Compact old budget history',
+    replace_existing=True
+)
+
+
+# Forgets deletes that sync clients have had SYNC_TOMBSTONE_DAYS to pick up
+scheduler.add_job(
+    func=lambda: prune_tombstones(app, db, SyncTombstone, app.config['SYNC_TOMBSTONE_DAYS']),
+    trigger="interval",
+    hours=24,
+    id='sync_tombstone_prune',
+    name='Prune sync tombstones',
+    replace_existing=True
+)
+
+
+# Checkpoints the WAL and refreshes planner statistics (SQLite performance profile)
+if sqlite_writer_queue is not None:
+    scheduler.add_job(
+        func=lambda: sqlite_maintenance(app, db),
+        trigger="interval",
+        minutes=app.config['SQLITE_MAINTENANCE_MINUTES'],
+        id='sqlite_maintenance',
+        name='SQLite WAL checkpoint and optimize',
+        replace_existing=True
+    )
+
+
+# Creates upcoming monthly budget partitions (PostgreSQL only)
+scheduler.add_job(
+    func=lambda: ensure_budget_partitions(app, db, app.config['BUDGET_PARTITION_MONTHS_AHEAD']),
+    trigger="interval",
+    hours=app.config['BUDGET_PARTITION_INTERVAL_HOURS'],
+    id='budget_partitions',
+    name='Create budget partitions',
+    replace_existing=True
+)
+
+
+@app.cli.command("budget-partitions")
+def budget_partitions():
+    """Create upcoming monthly budget partitions now (PostgreSQL)."""
+    if not ensure_budget_partitions(app, db, app.config['BUDGET_PARTITION_MONTHS_AHEAD']):
+        print("🗂️ Budget partitions are up to date")
+
+
+@app.cli.command("budget-partition-migrate")
+def budget_partition_migrate():
+    """Convert the budget table to monthly partitions (PostgreSQL; rewrites the table)."""
+    count = migrate_budget_partitions(db, Budget, app.config['BUDGET_PARTITION_MONTHS_AHEAD'])
+    if count is None:
+        print("🗂️ Budget table is already partitioned (or not on PostgreSQL)")
+    else:
+        print(f"🗂️ Partitioned budget table by month ({count} partition(s))")
+
+
+@app.cli.command("budget-archive")
+@click.argument("before")
+def budget_archive(before):
+    """Detach budget partitions of months before BEFORE (YYYY-MM) into the archive schema."""
+    try:
+        month = datetime.strptime(before, "%Y-%m").date()
+    except ValueError:
+        raise click.ClickException("BEFORE must be YYYY-MM.")
+    archived = archive_budget_partitions(db, month)
+    print(f"🗄️ Archived {len(archived)} budget partition(s): {', '.join(archived) or '-'}")
+
+
+@app.cli.command("fx-import")
+@click.argument("path")
+def fx_import(path):
+    """Bulk-load historical FX rates from a date,currency,rate CSV."""
+    inserted = import_rates(db.session, FxRate, read_rates_csv(path), "csv")
+    db.session.commit()
+    print(f"💱 Imported {inserted} new FX rate(s) from {path}")
+
+
+@app.cli.command("replica-sync")
+def replica_sync():
+    """Copy a SQLite primary onto the SQLite replica bind (local testing)."""
+    replica_url = app.config['SQLALCHEMY_BINDS'].get(REPLICA_BIND)
+    if not replica_url:
+        raise click.ClickException("REPLICA_DATABASE_URL is not set.")
+    try:
+        sync_sqlite_replica(app.config['SQLALCHEMY_DATABASE_URI'], replica_url)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"🔁 Copied primary database to replica {replica_url}")
+
+
+@app.cli.command("sqlite-maintenance")
+def sqlite_maintenance_command():
+    """Checkpoint the SQLite WAL and run PRAGMA optimize now."""
+    results = sqlite_maintenance(app, db)
+    if not results:
+        print("🧹 No SQLite database to maintain")
+    for bind, (busy, log, checkpointed) in results.items():
+        print(f"🧹 {bind}: checkpointed {checkpointed}/{log} WAL frame(s){' (busy)' if busy else ''}")
+
+
+@app.cli.command("tasks-archive")
+def tasks_archive():
+    """Archive tasks completed more than TASK_ARCHIVE_AFTER_DAYS ago now."""
+    if not app.config['TASK_ARCHIVE_AFTER_DAYS']:
+        raise click.ClickException("Task archival is disabled (TASK_ARCHIVE_AFTER_DAYS=0).")
+    if not archive_tasks_job():
+        print("📦 No completed tasks to archive")
+
+
+@app.cli.command("budget-compact")
+def budget_compact():
+    """Compact old transactions of users who opted in now."""
+    if not compact_budget_history(app, db, User, Budget, BudgetSummary, BudgetArchive, SyncTombstone):
+        print("🗜️ No transactions to compact")
+
+
+@app.cli.command("budget-restore")
+@click.argument("archive")
+def budget_restore(archive):
+    """Restore the transactions of one compaction archive (budget_history_archive.name)."""
+    restored = restore_archive(db.session, User, Budget, BudgetSummary, BudgetArchive, archive)
+    if restored is None:
+        raise click.ClickException(f"No archive {archive}.")
+    db.session.commit()
+    print(f"🗜️ Restored {restored} transaction(s) from {archive}")
+
+
+@app.cli.command("caps-rebuild")
+def caps_rebuild():
+    """Recompute monthly category spend from the stored transactions (e.g. after fx-import)."""
+    rebuilt = rebuild_spend(db.session, User, Budget, BudgetSummary, CategorySpend, FxRate)
+    db.session.commit()
+    print(f"💸 Rebuilt monthly category spend for {rebuilt} user(s)")
+
+
+@app.cli.command("fx-refresh")
+def fx_refresh():
+    """Fetch and store today's provider FX rates."""
+    refresh_rates(app, db, FxRate, fetch_latest_rates)
+
 
 @login_manager.user_loader
 def load_user(user_id):
     try:
-        return db.session.get(User, int(user_id))
+        user = db.session.get(User, int(user_id))
     except Exception:
         return None
+    if user is None or user.pending_deletion:
+        return None
+    return user
 
 
 # Make `now_ist` available in templates if needed
 @app.context_processor
 def global_vars():
-    return dict(now_ist=now_ist_naive)
+    return dict(now_ist=now_ist_naive, asset_url=asset_url)
+
+
+# -------------------------------------------------
+# STATIC ASSETS (fingerprinted build output)
+# -------------------------------------------------
+ASSETS_DIR = os.path.join(app.static_folder, "dist")
+load_manifest(ASSETS_DIR)
+
+
+@app.route("/assets/<path:filename>")
+@limiter.exempt
+def serve_asset(filename):
+    return send_precompressed(ASSETS_DIR, filename)
 
 
 # -------------------------------------------------
@@ -260,13 +533,17 @@ def notification_settings():
     if request.method == "POST":
         enabled = request.form.get("notifications_enabled") == "on"
         hours = int(request.form.get("notification_hours", 24))
+        mode = request.form.get("notification_mode", "digest")
         
         # Validate hours
         if hours < 1 or hours > 168:  # 1 hour to 1 week
             flash("Notification time must be between 1 and 168 hours.", "danger")
+        elif mode not in NOTIFICATION_MODES:
+            flash("Invalid notification delivery mode.", "danger")
         else:
             current_user.notifications_enabled = enabled
             current_user.notification_hours = hours
+            current_user.notification_mode = mode
             db.session.commit()
             flash("Notification settings updated successfully!", "success")
         
@@ -468,8 +745,69 @@ def settings():
             new_currency = request.form.get("currency")
             if new_currency:
                 current_user.currency = new_currency
+                # running spend is kept in the user's currency; caps keep their amounts
+                db.session.flush()
+                rebuild_spend(db.session, User, Budget, BudgetSummary, CategorySpend, FxRate, [current_user.id])
+                _reevaluate_caps(BudgetCap.query.filter_by(user_id=current_user.id).all())
                 db.session.commit()
                 flash("Currency updated successfully!", "success")
+                _flash_cap_alerts()
+            return redirect(url_for("settings"))
+        
+        elif action == "cap_set":
+            category = (request.form.get("category") or "").strip()
+            try:
+                amount = round(float(request.form.get("amount", "")), 2)
+            except ValueError:
+                amount = None
+            if not category or len(category) > 100 or amount is None or not math.isfinite(amount) or amount <= 0:
+                flash("Enter a category and a positive monthly amount.", "error")
+                return redirect(url_for("settings"))
+            cap = BudgetCap.query.filter_by(user_id=current_user.id, category=category).first()
+            if cap is None:
+                cap = BudgetCap(user_id=current_user.id, category=category)
+                db.session.add(cap)
+            cap.amount = amount
+            _reevaluate_caps([cap])
+            db.session.commit()
+            flash(f"Monthly cap for {category} set to {amount:.2f} {current_user.currency or 'USD'}.", "success")
+            _flash_cap_alerts()
+            return redirect(url_for("settings"))
+        
+        elif action == "cap_delete":
+            cap = BudgetCap.query.filter_by(id=request.form.get("cap_id", type=int), user_id=current_user.id).first()
+            if cap is not None:
+                db.session.delete(cap)
+                db.session.commit()
+                flash(f"Monthly cap for {cap.category} removed.", "info")
+            return redirect(url_for("settings"))
+        
+        elif action == "compact_history":
+            years = request.form.get("years", type=int)
+            current_user.budget_compact_years = years if years in COMPACT_YEAR_CHOICES else None
+            db.session.commit()
+            if current_user.budget_compact_years:
+                flash(f"Transactions older than {years} year(s) will be compacted into monthly totals.", "success")
+            else:
+                flash("History compaction turned off.", "info")
+            return redirect(url_for("settings"))
+        
+        elif action == "restore_history":
+            # restoring turns compaction off, or the next run would undo it
+            current_user.budget_compact_years = None
+            restored = sum(
+                restore_archive(db.session, User, Budget, BudgetSummary, BudgetArchive, name)
+                for name in user_archives(db.session, BudgetArchive, current_user.id)
+            )
+            db.session.commit()
+            flash(f"Restored {restored} compacted transaction(s).", "success")
+            return redirect(url_for("settings"))
+        
+        elif action in ("calendar_enable", "calendar_disable"):
+            # a new token also revokes the previous feed URL
+            current_user.calendar_token = new_calendar_token() if action == "calendar_enable" else None
+            db.session.commit()
+            flash("Calendar link updated." if current_user.calendar_token else "Calendar feed turned off.", "success")
             return redirect(url_for("settings"))
         
         elif action == "delete_account":
@@ -478,29 +816,45 @@ def settings():
                 flash("Incorrect password. Account not deleted.", "error")
                 return redirect(url_for("settings"))
             
-            # Delete all user data - delete in correct order due to foreign keys
-            # First get all user tasks
-            user_tasks = Task.query.filter_by(user_id=current_user.id).all()
-            
-            # Delete task-tag associations
-            for task in user_tasks:
-                task.tags_rel = []  # Clear all tag relationships
-            
-            # Delete tasks
-            Task.query.filter_by(user_id=current_user.id).delete()
-            
-            # Delete budgets
-            Budget.query.filter_by(user_id=current_user.id).delete()
-            
-            # Delete user
-            db.session.delete(current_user)
-            db.session.commit()
+            # Set-based deletes in dependency order; huge accounts are disabled
+            # now and purged in short chunked transactions by the scheduler
+            user_id = current_user.id
+            if count_user_rows(db, Task, Budget, user_id) > app.config['ACCOUNT_PURGE_INLINE_LIMIT']:
+                mark_for_deletion(current_user)
+                db.session.commit()
+                scheduler.add_job(
+                    func=purge_deleted_accounts,
+                    trigger="date",
+                    id=f'account_purge_{user_id}',
+                    replace_existing=True
+                )
+            else:
+                purge_user(db, User, Task, Budget, Tag, task_tag, user_id)
+                db.session.commit()
             
             logout_user()
             flash("Your account has been deleted successfully.", "success")
             return redirect(url_for("login"))
     
-    return render_template("settings.html")
+    caps = cap_overview(db.session, User, Budget, BudgetCap, CategorySpend, FxRate, current_user.id, now_ist_naive())
+    compacted = db.session.query(func.coalesce(func.sum(BudgetSummary.count), 0)).filter(
+        BudgetSummary.user_id == current_user.id,
+    ).scalar()
+    return render_template(
+        "settings.html", caps=caps, categories=_budget_categories(),
+        compact_choices=COMPACT_YEAR_CHOICES, compacted=compacted,
+    )
+
+
+def _reevaluate_caps(caps):
+    """Check new or changed caps against this month's spend now; they alert again if still crossed."""
+    for cap in caps:
+        cap.alert_month = None
+    db.session.flush()
+    evaluate_caps(
+        db.session, User, Budget, BudgetCap, CategorySpend, FxRate,
+        {(c.user_id, c.category) for c in caps}, now_ist_naive(),
+    )
 
 
 # -------------------------------------------------
@@ -508,6 +862,7 @@ def settings():
 # -------------------------------------------------
 @app.route("/dashboard")
 @login_required
+@read_only(db)
 def dashboard():
     # ---- DATE RANGE FILTER ----
     date_range = request.args.get('date_range', 'all')
@@ -523,8 +878,31 @@ def dashboard():
     else:  # 'all'
         start_date = None
     
+    user_cur = current_user.currency or "USD"
+    rates = rate_book(db.session, FxRate)
+
+    key = make_cache_key(
+        "dashboard", current_user.id, current_user.data_version,
+        date_range, user_cur, rates.version, now.strftime("%Y-%m"),
+    )
+    summary = get_or_compute(
+        cache, key,
+        lambda: _dashboard_summary(current_user.id, start_date, now, user_cur, rates),
+        timeout=app.config['DASHBOARD_CACHE_SECONDS'],
+    )
+
+    return render_template(
+        "dashboard.html",
+        currency=user_cur,
+        date_range=date_range,
+        **summary,
+    )
+
+
+def _dashboard_summary(user_id, start_date, now, user_cur, rates):
+    """Compute dashboard numbers as plain data so they can be cached."""
     # ---- TASK STATS ----
-    tq = Task.query.filter_by(user_id=current_user.id)
+    tq = Task.query.filter_by(user_id=user_id)
     if start_date:
         tq = tq.filter(Task.deadline >= start_date)
 
@@ -534,12 +912,39 @@ def dashboard():
 
     overdue = tq.filter(Task.deadline < now, Task.status != "done").count()
 
+    # Archived tasks are all completed ones
+    aq = ArchivedTask.query.filter_by(user_id=user_id)
+    if start_date:
+        aq = aq.filter(ArchivedTask.deadline >= start_date)
+    archived = aq.count()
+    total_tasks += archived
+    completed += archived
+
     next24 = now + timedelta(hours=24)
-    due_soon = tq.filter(
+    due_soon = [dict(t._mapping) for t in tq.filter(
         Task.status != "done",
         Task.deadline >= now,
         Task.deadline <= next24,
-    ).order_by(Task.deadline.asc()).all()
+    ).order_by(Task.deadline.asc()).with_entities(
+        Task.id, Task.title, Task.description, Task.deadline,
+    )]
+
+    # Virtual occurrences of recurring tasks count as pending ones
+    window_start, window_end = _occurrence_window(now)
+    if start_date:
+        window_start = max(window_start, start_date)
+    virtual = occurrence_views(
+        Task.query.filter_by(user_id=user_id), Task, Tag, task_tag, window_start, window_end, now,
+    )
+    if virtual:
+        total_tasks += len(virtual)
+        pending += len(virtual)
+        overdue += sum(1 for t in virtual if t.is_overdue)
+        due_soon.extend(
+            {"id": t.id, "title": t.title, "description": t.description, "deadline": t.deadline}
+            for t in virtual if now <= t.deadline <= next24
+        )
+        due_soon.sort(key=lambda t: t["deadline"])
 
     task_chart_data = {
         "labels": ["Pending", "Completed", "Overdue"],
@@ -547,19 +952,21 @@ def dashboard():
     }
 
     # ---- BUDGET STATS ----
-    bq = Budget.query.filter_by(user_id=current_user.id)
+    bq = Budget.query.filter_by(user_id=user_id)
     if start_date:
         bq = bq.filter(Budget.date >= start_date)
-    bq = bq.all()
-
-    user_cur = current_user.currency or "USD"
-    rates = get_conversion_rates("USD")
+    sq = BudgetSummary.query.filter_by(user_id=user_id)
+    if start_date:
+        sq = sq.filter(BudgetSummary.month >= start_date.date())
+    bq = budget_amounts(bq, Budget) + budget_occurrences(
+        Budget.query.filter_by(user_id=user_id), Budget, start_date or datetime.min, now,
+    ) + summary_rows(sq, BudgetSummary)
 
     income = 0.0
     expense = 0.0
 
     for b in bq:
-        conv = convert_amount(b.amount, b.currency, user_cur, rates)
+        conv = rates.convert(b.amount, b.currency, user_cur, b.date)
         if b.type == "income":
             income += conv
         else:
@@ -570,8 +977,11 @@ def dashboard():
         "values": [round(income, 2), round(expense, 2)],
     }
 
-    return render_template(
-        "dashboard.html",
+    # ---- CATEGORY CAPS (this month) ----
+    caps = cap_overview(db.session, User, Budget, BudgetCap, CategorySpend, FxRate, user_id, now)
+
+    return dict(
+        caps=caps,
         total_tasks=total_tasks,
         completed_tasks=completed,
         pending_tasks=pending,
@@ -580,18 +990,186 @@ def dashboard():
         total_income=income,
         total_expense=expense,
         balance=income - expense,
-        currency=user_cur,
         task_chart_data=task_chart_data,
         finance_chart_data=finance_chart_data,
-        date_range=date_range,
     )
 
 
+# -------------------------------------------------
+# RECURRING OCCURRENCES
+# -------------------------------------------------
+def _occurrence_window(now):
+    """[start, end) within which virtual task occurrences are shown."""
+    return (
+        now - timedelta(days=app.config['TASK_OCCURRENCE_LOOKBACK_DAYS']),
+        now + timedelta(days=app.config['TASK_OCCURRENCE_HORIZON_DAYS']),
+    )
+
+
+def _resolve_occurrence(model, master, stamp, start_column):
+    """(datetime, stored row or None) for an occurrence stamp of ``master``.
+
+    The datetime is None if the stamp is not a live occurrence of the series.
+    """
+    try:
+        dt = from_stamp(stamp)
+    except ValueError:
+        return None, None
+    row = model.query.filter_by(series_id=master.id, occurrence_at=dt).first()
+    if row is None and (dt in exdates(master) or not is_occurrence(master, start_column, dt)):
+        return None, None
+    return dt, row
+
+
+def _materialize_task(master, dt):
+    """Store one occurrence of a recurring task as its own row."""
+    task = Task(
+        title=master.title,
+        description=master.description,
+        deadline=dt,
+        priority=master.priority,
+        user_id=master.user_id,
+        series_id=master.id,
+        occurrence_at=dt,
+    )
+    db.session.add(task)
+    task.tags_rel.extend(master.tags_rel)
+    return task
+
+
+def _materialize_budget(master, dt):
+    """Store one occurrence of a recurring transaction as its own row."""
+    b = Budget(
+        category=master.category,
+        amount=master.amount,
+        currency=master.currency,
+        type=master.type,
+        date=dt,
+        user_id=master.user_id,
+        series_id=master.id,
+        occurrence_at=dt,
+    )
+    db.session.add(b)
+    return b
+
+
+def _delete_series_row(model, row):
+    """Delete a task/transaction row, keeping its recurring series consistent.
+
+    A materialized occurrence becomes an exdate of its master so it does not
+    reappear as a virtual one; a deleted master's occurrences are detached.
+    """
+    if row.series_id:
+        master = db.session.get(model, row.series_id)
+        if master is not None:
+            add_exdate(master, row.occurrence_at)
+    if row.recurrence:
+        model.query.filter_by(series_id=row.id).update({model.series_id: None}, synchronize_session=False)
+    db.session.delete(row)
+
+
+def _bulk_delete_series(model, ids):
+    """Set-based counterpart of _delete_series_row, run before deleting ``ids``."""
+    children = (
+        db.session.query(model.series_id, model.occurrence_at)
+        .filter(model.id.in_(ids), model.series_id.isnot(None), model.series_id.notin_(ids))
+        .all()
+    )
+    slots = {}
+    for series_id, occurrence_at in children:
+        slots.setdefault(series_id, []).append(occurrence_at)
+    if slots:
+        masters = db.session.query(model.id, model.recurrence_exdates).filter(model.id.in_(list(slots)))
+        for master_id, text in masters.all():
+            model.query.filter(model.id == master_id).update(
+                {model.recurrence_exdates: merge_exdates(text, slots[master_id])}, synchronize_session=False,
+            )
+    model.query.filter(model.series_id.in_(ids)).update({model.series_id: None}, synchronize_session=False)
+
+
+def _set_repeat_choices(form, rule):
+    """Pre-fill the Repeat field, offering a custom stored rule as its own choice."""
+    form.recurrence.data = preset_name(rule)
+    if rule and form.recurrence.data == rule:
+        form.recurrence.choices = list(form.recurrence.choices) + [(rule, rule)]
+
+
+# -------------------------------------------------
+# ROW FRAGMENTS (AJAX MUTATIONS)
+# -------------------------------------------------
+# With ?fragment=1 an AJAX edit answers with the re-rendered row (and, for
+# transactions, the summary numbers) so the page is patched in place instead
+# of re-fetching the whole list. "html" is None when the list the user came
+# from (``next``) no longer shows the row; "moved" means its position in the
+# list may have changed, so the client reloads the list instead.
+def _wants_fragment():
+    return request.args.get('fragment') == '1'
+
+
+def _list_args(nxt):
+    """Query arguments of the list page a mutation returns to."""
+    return MultiDict(parse_qsl(urlsplit(nxt or "").query, keep_blank_values=True))
+
+
+def _task_listed(view, args, now):
+    """Whether the task list filtered by ``args`` shows ``view`` (mirrors tasks())."""
+    flt = args.get("filter", "all")
+    if flt == "pending" and view.status != "pending":
+        return False
+    if flt == "done" and view.status != "done":
+        return False
+    if flt == "overdue" and not (view.deadline < now and view.status != "done"):
+        return False
+    if args.get("priority") and view.priority != args["priority"]:
+        return False
+    groups, excluded = parse_tag_filter(args.get("tag", "").strip())
+    return tags_match(view.tags, groups, excluded)
+
+
+def _task_fragment(task, nxt, form, moved=False):
+    nxt = nxt or url_for("tasks")
+    now = now_ist_naive()
+    view = TaskView(task, [tg.name for tg in task.tags_rel], now)
+    html = None
+    if _task_listed(view, _list_args(nxt), now):
+        html = render_template("_task_card.html", t=view, form=form, list_url=nxt)
+    return jsonify({'success': True, 'redirect': nxt, 'html': html, 'moved': moved})
+
+
+def _budget_fragment(b, nxt, form, moved=False):
+    nxt = nxt or url_for("budgets")
+    now = now_ist_naive()
+    flt = BudgetFilter.from_args(_list_args(nxt))
+
+    user_cur = current_user.currency or "USD"
+    q, virtual = _filtered_budgets(flt, now)
+    summary = _cached_budget_summary(q, virtual, flt, user_cur, now)
+
+    html = None
+    if flt.matches(b):
+        html = render_template("_budget_row.html", t=b, form=form, currency=user_cur, _nxt=nxt)
+    return jsonify({
+        'success': True,
+        'redirect': nxt,
+        'html': html,
+        'moved': moved,
+        # flashes would only show on the next full page load
+        'alerts': [{'message': m, 'category': c} for m, c in _cap_alert_messages()],
+        'summary': {
+            'incomes': summary["incomes"],
+            'expenses': summary["expenses"],
+            'balance': summary["incomes"] - summary["expenses"],
+            'currency_symbol': '$' if user_cur == 'USD' else '₹',
+        },
+    })
+
+
 # -------------------------------------------------
 # TASKS
 # -------------------------------------------------
 @app.route("/tasks")
 @login_required
+@read_only(db)
 def tasks():
     form = TaskForm()
 
@@ -601,6 +1179,8 @@ def tasks():
     tag_search = request.args.get("tag", "").strip()
 
     q = Task.query.filter_by(user_id=current_user.id)
+    # recurring masters, whose later occurrences are expanded below
+    series_q = q
 
     now = now_ist_naive()
 
@@ -614,17 +1194,20 @@ def tasks():
     # Priority filter (if provided)
     if priority_flt:
         q = q.filter(Task.priority == priority_flt)
-
-    # Tag filter (exact-token matching, require tasks to have ALL tokens)
-    if tag_search:
-        # support comma-separated tokens (require all tokens to match)
-        tokens = [t.strip() for t in tag_search.split(',') if t.strip()]
-        if tokens:
-            # perform a join to tags, filter tag names to the token set (case-insensitive),
-            # group by task and require the number of distinct matched tags >= number of tokens
-            lower_tokens = [t.lower() for t in tokens]
-            q = q.join(Task.tags_rel).filter(func.lower(Tag.name).in_(lower_tokens))
-            q = q.group_by(Task.id).having(func.count(func.distinct(Tag.id)) >= len(tokens))
+        series_q = series_q.filter(Task.priority == priority_flt)
+
+    # Tag filter: "a, b" = all of, "a|b" = any of, "-a" = none of (case-insensitive),
+    # resolved against the user's in-memory tag bitmaps
+    groups, excluded = parse_tag_filter(tag_search)
+    if groups or excluded:
+        bitmaps = tag_index.get(
+            current_user.id,
+            current_user.data_version,
+            lambda: load_user_tags(db.session, Task, Tag, task_tag, current_user.id),
+        )
+        matched = bitmaps.match(groups, excluded)
+        q = q.filter(Task.id.in_(matched))
+        series_q = series_q.filter(Task.id.in_(matched))
 
     # Sort rules: only two supported values
     if sort == "new":
@@ -633,36 +1216,62 @@ def tasks():
         # default / 'old' -> oldest (asc)
         q = q.order_by(Task.deadline.asc())
 
-    tasks_list = q.all()
-
-    # Compute time-left / overdue
-    for t in tasks_list:
-        if not t.deadline:
-            t.is_overdue = False
-            t.time_left = ""
-            continue
-
-        if t.status == "done":
-            t.is_overdue = False
-            t.time_left = ""
-        elif t.deadline < now:
-            t.is_overdue = True
-            delta = now - t.deadline
-            sec = int(delta.total_seconds())
-            t.time_left = f"Overdue by {sec//86400}d {(sec%86400)//3600}h {(sec%3600)//60}m"
-        else:
-            t.is_overdue = False
-            delta = t.deadline - now
-            sec = int(delta.total_seconds())
-            t.time_left = f"{sec//86400}d {(sec%86400)//3600}h {(sec%3600)//60}m left"
+    # Column-only projection with time-left / overdue and tags resolved per batch
+    tasks_list = task_views(q, Task, Tag, task_tag, now)
+
+    # Virtual occurrences (always pending) within the lookback/horizon window
+    if flt != "done":
+        window_start, window_end = _occurrence_window(now)
+        if flt == "overdue":
+            window_end = now
+        virtual = occurrence_views(series_q, Task, Tag, task_tag, window_start, window_end, now)
+        if virtual:
+            tasks_list = sorted(tasks_list + virtual, key=lambda t: t.deadline, reverse=(sort == "new"))
+
+    # History: archived tasks (all completed) only when asked for
+    include_archived = request.args.get("archived") == "1"
+    if include_archived and flt not in ("pending", "overdue"):
+        aq = ArchivedTask.query.filter_by(user_id=current_user.id)
+        if priority_flt:
+            aq = aq.filter(ArchivedTask.priority == priority_flt)
+        archived = archived_task_views(aq, ArchivedTask, Tag, archived_task_tag, now)
+        if groups or excluded:
+            archived = [t for t in archived if tags_match(t.tags, groups, excluded)]
+        if archived:
+            tasks_list = sorted(tasks_list + archived, key=lambda t: t.deadline, reverse=(sort == "new"))
 
-        # Normalize tags for templates (use normalized relationship if available)
-        try:
-            t._tags_list = [tag.name for tag in getattr(t, 'tags_rel', [])]
-        except Exception:
-            t._tags_list = []
+    return render_template(
+        "task_management.html", form=form, tasks=tasks_list, priority_filter=priority_flt, tag_search=tag_search,
+        include_archived=include_archived,
+    )
+
+
+def _parse_tag_names(raw):
+    """Split a comma-separated tag string into trimmed, non-empty names."""
+    return [t.strip() for t in (raw or '').split(',') if t.strip()]
 
-    return render_template("task_management.html", form=form, tasks=tasks_list, priority_filter=priority_flt, tag_search=tag_search)
+
+def _get_or_create_tags(names):
+    """Return the current user's Tag rows for names (case-insensitive), creating missing ones."""
+    wanted = {}
+    for name in names:
+        wanted.setdefault(name.lower(), name)
+    if not wanted:
+        return []
+
+    existing = {
+        tag.name.lower(): tag
+        for tag in Tag.query.filter(Tag.user_id == current_user.id, func.lower(Tag.name).in_(list(wanted)))
+    }
+    tags = []
+    for key, name in wanted.items():
+        tag = existing.get(key)
+        if not tag:
+            tag = Tag(user_id=current_user.id, name=name)
+            db.session.add(tag)
+        tags.append(tag)
+    db.session.flush()
+    return tags
 
 
 # -------------------------------------------------
@@ -682,26 +1291,24 @@ def create_task():
         flash("Deadline is required.", "danger")
         return redirect(url_for("tasks"))
 
+    try:
+        recurrence = normalize_rule(form.recurrence.data)
+    except ValueError as e:
+        flash(f"Invalid repeat rule: {e}", "danger")
+        return redirect(url_for("tasks"))
+
     task = Task(
         title=form.title.data,
         description=form.description.data,
         deadline=dt,
         priority=form.priority.data,
         user_id=current_user.id,
+        recurrence=recurrence,
     )
 
     db.session.add(task)
     # handle tags: parse, create/get Tag rows, associate
-    tags_raw = (form.tags.data or '').strip()
-    if tags_raw:
-        names = [t.strip() for t in tags_raw.split(',') if t.strip()]
-        for name in names:
-            tag = Tag.query.filter(Tag.name.ilike(name)).first()
-            if not tag:
-                tag = Tag(name=name)
-                db.session.add(tag)
-                db.session.flush()
-            task.tags_rel.append(tag)
+    task.tags_rel.extend(_get_or_create_tags(_parse_tag_names(form.tags.data)))
 
     db.session.commit()
 
@@ -722,7 +1329,19 @@ def delete_task(task_id):
         flash("Unauthorized", "danger")
         return redirect(url_for("tasks"))
 
-    db.session.delete(task)
+    occurrence = request.form.get('occurrence')
+    if occurrence:
+        # one occurrence of a recurring task: delete its row if stored, else exclude it
+        dt, row = _resolve_occurrence(Task, task, occurrence, "deadline")
+        if dt is None:
+            flash("That occurrence no longer exists.", "danger")
+            return redirect(url_for("tasks"))
+        if row is not None:
+            _delete_series_row(Task, row)
+        else:
+            add_exdate(task, dt)
+    else:
+        _delete_series_row(Task, task)
     db.session.commit()
 
     flash("Task deleted.", "info")
@@ -733,6 +1352,22 @@ def delete_task(task_id):
     return redirect(url_for("tasks"))
 
 
+# -------------------------------------------------
+# TASK RESTORE (FROM ARCHIVE)
+# -------------------------------------------------
+@app.route("/tasks/restore/<int:archive_id>", methods=["POST"])
+@login_required
+def restore_task(archive_id):
+    archived = ArchivedTask.query.filter_by(id=archive_id, user_id=current_user.id).first_or_404()
+    restore_tasks(db.session, User, Task, ArchivedTask, task_tag, archived_task_tag, current_user.id, [archived.id])
+    db.session.commit()
+
+    flash("Task restored.", "success")
+    nxt = request.form.get('next')
+    if nxt:
+        return redirect(nxt)
+    return redirect(url_for("tasks"))
+
 
 # -------------------------------------------------
 # TASK TOGGLE STATUS (AJAX)
@@ -746,10 +1381,21 @@ def toggle_task(task_id):
         flash("Unauthorized", "danger")
         return redirect(url_for("tasks"))
 
+    occurrence = request.form.get('occurrence')
+    if occurrence:
+        # completing a virtual occurrence stores it as its own row
+        dt, row = _resolve_occurrence(Task, task, occurrence, "deadline")
+        if dt is None:
+            flash("That occurrence no longer exists.", "danger")
+            return redirect(url_for("tasks"))
+        task = row if row is not None else _materialize_task(task, dt)
+
     task.status = "done" if task.status != "done" else "pending"
     db.session.commit()
 
     nxt = request.form.get('next')
+    if _wants_fragment():
+        return _task_fragment(task, nxt, TaskForm())
     if nxt:
         return redirect(nxt)
     return redirect(url_for("tasks"))
@@ -762,42 +1408,68 @@ def toggle_task(task_id):
 @app.route("/tasks/edit/<int:task_id>", methods=["GET", "POST"])
 @login_required
 def edit_task(task_id):
+    # AJAX form partial: revalidate against the user's data version before loading anything
+    is_partial = request.method == "GET" and request.args.get('ajax') == '1'
+    occurrence = request.args.get('occurrence') or None
+    if is_partial:
+        etag = make_etag("edit-task", current_user.id, current_user.data_version, task_id, occurrence, csrf_epoch())
+        last_modified = csrf_last_modified(current_user.data_changed_at)
+        resp = not_modified(etag, last_modified)
+        if resp:
+            return resp
+
     task = Task.query.get_or_404(task_id)
 
     if task.user_id != current_user.id:
         flash("Not authorized.", "danger")
         return redirect(url_for("tasks"))
 
+    # Editing one occurrence of a recurring task: the form starts from the
+    # master and saving stores the occurrence as its own row
+    occurrence_at = None
+    if occurrence:
+        occurrence_at, row = _resolve_occurrence(Task, task, occurrence, "deadline")
+        if occurrence_at is None:
+            flash("That occurrence no longer exists.", "danger")
+            return redirect(url_for("tasks"))
+        if row is not None:
+            task, occurrence = row, None
+
     form = TaskForm()
 
     if form.validate_on_submit():
         dt = form.deadline.data
         if dt is None:
             flash("Invalid deadline.", "danger")
-            return redirect(url_for("edit_task", task_id=task_id))
+            return redirect(url_for("edit_task", task_id=task_id, occurrence=occurrence))
+
+        # the list is sorted by deadline, and a new rule changes the occurrences shown
+        old_deadline, old_rule = occurrence_at if occurrence else task.deadline, task.recurrence
+        if occurrence:
+            task = _materialize_task(task, occurrence_at)
+        elif not task.series_id:
+            try:
+                task.recurrence = normalize_rule(form.recurrence.data)
+            except ValueError as e:
+                flash(f"Invalid repeat rule: {e}", "danger")
+                return redirect(url_for("edit_task", task_id=task_id))
 
         task.title = form.title.data
         task.description = form.description.data
         task.deadline = dt
         task.priority = form.priority.data
-        # update tags: clear existing and re-add
-        task.tags_rel.clear()
-        tags_raw = (form.tags.data or '').strip()
-        if tags_raw:
-            names = [t.strip() for t in tags_raw.split(',') if t.strip()]
-            for name in names:
-                tag = Tag.query.filter(Tag.name.ilike(name)).first()
-                if not tag:
-                    tag = Tag(name=name)
-                    db.session.add(tag)
-                    db.session.flush()
-                task.tags_rel.append(tag)
+        # update tags: replace with the submitted set
+        task.tags_rel = _get_or_create_tags(_parse_tag_names(form.tags.data))
 
         db.session.commit()
 
-        flash("Task updated.", "success")
         # preserve return URL if provided
         nxt = request.form.get('next')
+        if _wants_fragment():
+            moved = task.deadline != old_deadline or (not occurrence and task.recurrence != old_rule)
+            return _task_fragment(task, nxt, form, moved)
+
+        flash("Task updated.", "success")
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.args.get('ajax') == '1':
             # For AJAX POST requests, return JSON so client JS can refresh
             return jsonify({'success': True, 'redirect': nxt or url_for('tasks')})
@@ -809,17 +1481,19 @@ def edit_task(task_id):
     if not form.is_submitted():
         form.title.data = task.title
         form.description.data = task.description
-        form.deadline.data = task.deadline
+        form.deadline.data = occurrence_at if occurrence else task.deadline
         form.priority.data = task.priority
         # Pre-fill tags as comma-separated string
         existing_tags = ', '.join([tag.name for tag in task.tags_rel])
         form.tags.data = existing_tags
+        _set_repeat_choices(form, task.recurrence)
 
     # If AJAX GET requested, return partial form
-    if request.args.get('ajax') == '1':
-        return render_template('_edit_task_form.html', form=form, task=task)
+    if is_partial:
+        resp = make_response(render_template('_edit_task_form.html', form=form, task=task, occurrence=occurrence))
+        return add_validators(resp, etag, last_modified)
 
-    return render_template("edit_task.html", form=form, task=task)
+    return render_template("edit_task.html", form=form, task=task, occurrence=occurrence)
 
 
 # -------------------------------------------------
@@ -827,26 +1501,28 @@ def edit_task(task_id):
 # -------------------------------------------------
 @app.route("/budgets")
 @login_required
+@read_only(db)
 def budgets():
     form = BudgetForm()
 
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
-
-    q = Budget.query.filter_by(user_id=current_user.id)
-    if from_date:
-        try:
-            from_dt = datetime.strptime(from_date, "%Y-%m-%d")
-            q = q.filter(Budget.date >= from_dt)
-        except Exception:
-            pass
-    if to_date:
-        try:
-            to_dt = datetime.strptime(to_date, "%Y-%m-%d")
-            q = q.filter(Budget.date <= to_dt)
-        except Exception:
-            pass
+    # AJAX table partial: revalidate against the user's data version before querying
+    is_partial = request.args.get('ajax') == '1'
+    now = now_ist_naive()
+    if is_partial:
+        # recurring transactions add virtual rows as days pass; totals move with the rates
+        etag = make_etag(
+            "budgets-table", current_user.id, current_user.data_version,
+            current_user.currency, rate_book(db.session, FxRate).version,
+            request.full_path, now.date().isoformat(), csrf_epoch(),
+        )
+        last_modified = csrf_last_modified(current_user.data_changed_at)
+        resp = not_modified(etag, last_modified)
+        if resp:
+            return resp
 
+    # date range, categories, type, amount range and text (see filter_utils)
+    flt = BudgetFilter.from_args(request.args)
+    q, virtual = _filtered_budgets(flt, now)
 
     # Pagination
     try:
@@ -856,46 +1532,33 @@ def budgets():
     except Exception:
         page = 1
 
+    user_cur = current_user.currency or "USD"
+    summary = _cached_budget_summary(q, virtual, flt, user_cur, now)
+
     per_page = 10
-    total_count = q.count()
+    total_count = summary["total_count"]
     total_pages = math.ceil(total_count / per_page) if total_count else 1
 
     # paginated transactions for table
-    transactions = q.order_by(Budget.date.desc()).offset((page - 1) * per_page).limit(per_page).all()
-
-    # For summary numbers and charts we want to aggregate over the entire
-    # filtered result (not just the current page). This computes totals
-    # and breakdowns from the full query.
-    full_items = q.order_by(Budget.date.desc()).all()
-
-    user_cur = current_user.currency or "USD"
-    rates = get_conversion_rates("USD")
-
-    incomes = 0.0
-    expenses = 0.0
-    categories_all = {}
-    categories_expenses = {}
-
-    for t in full_items:
-        conv = convert_amount(t.amount, t.currency, user_cur, rates)
-
-        if t.type == "income":
-            incomes += conv
-        else:
-            expenses += conv
-            categories_expenses.setdefault(t.category, 0.0)
-            categories_expenses[t.category] += conv
-
-        categories_all.setdefault(t.category, 0.0)
-        categories_all[t.category] += conv
+    offset = (page - 1) * per_page
+    if virtual:
+        # newest first across stored rows, virtual occurrences and summaries
+        stored = budget_rows(q.order_by(Budget.date.desc()).limit(offset + per_page), Budget)
+        merged = heapq.merge(stored, virtual, key=lambda t: t.date or datetime.min, reverse=True)
+        transactions = list(merged)[offset:offset + per_page]
+    else:
+        transactions = budget_rows(q.order_by(Budget.date.desc()).offset(offset).limit(per_page), Budget)
 
-    breakdown_all_list = list(categories_all.items())
-    breakdown_expenses_list = list(categories_expenses.items())
+    incomes = summary["incomes"]
+    expenses = summary["expenses"]
+    breakdown_all_list = summary["breakdown"]
+    breakdown_expenses_list = summary["breakdown_expenses"]
 
     # If AJAX request for pagination, return only the table partial
-    if request.args.get('ajax') == '1':
-        return render_template(
+    if is_partial:
+        return add_validators(make_response(render_template(
             "_budgets_table.html",
+            form=form,
             transactions=transactions,
             incomes=incomes,
             expenses=expenses,
@@ -907,7 +1570,8 @@ def budgets():
             per_page=per_page,
             total_pages=total_pages,
             total_count=total_count,
-        )
+            filter_args=flt.query_args(),
+        )), etag, last_modified)
 
     return render_template(
         "budget_management.html",
@@ -923,7 +1587,140 @@ def budgets():
         per_page=per_page,
         total_pages=total_pages,
         total_count=total_count,
+        budget_filter=flt,
+        filter_args=flt.query_args(),
+        categories=_budget_categories(),
+        types=BUDGET_TYPES,
+    )
+
+
+def _filtered_budgets(flt, now):
+    """(stored query, extra rows) for a BudgetFilter.
+
+    The extra rows, newest first, are the virtual occurrences up to now and
+    the monthly summaries of compacted history (see compaction_utils).
+    """
+    mine = Budget.query.filter_by(user_id=current_user.id)
+    start, end = flt.window
+    # recurring masters are matched on everything but their own date
+    virtual = budget_occurrences(flt.apply_attributes(mine, Budget), Budget, start, min(end, now))
+    sq = flt.apply_summaries(BudgetSummary.query.filter_by(user_id=current_user.id), BudgetSummary)
+    summaries = summary_rows(sq, BudgetSummary) if sq is not None else []
+    if flt.terms:
+        summaries = [t for t in summaries if flt.matches(t)]
+    if summaries:
+        virtual = list(heapq.merge(virtual, summaries, key=lambda t: t.date, reverse=True))
+    return flt.apply(mine, Budget), virtual
+
+
+def _budget_categories():
+    """The user's distinct transaction categories, for the category filter."""
+    key = make_cache_key("budget-categories", current_user.id, current_user.data_version)
+    return get_or_compute(cache, key, lambda: sorted(
+        {c for (c,) in db.session.query(Budget.category).filter(Budget.user_id == current_user.id).distinct()}
+        | {c for (c,) in db.session.query(BudgetSummary.category).filter(BudgetSummary.user_id == current_user.id).distinct()}
+    ))
+
+
+def _cached_budget_summary(q, virtual, flt, user_cur, now):
+    """_budget_summary of a filtered view, cached per user data version.
+
+    For summary numbers and charts we aggregate over the entire filtered
+    result (not just the current page). The summary only changes when the
+    user's data (or the rates) change. It is keyed on the filter's canonical
+    form, so any spelling of the same filter shares it. Edits answered with a
+    row fragment compute it under the same key, so the next page load finds
+    it cached.
+    """
+    rates = rate_book(db.session, FxRate)
+    key = make_cache_key(
+        "budgets", current_user.id, current_user.data_version,
+        flt.key(), user_cur, rates.version, now.date().isoformat(),
+    )
+    return get_or_compute(cache, key, lambda: _budget_summary(q, user_cur, rates, virtual))
+
+
+def _budget_summary(q, user_cur, rates, virtual=()):
+    """Totals and per-category breakdowns over the full filtered query."""
+    full_items = budget_amounts(q, Budget) + list(virtual)
+
+    incomes = 0.0
+    expenses = 0.0
+    categories_all = {}
+    categories_expenses = {}
+
+    for t in full_items:
+        conv = rates.convert(t.amount, t.currency, user_cur, t.date)
+
+        if t.type == "income":
+            incomes += conv
+        else:
+            expenses += conv
+            categories_expenses.setdefault(t.category, 0.0)
+            categories_expenses[t.category] += conv
+
+        categories_all.setdefault(t.category, 0.0)
+        categories_all[t.category] += conv
+
+    return {
+        "total_count": len(full_items),
+        "incomes": incomes,
+        "expenses": expenses,
+        "breakdown": list(categories_all.items()),
+        "breakdown_expenses": list(categories_expenses.items()),
+    }
+
+
+# -------------------------------------------------
+# BUDGET ANALYTICS (API)
+# -------------------------------------------------
+@app.route("/api/analytics/budgets")
+@login_required
+@read_only(db)
+def budget_analytics_api():
+    """Income/expense series, category trends and a spend forecast.
+
+    Query: period=month|week, window=1..12 (rolling months), months=0..120 (0 = all).
+    """
+    period = request.args.get("period", "month")
+    if period not in ("month", "week"):
+        return jsonify({"success": False, "message": "'period' must be 'month' or 'week'."}), 400
+    try:
+        window = min(max(int(request.args.get("window", 3)), 1), 12)
+        months = min(max(int(request.args.get("months", 24)), 0), 120)
+    except ValueError:
+        return jsonify({"success": False, "message": "'window' and 'months' must be integers."}), 400
+
+    user_cur = current_user.currency or "USD"
+    rates = rate_book(db.session, FxRate)
+    today = now_ist_naive().date()
+
+    # the forecast moves with the date, everything else with the user's data
+    parts = (
+        "analytics", current_user.id, current_user.data_version, user_cur,
+        rates.version, period, window, months, today.isoformat(),
     )
+    etag = make_etag(*parts)
+    resp = not_modified(etag)
+    if resp:
+        return resp
+
+    def compute():
+        virtual = budget_occurrences(
+            Budget.query.filter_by(user_id=current_user.id), Budget,
+            datetime.min, datetime.combine(today, datetime.min.time()) + timedelta(days=1),
+        )
+        summaries = summary_rows(BudgetSummary.query.filter_by(user_id=current_user.id), BudgetSummary)
+        ledger = load_ledger(
+            db.session, Budget, current_user.id, user_cur,
+            lambda amounts, currencies, days: rates.convert_many(amounts, currencies, days, user_cur),
+            extra=[(t.date, t.category, t.type, t.amount, t.currency) for t in virtual]
+            + [(t.date, t.category, t.type, t.amount, t.currency, t.compacted) for t in summaries],
+        )
+        return budget_analytics(ledger, today, period, window, months)
+
+    data = get_or_compute(cache, make_cache_key(*parts), compute)
+    return add_validators(jsonify(dict(data, success=True, currency=user_cur)), etag)
 
 
 # -------------------------------------------------
@@ -931,14 +1728,18 @@ def budgets():
 # -------------------------------------------------
 @app.route('/tags/suggest')
 @login_required
+@read_only(db)
 def suggest_tags():
     q = request.args.get('q', '').strip()
-    if q:
-        tags = Tag.query.filter(Tag.name.ilike(f"{q}%")).order_by(Tag.name).limit(50).all()
-    else:
-        tags = Tag.query.order_by(Tag.name).limit(50).all()
 
-    return jsonify([t.name for t in tags])
+    # Tags are per user and only change along with the user's tasks
+    etag = make_etag("tags", current_user.id, current_user.data_version, q.lower())
+    resp = not_modified(etag)
+    if resp:
+        return resp
+
+    names = suggest_tags_for(db.session, Tag, current_user.id, q)
+    return add_validators(jsonify(names), etag)
 
 
 # -------------------------------------------------
@@ -966,6 +1767,12 @@ def create_budget():
     else:
         category_final = selected_cat
 
+    try:
+        recurrence = normalize_rule(form.recurrence.data)
+    except ValueError as e:
+        flash(f"Invalid repeat rule: {e}", "danger")
+        return redirect(url_for("budgets"))
+
     b = Budget(
         category=category_final,
         amount=float(form.amount.data),
@@ -973,15 +1780,32 @@ def create_budget():
         type=form.type.data,
         date=dt,
         user_id=current_user.id,
+        recurrence=recurrence,
     )
 
     db.session.add(b)
     db.session.commit()
 
     flash("Transaction added.", "success")
+    _flash_cap_alerts()
     return redirect(url_for("budgets"))
 
 
+def _cap_alert_messages():
+    """(message, flash category) for each monthly cap the last commit pushed past a threshold."""
+    return [
+        (f"You have reached your monthly {category} cap.", "error") if level >= 100
+        else (f"You have used {level}% of your monthly {category} cap.", "warning")
+        for category, level in raised_alerts(db.session)
+    ]
+
+
+def _flash_cap_alerts():
+    """Warn about caps the last commit pushed past a threshold (they are also emailed)."""
+    for message, category in _cap_alert_messages():
+        flash(message, category)
+
+
 # -------------------------------------------------
 # BUDGET DELETE
 # -------------------------------------------------
@@ -994,7 +1818,18 @@ def delete_budget(bud_id):
         flash("Unauthorized", "danger")
         return redirect(url_for("budgets"))
 
-    db.session.delete(b)
+    occurrence = request.form.get('occurrence')
+    if occurrence:
+        dt, row = _resolve_occurrence(Budget, b, occurrence, "date")
+        if dt is None:
+            flash("That occurrence no longer exists.", "danger")
+            return redirect(url_for("budgets"))
+        if row is not None:
+            _delete_series_row(Budget, row)
+        else:
+            add_exdate(b, dt)
+    else:
+        _delete_series_row(Budget, b)
     db.session.commit()
 
     flash("Transaction deleted.", "info")
@@ -1017,6 +1852,17 @@ def edit_budget(bud_id):
         flash("Unauthorized", "danger")
         return redirect(url_for("budgets"))
 
+    # One occurrence of a recurring transaction: stored as its own row on save
+    occurrence = request.args.get('occurrence') or None
+    occurrence_at = None
+    if occurrence:
+        occurrence_at, row = _resolve_occurrence(Budget, b, occurrence, "date")
+        if occurrence_at is None:
+            flash("That occurrence no longer exists.", "danger")
+            return redirect(url_for("budgets"))
+        if row is not None:
+            b, occurrence = row, None
+
     form = BudgetForm()
 
     if form.validate_on_submit():
@@ -1025,6 +1871,17 @@ def edit_budget(bud_id):
         else:
             dt = now_ist_naive()
 
+        # the table is sorted by date, and a new rule changes the occurrences shown
+        old_date, old_rule = occurrence_at if occurrence else b.date, b.recurrence
+        if occurrence:
+            b = _materialize_budget(b, occurrence_at)
+        elif not b.series_id:
+            try:
+                b.recurrence = normalize_rule(form.recurrence.data)
+            except ValueError as e:
+                flash(f"Invalid repeat rule: {e}", "danger")
+                return redirect(url_for("budgets"))
+
         b.category = form.category.data
         b.amount = float(form.amount.data)
         b.type = form.type.data
@@ -1032,9 +1889,14 @@ def edit_budget(bud_id):
 
         db.session.commit()
 
-        flash("Transaction updated.", "success")
         # preserve return URL if provided
         nxt = request.form.get('next')
+        if _wants_fragment():
+            moved = b.date != old_date or (not occurrence and b.recurrence != old_rule)
+            return _budget_fragment(b, nxt, form, moved)
+
+        flash("Transaction updated.", "success")
+        _flash_cap_alerts()
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.args.get('ajax') == '1':
             # For AJAX POST requests, return JSON so client JS can refresh the table
             return jsonify({'success': True, 'redirect': nxt or url_for('budgets')})
@@ -1047,13 +1909,15 @@ def edit_budget(bud_id):
         form.amount.data = b.amount
         form.type.data = b.type
         # Budget.date is DateTime → convert to date
-        form.date.data = b.date.date() if b.date else None
+        date = occurrence_at if occurrence else b.date
+        form.date.data = date.date() if date else None
+        _set_repeat_choices(form, b.recurrence)
 
     # If AJAX GET requested, return partial form
     if request.args.get('ajax') == '1':
-        return render_template('_edit_budget_form.html', form=form, bud=b)
+        return render_template('_edit_budget_form.html', form=form, bud=b, occurrence=occurrence)
 
-    return render_template("edit_budget.html", form=form, bud=b)
+    return render_template("edit_budget.html", form=form, bud=b, occurrence=occurrence)
 
 
 # -------------------------------------------------
@@ -1061,34 +1925,21 @@ def edit_budget(bud_id):
 # -------------------------------------------------
 @app.route("/budgets/export")
 @login_required
+@read_only(db)
 def export_budgets():
-    from_date = request.args.get("from_date")
-    to_date = request.args.get("to_date")
     fmt = request.args.get("format", "csv")
 
-    q = Budget.query.filter_by(user_id=current_user.id)
-    if from_date:
-        try:
-            from_dt = datetime.strptime(from_date, "%Y-%m-%d")
-            q = q.filter(Budget.date >= from_dt)
-        except Exception:
-            pass
-
-    if to_date:
-        try:
-            to_dt = datetime.strptime(to_date, "%Y-%m-%d")
-            q = q.filter(Budget.date <= to_dt)
-        except Exception:
-            pass
-
-    data = q.order_by(Budget.date.desc()).all()
+    q, virtual = _filtered_budgets(BudgetFilter.from_args(request.args), now_ist_naive())
+    data = budget_rows(q.order_by(Budget.date.desc()), Budget)
+    if virtual:
+        data = list(heapq.merge(data, virtual, key=lambda t: t.date or datetime.min, reverse=True))
 
     if fmt == "xlsx":
         wb = Workbook()
         ws = wb.active
         ws.title = "Transactions"
 
-        headers = ["Date", "Category", "Type", "Amount", "Currency"]
+        headers = ["Date", "Category", "Type", "Amount", "Currency", "Transactions"]
         ws.append(headers)
 
         for t in data:
@@ -1098,6 +1949,7 @@ def export_budgets():
                 t.type,
                 t.amount,
                 t.currency,
+                getattr(t, "compacted", 1),
             ])
 
         bio = BytesIO()
@@ -1116,7 +1968,7 @@ def export_budgets():
     # CSV
     si = StringIO()
     cw = csv.writer(si)
-    cw.writerow(["Date", "Category", "Type", "Amount", "Currency"])
+    cw.writerow(["Date", "Category", "Type", "Amount", "Currency", "Transactions"])
     for t in data:
         cw.writerow([
             t.date.strftime("%Y-%m-%d") if t.date else "",
@@ -1124,6 +1976,7 @@ def export_budgets():
             t.type,
             f"{t.amount:.2f}",
             t.currency,
+            getattr(t, "compacted", 1),
         ])
 
     return (
@@ -1136,6 +1989,395 @@ def export_budgets():
     )
 
 
+# -------------------------------------------------
+# CALENDAR FEED (iCalendar)
+# -------------------------------------------------
+def _cached_feed(key, chunks):
+    """Stream ``chunks``, caching the whole body afterwards if it stayed small."""
+    limit = app.config['CALENDAR_FEED_CACHE_MAX_BYTES']
+    parts, size = [], 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            parts = parts + [chunk] if size <= limit else None
+        yield chunk
+    if parts is not None:
+        cache.set(key, "".join(parts))
+
+
+@app.route("/calendar/<token>.ics")
+@limiter.limit("120 per hour")
+@read_only(db)
+def calendar_feed(token):
+    """Pending tasks as an iCalendar feed for calendar apps polling the secret URL.
+
+    A poll with a matching ETag costs one indexed user lookup: the ETag is
+    the user's data version plus today's date (recurring occurrences roll
+    forward daily).
+    """
+    owner = db.session.query(User.id, User.data_version, User.data_changed_at).filter(
+        User.calendar_token == token, User.pending_deletion.is_(False)
+    ).first_or_404()
+
+    now = now_ist_naive()
+    day_start = datetime.combine(now.date(), datetime.min.time())
+    etag = make_etag("calendar", owner.id, owner.data_version, now.date().isoformat())
+    last_modified = max(owner.data_changed_at or day_start, day_start)
+    resp = not_modified(etag, last_modified)
+    if resp:
+        return resp
+
+    key = make_cache_key("calendar", owner.id, owner.data_version, now.date().isoformat())
+    body = cache.get(key)
+    if body is None:
+        start, end = feed_window(
+            now.date(), app.config['TASK_OCCURRENCE_LOOKBACK_DAYS'], app.config['CALENDAR_FEED_HORIZON_DAYS'],
+        )
+        chunks = feed_chunks(
+            Task.query.filter_by(user_id=owner.id), Task, Tag, task_tag,
+            start, end, now, request.host.split(":")[0],
+        )
+        body = stream_with_context(_cached_feed(key, chunks))
+
+    response = app.response_class(body, mimetype="text/calendar")
+    response.headers["Content-Disposition"] = 'inline; filename="tasks.ics"'
+    return add_validators(response, etag, last_modified)
+
+
+# -------------------------------------------------
+# DELTA SYNC (JSON)
+# -------------------------------------------------
+@app.route("/api/sync")
+@login_required
+def sync():
+    """Tasks and transactions changed since the cursor ``since`` (omit it for a full copy).
+
+    Query args: since, limit. Not routed to the read replica: a lagging
+    replica would let the cursor move past rows it has not received yet.
+    """
+    try:
+        limit = min(max(int(request.args.get("limit", app.config['SYNC_PAGE_SIZE'])), 1), app.config['SYNC_PAGE_SIZE'])
+    except ValueError:
+        return jsonify({"success": False, "message": "'limit' must be an integer."}), 400
+
+    payload = changes_since(
+        db.session, Task, Budget, Tag, task_tag, SyncTombstone,
+        current_user.id, current_user.data_version, request.args.get("since"), now_ist_naive(),
+        limit, app.config['SYNC_SETTLE_SECONDS'], app.config['SYNC_TOMBSTONE_DAYS'],
+    )
+    response = jsonify(payload)
+    response.headers["Cache-Control"] = "private, no-store"
+    return response
+
+
+# -------------------------------------------------
+# SEARCH (JSON)
+# -------------------------------------------------
+def _json_row(row):
+    """Make a search result row JSON-friendly (datetimes -> ISO strings)."""
+    return {k: (v.isoformat() if hasattr(v, "isoformat") else v) for k, v in row.items()}
+
+
+@app.route("/api/search")
+@login_required
+def search():
+    """Ranked, paginated full-text search over the user's tasks and transactions.
+
+    Query args: q, type (all|tasks|transactions), page, per_page
+    """
+    terms = parse_terms(request.args.get("q", ""))
+    kind = request.args.get("type", "all")
+    if kind not in ("all", "tasks", "transactions"):
+        kind = "all"
+
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+        per_page = min(max(int(request.args.get("per_page", 20)), 1), 100)
+    except ValueError:
+        page, per_page = 1, 20
+
+    result = {"query": " ".join(terms), "page": page, "per_page": per_page}
+    if not terms:
+        return jsonify(result)
+
+    offset = (page - 1) * per_page
+    if kind in ("all", "tasks"):
+        found = search_tasks(db.session, current_user.id, terms, per_page, offset)
+        result["tasks"] = {"total": found["total"], "items": [_json_row(r) for r in found["items"]]}
+    if kind in ("all", "transactions"):
+        found = search_transactions(db.session, current_user.id, terms, per_page, offset)
+        result["transactions"] = {"total": found["total"], "items": [_json_row(r) for r in found["items"]]}
+
+    return jsonify(result)
+
+
+# -------------------------------------------------
+# BULK API (JSON)
+# -------------------------------------------------
+TASK_BULK_ACTIONS = ("toggle", "complete", "reopen", "delete", "add_tags", "remove_tags", "set_tags", "priority")
+BUDGET_BULK_ACTIONS = ("insert", "delete", "recategorize")
+
+
+def _bulk_error(message, status=400):
+    return jsonify({"success": False, "message": message}), status
+
+
+def _bulk_ids(payload):
+    """Validate the `ids` list of a bulk request; returns (ids, error_response)."""
+    ids = payload.get("ids")
+    if not isinstance(ids, list) or not ids:
+        return None, _bulk_error("'ids' must be a non-empty list.")
+    if len(ids) > app.config['BULK_MAX_ITEMS']:
+        return None, _bulk_error(f"At most {app.config['BULK_MAX_ITEMS']} ids per request.")
+    try:
+        ids = list(dict.fromkeys(int(i) for i in ids))
+    except (TypeError, ValueError):
+        return None, _bulk_error("'ids' must contain integers.")
+    return ids, None
+
+
+def _owned_ids(model, ids):
+    """Subset of ids that belong to the current user (one query)."""
+    rows = db.session.query(model.id).filter(model.id.in_(ids), model.user_id == current_user.id).all()
+    return {r.id for r in rows}
+
+
+def _per_item_results(ids, owned):
+    # not-owned ids are reported like missing ones so existence is not leaked
+    return [{"id": i, "status": "ok" if i in owned else "not_found"} for i in ids]
+
+
+def _apply_bulk_tags(bitmaps, action, task_ids, tag_names):
+    """Mirror a bulk task action onto the user's tag bitmaps."""
+    for task_id in task_ids:
+        if action == "delete":
+            bitmaps.remove_task(task_id)
+        elif action == "add_tags":
+            bitmaps.add_tags(task_id, tag_names)
+        elif action == "remove_tags":
+            bitmaps.remove_tags(task_id, tag_names)
+        elif action == "set_tags":
+            bitmaps.clear_tags(task_id)
+            bitmaps.add_tags(task_id, tag_names)
+
+
+@app.route("/api/tasks/bulk", methods=["POST"])
+@login_required
+@limiter.limit("100 per 10 minutes")
+def bulk_tasks():
+    """Toggle, delete, re-tag or re-prioritize many tasks in one transaction.
+
+    Body: {"action": ..., "ids": [...], "tags": [...]?, "priority": ...?}
+    """
+    payload = request.get_json(silent=True) or {}
+    action = payload.get("action")
+    if action not in TASK_BULK_ACTIONS:
+        return _bulk_error(f"'action' must be one of: {', '.join(TASK_BULK_ACTIONS)}.")
+
+    ids, err = _bulk_ids(payload)
+    if err:
+        return err
+
+    priority = payload.get("priority")
+    if action == "priority" and priority not in ("Low", "Medium", "High"):
+        return _bulk_error("'priority' must be Low, Medium or High.")
+
+    tag_names = payload.get("tags") or []
+    if isinstance(tag_names, str):
+        tag_names = _parse_tag_names(tag_names)
+    if action in ("add_tags", "remove_tags", "set_tags"):
+        if not isinstance(tag_names, list) or (action != "set_tags" and not tag_names):
+            return _bulk_error("'tags' must be a non-empty list of names.")
+        tag_names = [str(n).strip()[:100] for n in tag_names if str(n).strip()]
+
+    try:
+        owned = _owned_ids(Task, ids)
+        if owned:
+            owned_list = list(owned)
+            scope = Task.query.filter(Task.id.in_(owned_list), Task.user_id == current_user.id)
+
+            if action == "toggle":
+                scope.update(
+                    {Task.status: case((Task.status == "done", "pending"), else_="done")},
+                    synchronize_session=False,
+                )
+            elif action in ("complete", "reopen"):
+                scope.update({Task.status: "done" if action == "complete" else "pending"}, synchronize_session=False)
+            elif action == "priority":
+                scope.update({Task.priority: priority}, synchronize_session=False)
+            elif action == "delete":
+                _bulk_delete_series(Task, owned_list)
+                db.session.execute(task_tag.delete().where(task_tag.c.task_id.in_(owned_list)))
+                scope.delete(synchronize_session=False)
+                record_tombstones(db.session.connection(), SyncTombstone, current_user.id, "task", owned_list)
+            else:
+                tag_ids = [t.id for t in _get_or_create_tags(tag_names)]
+                if action in ("set_tags", "remove_tags"):
+                    stmt = task_tag.delete().where(task_tag.c.task_id.in_(owned_list))
+                    if action == "remove_tags":
+                        stmt = stmt.where(task_tag.c.tag_id.in_(tag_ids))
+                    db.session.execute(stmt)
+                if action in ("set_tags", "add_tags") and tag_ids:
+                    existing = set()
+                    if action == "add_tags":
+                        existing = {
+                            (r.task_id, r.tag_id) for r in db.session.execute(
+                                task_tag.select().where(
+                                    task_tag.c.task_id.in_(owned_list), task_tag.c.tag_id.in_(tag_ids)
+                                )
+                            )
+                        }
+                    rows = [
+                        {"task_id": task_id, "tag_id": tag_id}
+                        for task_id in owned_list for tag_id in tag_ids
+                        if (task_id, tag_id) not in existing
+                    ]
+                    if rows:
+                        db.session.execute(task_tag.insert(), rows)
+                # tags are part of the task for sync clients
+                scope.update({Task.updated_at: now_ist_naive()}, synchronize_session=False)
+
+            # set-based statements bypass the ORM flush events, so bump explicitly
+            versions = bump_data_version(db.session.connection(), User, [current_user.id])
+            tag_index.advance(
+                db.session, current_user.id, versions.get(current_user.id),
+                lambda e: _apply_bulk_tags(e, action, owned_list, tag_names),
+            )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Bulk task update failed: {e}")
+        return _bulk_error("Bulk update failed; no changes were made.", 500)
+
+    return jsonify({
+        "success": True,
+        "action": action,
+        "affected": len(owned),
+        "results": _per_item_results(ids, owned),
+    })
+
+
+def _parse_bulk_budget_item(item):
+    """Validate one transaction for bulk insert; returns (fields, error)."""
+    if not isinstance(item, dict):
+        return None, "item must be an object"
+
+    category = str(item.get("category") or "").strip()
+    if not category or len(category) > 100:
+        return None, "category is required (max 100 characters)"
+
+    try:
+        amount = round(float(item.get("amount")), 2)
+    except (TypeError, ValueError):
+        return None, "amount must be a number"
+    if not 0.01 <= amount <= 999999999.99:
+        return None, "amount must be between 0.01 and 999999999.99"
+
+    txn_type = item.get("type")
+    if txn_type not in ("expense", "income"):
+        return None, "type must be 'expense' or 'income'"
+
+    if item.get("date"):
+        try:
+            dt = datetime.strptime(item["date"], "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return None, "date must be YYYY-MM-DD"
+    else:
+        dt = now_ist_naive()
+
+    try:
+        recurrence = normalize_rule(str(item.get("recurrence") or ""))
+    except ValueError as e:
+        return None, f"recurrence: {e}"
+
+    return {"category": category, "amount": amount, "type": txn_type, "date": dt, "recurrence": recurrence}, None
+
+
+@app.route("/api/budgets/bulk", methods=["POST"])
+@login_required
+@limiter.limit("100 per 10 minutes")
+def bulk_budgets():
+    """Insert, delete or recategorize many transactions in one transaction.
+
+    Body: {"action": "insert", "items": [{category, amount, type, date, recurrence?}, ...]}
+       or {"action": "delete" | "recategorize", "ids": [...], "category": ...?}
+    """
+    payload = request.get_json(silent=True) or {}
+    action = payload.get("action")
+    if action not in BUDGET_BULK_ACTIONS:
+        return _bulk_error(f"'action' must be one of: {', '.join(BUDGET_BULK_ACTIONS)}.")
+
+    if action == "insert":
+        items = payload.get("items")
+        if not isinstance(items, list) or not items:
+            return _bulk_error("'items' must be a non-empty list.")
+        if len(items) > app.config['BULK_MAX_ITEMS']:
+            return _bulk_error(f"At most {app.config['BULK_MAX_ITEMS']} items per request.")
+
+        results = []
+        new_rows = []
+        for index, item in enumerate(items):
+            fields, error = _parse_bulk_budget_item(item)
+            if error:
+                results.append({"index": index, "status": "error", "message": error})
+                continue
+            b = Budget(currency=current_user.currency, user_id=current_user.id, **fields)
+            new_rows.append(b)
+            results.append({"index": index, "status": "ok", "row": b})
+
+        try:
+            db.session.add_all(new_rows)
+            db.session.flush()
+            for r in results:
+                if "row" in r:
+                    r["id"] = r.pop("row").id
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Bulk budget insert failed: {e}")
+            return _bulk_error("Bulk insert failed; no changes were made.", 500)
+
+        return jsonify({"success": True, "action": action, "affected": len(new_rows), "results": results})
+
+    ids, err = _bulk_ids(payload)
+    if err:
+        return err
+
+    category = str(payload.get("category") or "").strip()
+    if action == "recategorize" and (not category or len(category) > 100):
+        return _bulk_error("'category' is required (max 100 characters).")
+
+    try:
+        owned = _owned_ids(Budget, ids)
+        if owned:
+            scope = Budget.query.filter(Budget.id.in_(list(owned)), Budget.user_id == current_user.id)
+            rows = spend_rows(scope, Budget)
+            if action == "delete":
+                _bulk_delete_series(Budget, list(owned))
+                scope.delete(synchronize_session=False)
+                record_tombstones(db.session.connection(), SyncTombstone, current_user.id, "budget", list(owned))
+                record_spend(db.session, User, CategorySpend, FxRate, removed=rows)
+            else:
+                scope.update({Budget.category: category}, synchronize_session=False)
+                moved = [(r.user_id, category, r.amount, r.currency, r.date, r.type) for r in rows]
+                record_spend(db.session, User, CategorySpend, FxRate, added=moved, removed=rows)
+            versions = bump_data_version(db.session.connection(), User, [current_user.id])
+            # no tag changes, but keep the tag bitmaps current with the new version
+            tag_index.advance(db.session, current_user.id, versions.get(current_user.id))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Bulk budget update failed: {e}")
+        return _bulk_error("Bulk update failed; no changes were made.", 500)
+
+    return jsonify({
+        "success": True,
+        "action": action,
+        "affected": len(owned),
+        "results": _per_item_results(ids, owned),
+    })
+
+
 # -------------------------------------------------
 # ERROR HANDLERS
 # -------------------------------------------------
@@ -1148,6 +2390,17 @@ def internal_error(error):
     db.session.rollback()
     return render_template('errors/500.html'), 500
 
+@app.errorhandler(OperationalError)
+def database_error(error):
+    if not is_busy_error(error):
+        raise error
+    # SQLite write lock still held by another worker after the busy timeout:
+    # transient, so ask the client to retry instead of failing hard
+    db.session.rollback()
+    response = make_response(render_template('errors/503.html'), 503)
+    response.headers['Retry-After'] = '1'
+    return response
+
 
 # -------------------------------------------------
 # MAIN
@@ -0,0 +1,187 @@
+"""Archival of completed tasks.
+
+Tasks done for longer than TASK_ARCHIVE_AFTER_DAYS (measured from
+``updated_at``, their last write) move with their tag links from
+``task``/``task_tag`` to ``archived_task``/``archived_task_tag``, in batches
+of set-based statements committed one at a time, so task lists, the
+dashboard and the reminder sweep only scan active work.
+
+- Recurring series masters, and tasks other rows point to, stay.
+- An archived materialized occurrence becomes an exdate of its master, as a
+  deleted one does, so it does not come back as a virtual occurrence.
+- Sync clients get tombstones for archived tasks; restored ones come back
+  with a new ``updated_at``, which also keeps them from being re-archived
+  straight away.
+- Tags used only by archived tasks are kept (see ``gc_unused_tags``).
+
+``archived_task.id`` is its own key: SQLite may give a later task the id of
+an archived one. The original id is kept in ``task_id`` and reused on
+restore when it is still free.
+"""
+from datetime import timedelta
+
+from sqlalchemy import literal, select
+from sqlalchemy.orm import aliased
+
+from cache_utils import bump_data_version
+from models import now_ist_naive
+from recurrence_utils import merge_exdates
+from sync_utils import record_tombstones
+
+# Task columns copied to and from archived_task (``id`` goes to ``task_id``)
+TASK_COLUMNS = (
+    "title", "description", "deadline", "priority", "status", "created_at", "user_id",
+    "last_notification_sent", "recurrence", "recurrence_exdates", "series_id", "occurrence_at", "updated_at",
+)
+
+
+def archivable_ids(session, Task, cutoff, limit):
+    """``[(id, user_id)]`` of up to ``limit`` tasks done since before ``cutoff``, oldest first."""
+    child = aliased(Task)
+    return session.execute(
+        select(Task.id, Task.user_id)
+        .where(
+            Task.status == "done",
+            Task.updated_at < cutoff,
+            Task.recurrence.is_(None),
+            ~select(child.id).where(child.series_id == Task.id).exists(),
+        )
+        .order_by(Task.updated_at)
+        .limit(limit)
+    ).all()
+
+
+def add_master_exdates(session, model, slots):
+    """Add ``{master id: [occurrence datetimes]}`` to the masters' exdates (set-based removals)."""
+    table = model.__table__
+    for master_id, text in session.execute(
+        select(model.id, model.recurrence_exdates).where(model.id.in_(list(slots)))
+    ).all():
+        session.execute(
+            table.update()
+            .where(table.c.id == master_id)
+            .values(recurrence_exdates=merge_exdates(text, slots[master_id]))
+        )
+
+
+def _exdate_masters(session, Task, ids):
+    """Record archived occurrences as exdates of their masters."""
+    slots = {}
+    for series_id, occurrence_at in session.execute(
+        select(Task.series_id, Task.occurrence_at).where(Task.id.in_(ids), Task.series_id.isnot(None))
+    ):
+        slots.setdefault(series_id, []).append(occurrence_at)
+    add_master_exdates(session, Task, slots)
+
+
+def archive_tasks(session, User, Task, ArchivedTask, task_tag, archived_task_tag, SyncTombstone, rows, now):
+    """Move the tasks ``rows`` (``(id, user_id)`` pairs) and their tag links to the archive.
+
+    The caller commits.
+    """
+    ids = [r.id for r in rows]
+    task_table, archive = Task.__table__, ArchivedTask.__table__
+    _exdate_masters(session, Task, ids)
+
+    # archived_at tells this batch's rows from older archives of a reused id
+    source = (
+        [task_table.c.id, literal(now, archive.c.archived_at.type)]
+        + [task_table.c[name] for name in TASK_COLUMNS]
+    )
+    session.execute(archive.insert().from_select(
+        ["task_id", "archived_at", *TASK_COLUMNS],
+        select(*source).where(task_table.c.id.in_(ids)),
+    ))
+    new_ids = dict(session.execute(
+        select(archive.c.task_id, archive.c.id).where(archive.c.task_id.in_(ids), archive.c.archived_at == now)
+    ).all())
+    links = [
+        {"task_id": new_ids[task_id], "tag_id": tag_id}
+        for task_id, tag_id in session.execute(
+            select(task_tag.c.task_id, task_tag.c.tag_id).where(task_tag.c.task_id.in_(ids))
+        )
+    ]
+    if links:
+        session.execute(archived_task_tag.insert(), links)
+
+    session.execute(task_tag.delete().where(task_tag.c.task_id.in_(ids)))
+    session.execute(task_table.delete().where(task_table.c.id.in_(ids)))
+
+    by_user = {}
+    for r in rows:
+        by_user.setdefault(r.user_id, []).append(r.id)
+    connection = session.connection()
+    for user_id, user_ids in by_user.items():
+        record_tombstones(connection, SyncTombstone, user_id, "task", user_ids, now)
+    bump_data_version(connection, User, list(by_user))
+    return len(ids)
+
+
+def restore_tasks(session, User, Task, ArchivedTask, task_tag, archived_task_tag, user_id, archive_ids):
+    """Move a user's archived tasks back into ``task``; returns their task ids.
+
+    The caller commits.
+    """
+    task_table, archive = Task.__table__, ArchivedTask.__table__
+    rows = session.execute(
+        select(archive).where(archive.c.id.in_(archive_ids), archive.c.user_id == user_id)
+    ).all()
+    if not rows:
+        return []
+
+    wanted = [r.task_id for r in rows]
+    taken = set(session.execute(select(Task.id).where(Task.id.in_(wanted))).scalars())
+    masters = set(session.execute(
+        select(Task.id).where(Task.id.in_([r.series_id for r in rows if r.series_id]))
+    ).scalars())
+    now = now_ist_naive()
+    restored = {}
+    for r in rows:
+        values = {name: getattr(r, name) for name in TASK_COLUMNS}
+        values["updated_at"] = now
+        if values["series_id"] not in masters:
+            values["series_id"] = None
+        if r.task_id not in taken:
+            values["id"] = r.task_id
+        result = session.execute(task_table.insert().values(**values))
+        restored[r.id] = result.inserted_primary_key[0]
+
+    links = [
+        {"task_id": restored[archive_id], "tag_id": tag_id}
+        for archive_id, tag_id in session.execute(
+            select(archived_task_tag.c.task_id, archived_task_tag.c.tag_id)
+            .where(archived_task_tag.c.task_id.in_(list(restored)))
+        )
+    ]
+    if links:
+        session.execute(task_tag.insert(), links)
+    session.execute(archived_task_tag.delete().where(archived_task_tag.c.task_id.in_(list(restored))))
+    session.execute(archive.delete().where(archive.c.id.in_(list(restored))))
+    bump_data_version(session.connection(), User, [user_id])
+    return list(restored.values())
+
+
+def archive_done_tasks(app, db, User, Task, ArchivedTask, task_tag, archived_task_tag, SyncTombstone,
+                       after_days, batch_size):
+    """Scheduler job: archive tasks done for more than ``after_days``, ``batch_size`` per transaction."""
+    if not after_days:
+        return 0
+    with app.app_context():
+        archived = 0
+        cutoff = now_ist_naive() - timedelta(days=after_days)
+        try:
+            while True:
+                rows = archivable_ids(db.session, Task, cutoff, batch_size)
+                if not rows:
+                    break
+                archived += archive_tasks(
+                    db.session, User, Task, ArchivedTask, task_tag, archived_task_tag, SyncTombstone,
+                    rows, now_ist_naive(),
+                )
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error archiving completed tasks: {e}")
+        if archived:
+            print(f"📦 Archived {archived} completed task(s)")
+        return archived
@@ -0,0 +1,57 @@
+"""Serving fingerprinted static assets built by ``build_assets.py``.
+
+``asset_url('css/dashboard.css')`` resolves to the content-hashed copy in
+``static/dist`` when a manifest exists (served with far-future, immutable
+caching and precompressed variants), and to the plain ``/static`` file
+otherwise, so development works without running the build.
+"""
+import json
+import mimetypes
+import os
+
+from flask import request, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+ASSET_MAX_AGE = 365 * 24 * 3600  # one year; filenames change with content
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_manifest = {}
+
+
+def load_manifest(dist_dir):
+    """Read ``manifest.json`` from the build output, if the build has been run."""
+    global _manifest
+    path = os.path.join(dist_dir, "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            _manifest = json.load(f)
+    except (OSError, ValueError):
+        _manifest = {}
+    return _manifest
+
+
+def asset_url(filename):
+    """URL of a static asset, fingerprinted when the build manifest knows it."""
+    hashed = _manifest.get(filename)
+    if hashed:
+        return url_for("serve_asset", filename=hashed)
+    return url_for("static", filename=filename)
+
+
+def send_precompressed(directory, filename):
+    """Send a built asset, preferring a ``.br``/``.gz`` sibling the client accepts."""
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    for encoding, suffix in ENCODINGS:
+        if encoding in request.accept_encodings:
+            candidate = safe_join(directory, filename + suffix)
+            if candidate and os.path.isfile(candidate):
+                response = send_from_directory(directory, filename + suffix, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+                response.headers["Content-Encoding"] = encoding
+                break
+    else:
+        response = send_from_directory(directory, filename, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}, immutable"
+    return response
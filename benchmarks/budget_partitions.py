@@ -0,0 +1,90 @@
+"""Check monthly budget partitioning and pruning against a local PostgreSQL.
+
+Creates the app's tables in the database given by DATABASE_URL (use a
+scratch database: the budget table is dropped first), seeds one user with
+transactions spread over two years, partitions the table and prints the
+EXPLAIN of the budgets page query for a one-month range, asserting that only
+that month's partition is scanned. Then archives the first year.
+
+Usage:
+    DATABASE_URL=postgresql://postgres@localhost/scratch python benchmarks/budget_partitions.py
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL", "")
+    if not url.startswith(("postgresql://", "postgres://")):
+        sys.exit("DATABASE_URL must point at a scratch PostgreSQL database")
+
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    from sqlalchemy import text
+    from partition_utils import archive_budget_partitions, attached_months, migrate_budget_partitions, partition_name
+
+    db, User, Budget = app_module.db, app_module.User, app_module.Budget
+    app = app_module.app
+    rnd = random.Random(7)
+
+    with app.app_context():
+        # start from a plain table so the migration path runs
+        db.session.execute(text("DROP TABLE IF EXISTS budget CASCADE"))
+        db.session.commit()
+        db.create_all()
+
+        user = User.query.filter_by(email="partition-check@example.com").first()
+        if user is None:
+            user = User(email="partition-check@example.com", password="x", email_verified=True)
+            db.session.add(user)
+            db.session.commit()
+
+        now = app_module.now_ist_naive()
+        rows = [
+            {
+                "user_id": user.id, "category": rnd.choice(["Grocery", "Bills", "Transport"]),
+                "amount": round(rnd.uniform(1, 500), 2), "currency": "USD",
+                "type": rnd.choice(["expense", "income"]),
+                "date": now - timedelta(days=rnd.randint(0, 730)),
+            }
+            for _ in range(args.rows)
+        ]
+        db.session.execute(Budget.__table__.insert(), rows)
+        db.session.commit()
+
+        migrate_budget_partitions(db, Budget, app.config["BUDGET_PARTITION_MONTHS_AHEAD"])
+        with db.engine.connect() as conn:
+            months = sorted(attached_months(conn))
+            count = conn.execute(text("SELECT count(*) FROM budget")).scalar()
+        print(f"{len(months)} monthly partitions ({months[0]} .. {months[-1]}), {count} rows")
+        assert count == args.rows
+
+        month = months[len(months) // 2]
+        lo = datetime(month.year, month.month, 1)
+        hi = datetime(month.year + month.month // 12, month.month % 12 + 1, 1) - timedelta(seconds=1)
+        q = (
+            Budget.query.filter(Budget.user_id == user.id, Budget.date >= lo, Budget.date <= hi)
+            .order_by(Budget.date.desc()).limit(10)
+        )
+        sql = str(q.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+        plan = "\n".join(r[0] for r in db.session.execute(text("EXPLAIN " + sql)))
+        print(plan)
+        scanned = {name for name in (partition_name(m) for m in months) if name in plan}
+        assert scanned == {partition_name(month)}, f"expected one partition, plan touches {sorted(scanned)}"
+        print(f"pruned to {partition_name(month)}")
+
+        archived = archive_budget_partitions(db, months[12])
+        print(f"archived {len(archived)} partitions; {Budget.query.count()} rows still visible")
+
+
+if __name__ == "__main__":
+    main()
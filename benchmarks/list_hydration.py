@@ -0,0 +1,70 @@
+"""Micro-benchmark: ORM hydration vs column projections for the task list.
+
+Seeds one user with N tagged tasks in a throwaway SQLite database and times
+building the /tasks list the old way (full Task objects + lazy tags_rel) and
+through read_models.task_views(), with peak memory from tracemalloc.
+
+Usage:
+    python benchmarks/list_hydration.py --tasks 20000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadtest import ROOT, seed_database  # noqa: E402
+
+
+def timed(fn, repeat):
+    best, peak = float("inf"), 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(ROOT, "instance", "hydration.db"))
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    seed_database(args.db, 1, args.tasks, 0)
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    from read_models import format_time_left, task_views
+
+    Task, Tag = app_module.Task, app_module.Tag
+
+    with app_module.app.app_context():
+        user_id = app_module.User.query.first().id
+        session = app_module.db.session
+
+        def orm():
+            now = app_module.now_ist_naive()
+            rows = Task.query.filter_by(user_id=user_id).order_by(Task.deadline.asc()).all()
+            for t in rows:
+                t.is_overdue, t.time_left = format_time_left(t.deadline, t.status, now)
+                t._tags_list = [tag.name for tag in t.tags_rel]
+            session.rollback()
+            session.expunge_all()
+
+        def projection():
+            now = app_module.now_ist_naive()
+            task_views(Task.query.filter_by(user_id=user_id).order_by(Task.deadline.asc()),
+                       Task, Tag, app_module.task_tag, now)
+
+        for name, fn in (("ORM objects", orm), ("projection", projection)):
+            seconds, peak = timed(fn, args.repeat)
+            print(f"{name:<12} {seconds * 1000:>9.1f} ms   peak {peak / 1024 / 1024:>7.1f} MiB   ({args.tasks} tasks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""HTTP load generator for the Task & Budget Manager.
+
+Boots the app under gunicorn against a seeded local SQLite database and
+drives weighted user journeys (login, dashboard, tasks, budgets, export)
+from several processes, each running a pool of simulated users with their
+own session cookies and CSRF tokens.
+
+Usage:
+    python benchmarks/loadtest.py --workers 4 --processes 4 --users 8 --duration 60
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --no-seed
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ACCOUNT_EMAIL = "loadtest{}@example.com"
+ACCOUNT_PASSWORD = "loadtest-password"
+TAG_POOL = ["work", "personal", "urgent", "home", "errand", "finance", "health", "study"]
+CATEGORIES = ["Grocery", "Bills", "Transport", "Entertainment", "Salary", "Other"]
+DATE_RANGES = ["today", "week", "month", "all"]
+
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+TASK_ID_RE = re.compile(r'data-task-id="(\d+)"')
+
+
+# -------------------------------------------------
+# Seeding
+# -------------------------------------------------
+def seed_database(db_path, accounts, tasks_per_user, budgets_per_user):
+    """Create verified load-test accounts with tasks, tags and transactions."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, ROOT)
+
+    import app as app_module
+    from werkzeug.security import generate_password_hash
+
+    db = app_module.db
+    User, Task, Budget, Tag = app_module.User, app_module.Task, app_module.Budget, app_module.Tag
+
+    rnd = random.Random(42)
+    now = app_module.now_ist_naive()
+    password_hash = generate_password_hash(ACCOUNT_PASSWORD)
+
+    with app_module.app.app_context():
+        for i in range(accounts):
+            user = User(
+                email=ACCOUNT_EMAIL.format(i),
+                password=password_hash,
+                currency=rnd.choice(["USD", "INR"]),
+                email_verified=True,
+            )
+            db.session.add(user)
+            db.session.flush()
+
+            tags = {name: Tag(user_id=user.id, name=name) for name in TAG_POOL}
+            db.session.add_all(tags.values())
+
+            for n in range(tasks_per_user):
+                task = Task(
+                    title=f"Task {n}",
+                    description="Seeded by loadtest",
+                    deadline=now + timedelta(hours=rnd.randint(-24 * 30, 24 * 30)),
+                    priority=rnd.choice(["Low", "Medium", "High"]),
+                    status=rnd.choice(["pending", "pending", "done"]),
+                    user_id=user.id,
+                )
+                task.tags_rel = [tags[name] for name in rnd.sample(TAG_POOL, rnd.randint(0, 3))]
+                db.session.add(task)
+
+            db.session.add_all([
+                Budget(
+                    category=rnd.choice(CATEGORIES),
+                    amount=round(rnd.uniform(1, 500), 2),
+                    currency=user.currency,
+                    type=rnd.choice(["expense", "expense", "income"]),
+                    date=now - timedelta(days=rnd.randint(0, 365)),
+                    user_id=user.id,
+                )
+                for _ in range(budgets_per_user)
+            ])
+            db.session.commit()
+
+    print(f"Seeded {accounts} account(s) into {db_path}")
+
+
+# -------------------------------------------------
+# Server
+# -------------------------------------------------
+def start_server(db_path, port, workers):
+    """Start gunicorn in the background and wait until it accepts requests."""
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "RATELIMIT_ENABLED": "False",
+        "FLASK_DEBUG": "False",
+    })
+    proc = subprocess.Popen(
+        ["gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            requests.get(url + "/", timeout=1)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.25)
+
+    proc.terminate()
+    raise RuntimeError("gunicorn did not start within 30 seconds")
+
+
+# -------------------------------------------------
+# Simulated user
+# -------------------------------------------------
+class VirtualUser:
+    """One browser-like client: a cookie session plus the latest CSRF token."""
+
+    def __init__(self, base_url, account, results, rnd):
+        self.base_url = base_url
+        self.account = account
+        self.results = results
+        self.rnd = rnd
+        self.session = requests.Session()
+        self.csrf_token = None
+        self.task_ids = []
+
+    def request(self, route, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            res = self.session.request(method, self.base_url + path, timeout=30, allow_redirects=False, **kwargs)
+            status = res.status_code
+        except requests.RequestException:
+            res, status = None, 0
+        self.results.append((route, time.perf_counter() - start, status))
+
+        if res is not None and "text/html" in res.headers.get("Content-Type", ""):
+            match = CSRF_RE.search(res.text)
+            if match:
+                self.csrf_token = match.group(1)
+        return res
+
+    def form(self, **fields):
+        fields["csrf_token"] = self.csrf_token or ""
+        return fields
+
+    # ---- journeys ----
+    def login(self):
+        self.request("GET /login", "GET", "/login")
+        self.request("POST /login", "POST", "/login", data=self.form(
+            email=ACCOUNT_EMAIL.format(self.account),
+            password=ACCOUNT_PASSWORD,
+        ))
+
+    def browse_dashboard(self):
+        for date_range in DATE_RANGES:
+            self.request(f"GET /dashboard?date_range={date_range}", "GET", f"/dashboard?date_range={date_range}")
+
+    def manage_tasks(self):
+        res = self.request("GET /tasks", "GET", "/tasks")
+        if res is not None and res.ok:
+            self.task_ids = TASK_ID_RE.findall(res.text)
+
+        tags = ", ".join(self.rnd.sample(TAG_POOL, 2))
+        deadline = (datetime.now() + timedelta(days=self.rnd.randint(1, 14))).strftime("%Y-%m-%dT%H:%M")
+        self.request("POST /tasks/create", "POST", "/tasks/create", data=self.form(
+            title=f"Load task {self.rnd.randint(0, 10**6)}",
+            description="Created by loadtest",
+            deadline=deadline,
+            priority=self.rnd.choice(["Low", "Medium", "High"]),
+            tags=tags,
+        ))
+
+        self.request("GET /tasks?tag", "GET", "/tasks", params={"tag": self.rnd.choice(TAG_POOL)})
+
+        if not self.task_ids:
+            return
+        task_id = self.rnd.choice(self.task_ids)
+        self.request("POST /tasks/toggle/<id>", "POST", f"/tasks/toggle/{task_id}", data=self.form())
+
+        self.request("GET /tasks/edit/<id>?ajax=1", "GET", f"/tasks/edit/{task_id}", params={"ajax": "1"})
+        self.request("POST /tasks/edit/<id>", "POST", f"/tasks/edit/{task_id}?ajax=1", data=self.form(
+            title=f"Edited task {task_id}",
+            description="Edited by loadtest",
+            deadline=deadline,
+            priority="High",
+            tags=tags,
+        ), headers={"X-Requested-With": "XMLHttpRequest"})
+
+        self.request("GET /tags/suggest", "GET", "/tags/suggest", params={"q": self.rnd.choice(TAG_POOL)[:2]})
+
+    def review_budgets(self):
+        self.request("GET /budgets", "GET", "/budgets")
+        for page in range(2, 2 + self.rnd.randint(1, 4)):
+            self.request("GET /budgets?page=N&ajax=1", "GET", "/budgets", params={"page": page, "ajax": "1"})
+
+    def export(self):
+        fmt = self.rnd.choice(["csv", "xlsx"])
+        self.request(f"GET /budgets/export?format={fmt}", "GET", "/budgets/export", params={"format": fmt})
+
+
+JOURNEYS = [
+    ("browse_dashboard", 4),
+    ("manage_tasks", 3),
+    ("review_budgets", 3),
+    ("export", 1),
+]
+
+
+def run_user(base_url, account, stop_at, results, seed):
+    rnd = random.Random(seed)
+    user = VirtualUser(base_url, account, results, rnd)
+    user.login()
+
+    names = [name for name, _ in JOURNEYS]
+    weights = [weight for _, weight in JOURNEYS]
+    while time.time() < stop_at:
+        getattr(user, rnd.choices(names, weights)[0])()
+
+
+def run_process(args):
+    """Entry point of one load process: run `users` simulated users in threads."""
+    base_url, process_index, users, accounts, duration = args
+    stop_at = time.time() + duration
+    results = []
+    threads = []
+    for n in range(users):
+        account = (process_index * users + n) % accounts
+        t = threading.Thread(
+            target=run_user,
+            args=(base_url, account, stop_at, results, process_index * 1000 + n),
+            daemon=True,
+        )
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    return results
+
+
+# -------------------------------------------------
+# Report
+# -------------------------------------------------
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+def print_report(results, elapsed):
+    by_route = defaultdict(list)
+    errors = defaultdict(int)
+    for route, latency, status in results:
+        by_route[route].append(latency)
+        if status == 0 or status >= 400:
+            errors[route] += 1
+
+    header = f"{'route':<40} {'count':>7} {'rps':>8} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for route in sorted(by_route):
+        lat = sorted(by_route[route])
+        print(
+            f"{route:<40} {len(lat):>7} {len(lat) / elapsed:>8.1f} {errors[route]:>5} "
+            f"{percentile(lat, 50) * 1000:>9.1f} {percentile(lat, 95) * 1000:>9.1f} {percentile(lat, 99) * 1000:>9.1f}"
+        )
+
+    all_lat = sorted(latency for _, latency, _ in results)
+    print("-" * len(header))
+    print(
+        f"{'TOTAL':<40} {len(all_lat):>7} {len(all_lat) / elapsed:>8.1f} {sum(errors.values()):>5} "
+        f"{percentile(all_lat, 50) * 1000:>9.1f} {percentile(all_lat, 95) * 1000:>9.1f} {percentile(all_lat, 99) * 1000:>9.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target an already running server instead of booting gunicorn")
+    parser.add_argument("--db", default=os.path.join(ROOT, "instance", "loadtest.db"))
+    parser.add_argument("--no-seed", action="store_true", help="Reuse the existing load-test database")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--processes", type=int, default=4, help="load generator processes")
+    parser.add_argument("--users", type=int, default=8, help="simulated users per process")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--budgets-per-user", type=int, default=500)
+    args = parser.parse_args()
+
+    if not args.no_seed and not args.url:
+        seed_database(args.db, args.accounts, args.tasks_per_user, args.budgets_per_user)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_server(args.db, args.port, args.workers)
+        print(f"gunicorn started with {args.workers} worker(s) at {base_url}")
+
+    try:
+        jobs = [(base_url, i, args.users, args.accounts, args.duration) for i in range(args.processes)]
+        print(f"Running {args.processes} x {args.users} simulated users for {args.duration:.0f}s ...")
+        started = time.time()
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            chunks = pool.map(run_process, jobs)
+        elapsed = time.time() - started
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    print_report([r for chunk in chunks for r in chunk], elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Page-weight benchmark.
+
+Renders the main pages for a seeded user through the Flask test client and
+reports, per page, the HTML size, the inline <style>/<script> bytes still in
+it, and the bytes of every referenced asset as transferred (br/gzip). First
+view pays for HTML + assets; repeat views only pay for the HTML because
+fingerprinted assets are served with immutable caching.
+
+Usage:
+    python build_assets.py build && python benchmarks/page_weight.py
+"""
+import argparse
+import gzip
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadtest import ACCOUNT_EMAIL, ACCOUNT_PASSWORD, ROOT, seed_database  # noqa: E402
+
+PAGES = ["/dashboard", "/tasks", "/budgets", "/settings", "/settings/notifications", "/login", "/"]
+
+INLINE_RE = re.compile(r"<(style|script)(?![^>]*\bsrc=)[^>]*>(.*?)</\1>", re.S)
+ASSET_RE = re.compile(r'<(?:link[^>]*\bhref|script[^>]*\bsrc)="([^"]+)"')
+
+
+def measure(client, path):
+    html = client.get(path).get_data()
+    text = html.decode("utf-8")
+
+    inline = sum(len(m.group(2).encode("utf-8")) for m in INLINE_RE.finditer(text))
+    assets, external = 0, []
+    for url in ASSET_RE.findall(text):
+        if url.startswith("http"):
+            external.append(url)
+            continue
+        res = client.get(url, headers={"Accept-Encoding": "br, gzip"})
+        assets += len(res.get_data())
+
+    return {
+        "html": len(html),
+        "html_gz": len(gzip.compress(html)),
+        "inline": inline,
+        "assets": assets,
+        "external": external,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(ROOT, "instance", "loadtest.db"))
+    parser.add_argument("--no-seed", action="store_true")
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        seed_database(args.db, 1, 50, 100)
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    os.environ["RATELIMIT_ENABLED"] = "False"
+    sys.path.insert(0, ROOT)
+    import app as app_module
+
+    app_module.app.config["WTF_CSRF_ENABLED"] = False
+    client = app_module.app.test_client()
+    client.get("/logout")
+
+    rows = [("/login", measure(client, "/login")), ("/", measure(client, "/"))]
+    client.post("/login", data={"email": ACCOUNT_EMAIL.format(0), "password": ACCOUNT_PASSWORD})
+    rows = [(p, measure(client, p)) for p in PAGES if p not in ("/login", "/")] + rows
+
+    header = f"{'page':<26} {'html':>9} {'html gz':>9} {'inline':>9} {'assets':>9} {'first view':>11} {'repeat':>9}"
+    print(header)
+    print("-" * len(header))
+    for path, m in rows:
+        first = m["html_gz"] + m["assets"]
+        print(
+            f"{path:<26} {m['html']:>9} {m['html_gz']:>9} {m['inline']:>9} {m['assets']:>9} "
+            f"{first:>11} {m['html_gz']:>9}"
+        )
+        for url in m["external"]:
+            print(f"    external (not measured): {url}")
+
+
+if __name__ == "__main__":
+    main()
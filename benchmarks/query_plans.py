@@ -0,0 +1,171 @@
+"""Query-plan regression check for the main pages.
+
+Seeds load-test accounts into a throwaway SQLite database (or uses an
+already seeded database given with --database-url), requests every route
+below as a logged-in user, captures each SELECT the route runs and
+EXPLAINs it. The check fails (exit status 1) when:
+
+- a statement scans a whole user-data table instead of searching an index
+  (tables still under --scan-min-rows rows are exempt: with tiny seeds a
+  scan is the plan a planner should pick);
+- a route's plans never use any of the indexes expected for it;
+- on PostgreSQL, a statement's estimated total cost exceeds --max-cost.
+
+Usage:
+    python benchmarks/query_plans.py --tasks 5000 --budgets 5000
+    python benchmarks/query_plans.py --database-url postgresql://localhost/seeded --no-seed -v
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadtest import ACCOUNT_EMAIL, ACCOUNT_PASSWORD, ROOT, seed_database  # noqa: E402
+
+# Tables that grow with user data and must never be scanned in full
+LARGE_TABLES = ("task", "budget", "task_tag", "tag", "archived_task", "archived_task_tag", "budget_summary")
+
+# route -> indexes of which at least one must appear in its plans (() = any)
+ROUTES = {
+    "/dashboard": ("ix_task_user_status_deadline", "ix_task_user_deadline", "ix_task_open_user_deadline"),
+    "/dashboard?date_range=week": ("ix_task_user_deadline", "ix_task_user_status_deadline", "ix_budget_user_date"),
+    "/tasks": ("ix_task_user_deadline", "ix_task_user_status_deadline"),
+    "/tasks?filter=pending&sort=new": ("ix_task_user_status_deadline",),
+    "/tasks?filter=done&priority=High": ("ix_task_user_status_deadline",),
+    "/tasks?filter=overdue": ("ix_task_open_user_deadline", "ix_task_user_status_deadline"),
+    "/tasks?tag=work": ("ix_task_tag_tag_id", "ix_tag_user_lower_name"),
+    "/tasks?filter=done&archived=1": ("ix_archived_task_user_deadline",),
+    "/budgets": ("ix_budget_user_date",),
+    "/budgets?from_date=2020-01-01&to_date=2099-12-31&page=2": ("ix_budget_user_date",),
+    "/budgets?category=Grocery&category=Bills": ("ix_budget_user_category_date",),
+    "/budgets?type=income&from_date=2020-01-01": ("ix_budget_user_type_date", "ix_budget_user_date"),
+    "/budgets?min_amount=400&max_amount=450": ("ix_budget_user_amount",),
+    "/budgets/export": ("ix_budget_user_date",),
+    "/budgets/export?category=Bills&max_amount=100": ("ix_budget_user_category_date", "ix_budget_user_amount"),
+    "/api/analytics/budgets": ("ix_budget_user_date",),
+    "/tags/suggest?q=wo": ("ix_tag_user_lower_name", "ix_tag_user_lower_name_pattern"),
+    # full-text search: driven by the FTS index, only the full-scan check applies
+    "/api/search?q=report": (),
+    "/budgets?q=groc&type=expense": (),
+}
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)\b(?! USING (?:COVERING )?INDEX)")
+# SQLite names aliased tables by their alias in plans ("FROM task t" -> "SCAN t")
+SQL_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)", re.IGNORECASE)
+
+
+def sqlite_plan(conn, statement, parameters):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    lines = [r[-1] for r in rows]
+    aliases = {alias: table for table, alias in SQL_ALIAS.findall(statement)}
+    scans = [aliases.get(m.group(1), m.group(1)) for m in map(SQLITE_FULL_SCAN.match, lines) if m]
+    return "\n".join(lines), scans, None
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _walk(child)
+
+
+def postgres_plan(conn, statement, parameters):
+    raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    nodes = list(_walk(plan))
+    scans = [n.get("Relation Name") for n in nodes if n["Node Type"] == "Seq Scan"]
+    text = "\n".join(f'{n["Node Type"]} {n.get("Relation Name", "")} {n.get("Index Name", "")}' for n in nodes)
+    return text, scans, plan["Total Cost"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(ROOT, "instance", "query_plans.db"))
+    parser.add_argument("--database-url", help="use this (already seeded) database instead of SQLite")
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--tasks", type=int, default=3000)
+    parser.add_argument("--budgets", type=int, default=3000)
+    parser.add_argument("--scan-min-rows", type=int, default=1000,
+                        help="ignore full scans of tables with fewer rows than this")
+    parser.add_argument("--max-cost", type=float, default=5000.0, help="PostgreSQL total cost bound per statement")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    elif not args.no_seed:
+        seed_database(args.db, args.accounts, args.tasks, args.budgets)
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    os.environ["RATELIMIT_ENABLED"] = "False"
+    sys.path.insert(0, ROOT)
+
+    import app as app_module
+    from sqlalchemy import event
+
+    app, db = app_module.app, app_module.db
+    app.config["WTF_CSRF_ENABLED"] = False
+    app.config["CACHE_BACKEND"] = "memory"
+
+    with app.app_context():
+        engine = db.engine
+        dialect = engine.dialect.name
+        explain = postgres_plan if dialect == "postgresql" else sqlite_plan
+        # planner statistics for the seeded data
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+            sizes = {table: conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar() for table in LARGE_TABLES}
+        guarded = {table for table, rows in sizes.items() if rows >= args.scan_min_rows}
+
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            captured.append((statement, parameters))
+
+    client = app.test_client()
+    resp = client.post("/login", data={"email": ACCOUNT_EMAIL.format(0), "password": ACCOUNT_PASSWORD})
+    if resp.status_code != 302:
+        sys.exit("login failed; seed the database first")
+
+    failures = []
+    for route, expected in ROUTES.items():
+        app_module.cache.clear()
+        captured.clear()
+        status = client.get(route).status_code
+        statements = list(captured)
+        if status != 200:
+            failures.append(f"{route}: HTTP {status}")
+            continue
+
+        used = set()
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                text, scans, cost = explain(conn, statement, parameters)
+                used.update(name for name in re.findall(r"\bix_\w+", text))
+                bad = sorted(t for t in scans if t in guarded)
+                if bad:
+                    failures.append(f"{route}: full scan of {', '.join(bad)}\n    {statement.strip()[:200]}")
+                if cost is not None and cost > args.max_cost:
+                    failures.append(f"{route}: cost {cost:.0f} > {args.max_cost:.0f}\n    {statement.strip()[:200]}")
+                if args.verbose:
+                    print(f"--- {route}\n{statement.strip()}\n{text}\n")
+
+        hit = [name for name in expected if name in used]
+        if expected and not hit:
+            failures.append(f"{route}: none of {', '.join(expected)} used (plans used: {', '.join(sorted(used)) or '-'})")
+        print(f"{route:<58} {len(statements):>3} statements  {', '.join(hit) or '-'}")
+
+    if failures:
+        print(f"\n{len(failures)} plan regression(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nAll {len(ROUTES)} routes use the expected indexes ({dialect}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Compare SQLite's stock settings with the 'performance' profile (sqlite_utils).
+
+Two measurements per profile, each on a fresh copy of one seeded database:
+
+- writes: several processes commit single-row transactions while others
+  run the budget page's range queries, straight through sqlite3 with the
+  profile's pragmas; reports commit/read throughput, commit latency and
+  "database is locked" errors;
+- http: the loadtest journeys against gunicorn started with
+  SQLITE_PROFILE set (503/500 responses are counted as errors).
+
+Usage:
+    python benchmarks/sqlite_profile.py --mode writes --writers 4 --readers 4
+    python benchmarks/sqlite_profile.py --mode http --workers 4 --duration 30
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import signal
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadtest import ROOT, percentile, print_report, run_process, seed_database, start_server  # noqa: E402
+
+sys.path.insert(0, ROOT)
+from sqlite_utils import PROFILES, apply_pragmas, sqlite_pragmas  # noqa: E402
+
+# pysqlite's default lock wait, which the 'default' profile keeps
+DEFAULT_TIMEOUT = 5.0
+
+
+def connect(db_path, profile):
+    # config reads DATABASE_URL on import, so load it only once seeding has set it
+    from config import Config
+
+    conn = sqlite3.connect(db_path, timeout=DEFAULT_TIMEOUT)
+    if profile == "performance":
+        apply_pragmas(conn, sqlite_pragmas(vars(Config)))
+    return conn
+
+
+def prepare_copy(base_path, profile):
+    """Fresh copy of the seeded database for one profile run."""
+    path = base_path.replace(".db", f".{profile}.db")
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    src, dst = sqlite3.connect(base_path), sqlite3.connect(path)
+    try:
+        src.backup(dst)
+        # back to a rollback journal: every run starts from SQLite's stock state
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+        src.close()
+    return path
+
+
+def writer(args):
+    db_path, profile, user_id, commits = args
+    conn = connect(db_path, profile)
+    rnd = random.Random(user_id)
+    latencies, locked = [], 0
+    for _ in range(commits):
+        start = time.perf_counter()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO budget (category, amount, currency, type, date, user_id) VALUES (?, ?, ?, ?, ?, ?)",
+                    ("Grocery", round(rnd.uniform(1, 500), 2), "USD", "expense",
+                     datetime.now() - timedelta(days=rnd.randint(0, 365)), user_id),
+                )
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return "write", latencies, locked
+
+
+def reader(args):
+    db_path, profile, user_id, done = args
+    conn = connect(db_path, profile)
+    latencies, locked = [], 0
+    while not done.is_set():
+        start = time.perf_counter()
+        try:
+            conn.execute(
+                "SELECT id, category, amount, type, date FROM budget WHERE user_id = ? AND date >= ? "
+                "ORDER BY date DESC LIMIT 50",
+                (user_id, datetime.now() - timedelta(days=90)),
+            ).fetchall()
+            conn.execute("SELECT type, SUM(amount) FROM budget WHERE user_id = ? GROUP BY type", (user_id,)).fetchall()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return "read", latencies, locked
+
+
+def run_writes(db_path, profile, args):
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as manager, ctx.Pool(args.writers + args.readers) as pool:
+        done = manager.Event()
+        # readers query for as long as the writers are committing
+        reads = [pool.apply_async(reader, ((db_path, profile, 1 + i % args.accounts, done),)) for i in range(args.readers)]
+        started = time.time()
+        writes = [pool.apply_async(writer, ((db_path, profile, 1 + i % args.accounts, args.commits),)) for i in range(args.writers)]
+        write_results = [w.get() for w in writes]
+        elapsed = time.time() - started
+        done.set()
+        read_results = [r.get() for r in reads]
+
+    commit_lat = sorted(l for _, lat, _ in write_results for l in lat)
+    read_lat = sorted(l for _, lat, _ in read_results for l in lat)
+    locked = sum(n for _, _, n in write_results + read_results)
+    return {
+        "commits/s": len(commit_lat) / elapsed,
+        "commit p50 ms": percentile(commit_lat, 50) * 1000,
+        "commit p99 ms": percentile(commit_lat, 99) * 1000,
+        "reads/s": len(read_lat) / elapsed,
+        "read p99 ms": percentile(read_lat, 99) * 1000,
+        "locked errors": locked,
+        "seconds": elapsed,
+    }
+
+
+def run_http(db_path, profile, args):
+    os.environ["SQLITE_PROFILE"] = profile
+    server, base_url = start_server(db_path, args.port, args.workers)
+    try:
+        jobs = [(base_url, i, args.users, args.accounts, args.duration) for i in range(args.processes)]
+        started = time.time()
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            chunks = pool.map(run_process, jobs)
+        elapsed = time.time() - started
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    print(f"\n== http, SQLITE_PROFILE={profile}")
+    print_report([r for chunk in chunks for r in chunk], elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["writes", "http", "both"], default="both")
+    parser.add_argument("--db", default=os.path.join(ROOT, "instance", "sqlite_profile.db"))
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(reversed(PROFILES)))
+    parser.add_argument("--accounts", type=int, default=8)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--budgets-per-user", type=int, default=2000)
+    # writes mode
+    parser.add_argument("--writers", type=int, default=4, help="committing processes")
+    parser.add_argument("--readers", type=int, default=4, help="querying processes")
+    parser.add_argument("--commits", type=int, default=500, help="transactions per writer")
+    # http mode
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    seed_database(args.db, args.accounts, args.tasks_per_user, args.budgets_per_user)
+
+    if args.mode in ("writes", "both"):
+        rows = {profile: run_writes(prepare_copy(args.db, profile), profile, args) for profile in args.profiles}
+        print(f"\n== writes: {args.writers} writer(s) x {args.commits} commit(s), {args.readers} reader(s)")
+        print(f"{'':<16}" + "".join(f"{p:>14}" for p in args.profiles))
+        for metric in next(iter(rows.values())):
+            print(f"{metric:<16}" + "".join(f"{rows[p][metric]:>14.1f}" for p in args.profiles))
+
+    if args.mode in ("http", "both"):
+        for profile in args.profiles:
+            run_http(prepare_copy(args.db, profile), profile, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""In-memory tag -> task bitmap index for the task list tag filter.
+
+Each user's tasks get dense bit positions; every tag is a Python int whose
+set bits are the tasks carrying it, so AND/OR/NOT filters are a few bitwise
+ops followed by one primary-key fetch. Entries are built lazily, versioned
+by ``User.data_version`` and kept in a byte-bounded LRU across users.
+
+Writes made through this process advance an entry in place (see
+``register_tag_index_listeners``); writes from anywhere else leave the entry
+a version behind, so it is dropped and rebuilt on next use.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import attributes
+
+# Rough per-task overhead of the slot dict and id list, for the size bound
+SLOT_BYTES = 100
+
+_TOUCHED_KEY = "tag_index_touched"
+
+
+def parse_tag_filter(raw):
+    """Parse ``"work, home|errands, -done"`` into (groups, excluded).
+
+    Comma-separated clauses must all match (AND); ``|`` separates
+    alternatives within a clause (OR); a leading ``-`` excludes a tag (NOT).
+    Names are lower-cased.
+    """
+    groups, excluded = [], []
+    for clause in (raw or "").split(","):
+        clause = clause.strip()
+        if not clause:
+            continue
+        if clause.startswith("-"):
+            name = clause[1:].strip().lower()
+            if name:
+                excluded.append(name)
+            continue
+        names = [n.strip().lower() for n in clause.split("|") if n.strip()]
+        if names:
+            groups.append(names)
+    return groups, excluded
+
+
+def tags_match(names, groups, excluded):
+    """Whether one task's tag names satisfy a parsed filter (as ``match`` would)."""
+    have = {n.lower() for n in names}
+    return all(have.intersection(g) for g in groups) and not have.intersection(excluded)
+
+
+class UserTagBitmaps:
+    """Bitmaps for one user's tasks."""
+
+    def __init__(self, version, task_ids, pairs):
+        self.version = version
+        self.slots = {}
+        self.ids = []
+        self.universe = 0
+        self.bitmaps = {}
+        self.holes = 0
+        for task_id in task_ids:
+            self.add_task(task_id)
+        for task_id, name in pairs:
+            self.add_tags(task_id, [name])
+
+    def size(self):
+        bits = sum((b.bit_length() + 7) // 8 for b in self.bitmaps.values())
+        return bits + (self.universe.bit_length() + 7) // 8 + SLOT_BYTES * len(self.ids)
+
+    def add_task(self, task_id):
+        if task_id in self.slots:
+            return self.slots[task_id]
+        bit = len(self.ids)
+        self.slots[task_id] = bit
+        self.ids.append(task_id)
+        self.universe |= 1 << bit
+        return bit
+
+    def remove_task(self, task_id):
+        bit = self.slots.pop(task_id, None)
+        if bit is None:
+            return
+        self.clear_tags(task_id, bit)
+        self.universe &= ~(1 << bit)
+        self.ids[bit] = None
+        self.holes += 1
+
+    def add_tags(self, task_id, names):
+        mask = 1 << self.add_task(task_id)
+        for name in names:
+            key = name.lower()
+            self.bitmaps[key] = self.bitmaps.get(key, 0) | mask
+
+    def remove_tags(self, task_id, names):
+        bit = self.slots.get(task_id)
+        if bit is None:
+            return
+        mask = ~(1 << bit)
+        for name in names:
+            key = name.lower()
+            if key in self.bitmaps:
+                self.bitmaps[key] &= mask
+                if not self.bitmaps[key]:
+                    del self.bitmaps[key]
+
+    def clear_tags(self, task_id, bit=None):
+        bit = self.slots.get(task_id) if bit is None else bit
+        if bit is None:
+            return
+        self.remove_tags(task_id, [k for k, b in self.bitmaps.items() if b >> bit & 1])
+
+    def fragmented(self):
+        return self.holes > 1024 and self.holes * 2 > len(self.ids)
+
+    def match(self, groups, excluded):
+        """Task ids satisfying every group (any name in it) and no excluded tag."""
+        mask = self.universe
+        for names in groups:
+            any_of = 0
+            for name in names:
+                any_of |= self.bitmaps.get(name, 0)
+            mask &= any_of
+            if not mask:
+                return []
+        for name in excluded:
+            mask &= ~self.bitmaps.get(name, 0)
+        ids = self.ids
+        # bin() walks the int once; reversed so index == bit position
+        return [ids[i] for i, c in enumerate(bin(mask)[:1:-1]) if c == "1"]
+
+
+def load_user_tags(session, Task, Tag, task_tag, user_id):
+    """(task ids, [(task id, lower tag name)]) for building a user's bitmaps."""
+    task_ids = [r.id for r in session.query(Task.id).filter(Task.user_id == user_id).order_by(Task.id)]
+    pairs = (
+        session.query(task_tag.c.task_id, func.lower(Tag.name))
+        .join(Tag, Tag.id == task_tag.c.tag_id)
+        .filter(Tag.user_id == user_id)
+        .all()
+    )
+    return task_ids, pairs
+
+
+class TagBitmapIndex:
+    """LRU of per-user bitmaps, bounded by their estimated size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version, loader):
+        """The user's bitmaps at ``version``, (re)built with ``loader()`` if needed."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(user_id)
+                return entry
+
+        entry = UserTagBitmaps(version, *loader())
+        with self._lock:
+            self._store(user_id, entry)
+        return entry
+
+    def advance(self, session, user_id, version, change=None):
+        """Apply ``change(entry)`` for a write that moved the user to ``version``.
+
+        Only valid if the entry was current just before this write; otherwise
+        it is dropped. Rolled-back writes drop the entry again.
+        """
+        session.info.setdefault(_TOUCHED_KEY, set()).add(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            if version is None or entry.version != version - 1:
+                self._drop(user_id)
+                return
+            if change is not None:
+                change(entry)
+            entry.version = version
+            if entry.fragmented():
+                self._drop(user_id)
+            else:
+                self._store(user_id, entry)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._drop(user_id)
+
+    def _store(self, user_id, entry):
+        self._drop(user_id)
+        size = entry.size()
+        self._entries[user_id] = entry
+        self._sizes[user_id] = size
+        self._total += size
+        while self._total > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, user_id):
+        if self._entries.pop(user_id, None) is not None:
+            self._total -= self._sizes.pop(user_id)
+
+
+def register_tag_index_listeners(db, index, Task):
+    """Keep ``index`` in step with ORM task/tag writes made in this process.
+
+    Runs after the data-version listener, whose per-user bumped versions it
+    reads from ``session.info["data_versions"]``.
+    """
+
+    @event.listens_for(db.session, "after_flush")
+    def _update_tag_index(session, flush_context):
+        versions = session.info.pop("data_versions", {})
+        if not versions:
+            return
+
+        changes = {}
+        for obj in session.new:
+            if isinstance(obj, Task):
+                added = attributes.get_history(obj, "tags_rel", passive=attributes.PASSIVE_NO_INITIALIZE).added
+                names = [t.name for t in added or ()]
+                changes.setdefault(obj.user_id, []).append(
+                    lambda e, tid=obj.id, names=names: e.add_tags(tid, names)
+                )
+        for obj in session.dirty:
+            if isinstance(obj, Task):
+                hist = attributes.get_history(obj, "tags_rel", passive=attributes.PASSIVE_NO_INITIALIZE)
+                added = [t.name for t in hist.added or ()]
+                removed = [t.name for t in hist.deleted or ()]
+                if added or removed:
+                    def apply(e, tid=obj.id, added=added, removed=removed):
+                        e.remove_tags(tid, removed)
+                        e.add_tags(tid, added)
+                    changes.setdefault(obj.user_id, []).append(apply)
+        for obj in session.deleted:
+            if isinstance(obj, Task):
+                changes.setdefault(obj.user_id, []).append(lambda e, tid=obj.id: e.remove_task(tid))
+
+        for user_id, version in versions.items():
+            steps = changes.get(user_id, [])
+            index.advance(session, user_id, version, lambda e, steps=steps: [s(e) for s in steps])
+
+    @event.listens_for(db.session, "after_commit")
+    def _forget_touched(session):
+        session.info.pop(_TOUCHED_KEY, None)
+
+    @event.listens_for(db.session, "after_rollback")
+    def _drop_touched(session):
+        for user_id in session.info.pop(_TOUCHED_KEY, ()):
+            index.discard(user_id)
+        session.info.pop("data_versions", None)
+
+    return _update_tag_index
@@ -0,0 +1,161 @@
+"""Static asset pipeline.
+
+    python build_assets.py extract   # move inline <style>/<script> blocks out of templates
+    python build_assets.py build     # fingerprint + precompress static/ into static/dist/
+
+``extract`` is a refactoring step: every inline block that contains no Jinja
+is written to ``static/css/<template>.css`` / ``static/js/<template>.js`` and
+replaced in place by a ``<link>``/``<script src>`` tag, so cascade and
+execution order are unchanged. Blocks that still need template data are left
+inline. The Chart.js CDN tag is pointed at the vendored copy.
+
+``build`` copies each CSS/JS file under ``static/`` to
+``static/dist/<path>/<name>.<hash>.<ext>``, writes ``.gz`` (and ``.br`` when
+the ``brotli`` package is installed) next to it and records the mapping in
+``static/dist/manifest.json``, which ``asset_url()`` reads at startup.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional, gzip variants are always produced
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(ROOT, "templates")
+STATIC_DIR = os.path.join(ROOT, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_NAME = "manifest.json"
+
+CHART_JS_CDN = '<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>'
+CHART_JS_VENDORED = "vendor/chart.js/chart.umd.min.js"
+
+BLOCK_RE = re.compile(r"(?P<indent>[ \t]*)<(?P<tag>style|script)(?P<attrs>[^>]*)>(?P<body>.*?)</(?P=tag)>", re.S)
+JINJA_RE = re.compile(r"\{\{|\{%|\{#")
+ASSET_EXTENSIONS = (".css", ".js")
+
+
+# -------------------------------------------------
+# Extract
+# -------------------------------------------------
+def _asset_name(template, tag, index):
+    stem = os.path.splitext(template)[0].lstrip("_")
+    suffix = f"-{index}" if index > 1 else ""
+    if tag == "style":
+        return f"css/{stem}{suffix}.css"
+    return f"js/{stem}{suffix}.js"
+
+
+def _dedent(body):
+    lines = body.strip("\n").splitlines()
+    widths = [len(l) - len(l.lstrip()) for l in lines if l.strip()]
+    cut = min(widths) if widths else 0
+    return "\n".join(l[cut:] for l in lines).rstrip() + "\n"
+
+
+def extract_template(template):
+    """Move the Jinja-free inline blocks of one template into static files."""
+    path = os.path.join(TEMPLATES_DIR, template)
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+
+    counters = {"style": 0, "script": 0}
+    written = []
+
+    def replace(match):
+        tag, attrs, body = match.group("tag"), match.group("attrs"), match.group("body")
+        # keep <script src=...>, JSON data islands and anything templated
+        if tag == "script" and ("src=" in attrs or "type=" in attrs):
+            return match.group(0)
+        if not body.strip() or JINJA_RE.search(body):
+            return match.group(0)
+
+        counters[tag] += 1
+        name = _asset_name(template, tag, counters[tag])
+        out = os.path.join(STATIC_DIR, name)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(_dedent(body))
+        written.append(name)
+
+        indent = match.group("indent")
+        if tag == "style":
+            return f'{indent}<link rel="stylesheet" href="{{{{ asset_url(\'{name}\') }}}}">'
+        return f'{indent}<script src="{{{{ asset_url(\'{name}\') }}}}"></script>'
+
+    updated = BLOCK_RE.sub(replace, source)
+    updated = updated.replace(CHART_JS_CDN, f"<script src=\"{{{{ asset_url('{CHART_JS_VENDORED}') }}}}\"></script>")
+    updated = updated.replace("url_for('static', filename='styles.css')", "asset_url('styles.css')")
+
+    if updated != source:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(updated)
+    return written
+
+
+def extract():
+    for template in sorted(os.listdir(TEMPLATES_DIR)):
+        if not template.endswith(".html"):
+            continue  # emails/ and errors/ keep inline styles (mail clients need them)
+        for name in extract_template(template):
+            print(f"{template} -> static/{name}")
+
+
+# -------------------------------------------------
+# Build
+# -------------------------------------------------
+def _iter_sources():
+    for dirpath, dirnames, filenames in os.walk(STATIC_DIR):
+        if os.path.abspath(dirpath).startswith(DIST_DIR):
+            dirnames[:] = []
+            continue
+        for filename in sorted(filenames):
+            if filename.endswith(ASSET_EXTENSIONS):
+                full = os.path.join(dirpath, filename)
+                yield os.path.relpath(full, STATIC_DIR).replace(os.sep, "/"), full
+
+
+def build():
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifest = {}
+    for rel, full in _iter_sources():
+        with open(full, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        base, ext = os.path.splitext(rel)
+        hashed = f"{base}.{digest}{ext}"
+
+        out = os.path.join(DIST_DIR, hashed)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "wb") as f:
+            f.write(data)
+        with open(out + ".gz", "wb") as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(out + ".br", "wb") as f:
+                f.write(brotli.compress(data, quality=11))
+
+        manifest[rel] = hashed
+        print(f"{rel} -> dist/{hashed}")
+
+    with open(os.path.join(DIST_DIR, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    if brotli is None:
+        print("brotli not installed: only gzip variants were written")
+
+
+if __name__ == "__main__":
+    commands = {"extract": extract, "build": build}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print(__doc__)
+        sys.exit(1)
+    commands[sys.argv[1]]()
@@ -0,0 +1,155 @@
+"""Server-side cache for per-user summaries (dashboard, budget totals).
+
+Keys embed the user's ``data_version``, which is bumped whenever one of
+their tasks or transactions is flushed, so stale entries simply become
+unreachable and are evicted by the bounded LRU.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+from models import now_ist_naive
+
+
+class MemoryCache:
+    """In-process, thread-safe LRU cache with optional per-entry timeouts."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires and expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires = time.time() + timeout if timeout else 0
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Shared cache for multi-worker deployments.
+
+    Bounded eviction is delegated to the Redis server, which should run with
+    ``maxmemory`` and ``maxmemory-policy allkeys-lru``.
+    """
+
+    def __init__(self, url, prefix="tbm:", default_timeout=None):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.default_timeout = default_timeout
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            print(f"Cache get failed: {e}")
+            return None
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, timeout=None):
+        timeout = timeout or self.default_timeout
+        try:
+            self.client.set(self.prefix + key, pickle.dumps(value), ex=timeout)
+        except Exception as e:
+            print(f"Cache set failed: {e}")
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            print(f"Cache delete failed: {e}")
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+def create_cache(config):
+    """Build the cache backend selected by ``CACHE_BACKEND``."""
+    backend = config.get("CACHE_BACKEND", "memory")
+    if backend == "redis":
+        return RedisCache(config["CACHE_REDIS_URL"])
+    return MemoryCache(max_entries=config.get("CACHE_MAX_ENTRIES", 2048))
+
+
+def make_cache_key(*parts):
+    """Join key parts into a flat string key usable by every backend."""
+    return "|".join("" if p is None else str(p) for p in parts)
+
+
+def get_or_compute(cache, key, compute, timeout=None):
+    """Return the cached value for ``key``, computing and storing it on a miss."""
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+    return value
+
+
+def register_version_listeners(db, User, *models):
+    """Bump ``User.data_version`` for every user whose rows in ``models`` are flushed."""
+
+    @event.listens_for(db.session, "after_flush")
+    def _bump_data_versions(session, flush_context):
+        user_ids = set()
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, models) and obj.user_id:
+                user_ids.add(obj.user_id)
+        for obj in session.dirty:
+            if isinstance(obj, models) and obj.user_id and session.is_modified(obj):
+                user_ids.add(obj.user_id)
+        # new versions are left for listeners that follow (the tag bitmap index)
+        session.info["data_versions"] = (
+            bump_data_version(session.connection(), User, user_ids) if user_ids else {}
+        )
+
+    return _bump_data_versions
+
+
+def bump_data_version(connection, User, user_ids):
+    """Increment the data version of the given users (for bulk, non-ORM writes).
+
+    Returns ``{user_id: new_version}``, or ``{}`` where the backend cannot
+    return updated rows.
+    """
+    user_table = User.__table__
+    stmt = (
+        user_table.update()
+        .where(user_table.c.id.in_(list(user_ids)))
+        .values(
+            data_version=user_table.c.data_version + 1,
+            data_changed_at=now_ist_naive(),
+        )
+    )
+    if not connection.dialect.update_returning:
+        connection.execute(stmt)
+        return {}
+    rows = connection.execute(stmt.returning(user_table.c.id, user_table.c.data_version))
+    return {r.id: r.data_version for r in rows}
@@ -0,0 +1,341 @@
+"""Monthly spending caps per category, with alerts at 80% and 100%.
+
+Spend is kept as running totals (CategorySpend: user, category, month ->
+expense total in the user's currency) that every transaction write adjusts,
+instead of re-summing transactions:
+
+- ORM inserts, updates and deletes of transactions become deltas at flush
+  (``register_cap_listeners``); set-based writes pass the affected rows to
+  ``record_spend`` themselves.
+- Before commit, the caps of categories touched in the current month are
+  evaluated. A cap whose spend first reaches a threshold this month is
+  marked ``alert_pending``; ``send_cap_alerts`` emails those.
+
+Amounts are converted at each transaction's date. Virtual occurrences of
+recurring transactions are not stored, so they are added (up to now) when a
+cap is evaluated. Totals of a user who changes currency are rebuilt
+(``rebuild_spend``), as are all totals by the ``caps-rebuild`` command
+after rates are imported.
+"""
+from datetime import date, datetime
+
+from flask_mail import Message
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import attributes
+
+from fx_utils import rate_book
+from models import now_ist_naive
+from read_models import budget_occurrences
+
+THRESHOLDS = (80, 100)
+
+_TOUCHED = "cap_spend_touched"
+_RAISED = "cap_alerts_raised"
+_SPEND_FIELDS = ("user_id", "category", "amount", "currency", "date", "type")
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def threshold_level(spent, cap):
+    """Highest threshold (percent of ``cap``) that ``spent`` has reached, 0 if none."""
+    return max((t for t in THRESHOLDS if spent >= cap * t / 100), default=0)
+
+
+def _committed(obj, key):
+    history = attributes.get_history(obj, key, passive=attributes.PASSIVE_NO_INITIALIZE)
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(obj, key)
+
+
+def _spend_row(obj, committed=False):
+    """(user_id, category, amount, currency, date, type) of a transaction, before or after its changes."""
+    get = _committed if committed else getattr
+    return tuple(get(obj, key) for key in _SPEND_FIELDS)
+
+
+def spend_rows(query, Budget):
+    """The rows of ``query`` as ``record_spend`` takes them (before a set-based write)."""
+    return query.with_entities(*(getattr(Budget, key) for key in _SPEND_FIELDS)).all()
+
+
+def _deltas(connection, session, User, FxRate, added, removed):
+    """``{(user_id, category, month): change}`` of expense totals, in each user's currency."""
+    user_ids = {r[0] for r in added + removed if r[0]}
+    if not user_ids:
+        return {}
+    currencies = dict(connection.execute(select(User.id, User.currency).where(User.id.in_(user_ids))).all())
+    with session.no_autoflush:
+        rates = rate_book(session, FxRate)
+    deltas = {}
+    for rows, sign in ((added, 1), (removed, -1)):
+        for user_id, category, amount, currency, day, kind in rows:
+            if kind != "expense" or not user_id or day is None:
+                continue
+            key = (user_id, category, month_start(day))
+            converted = rates.convert(amount, currency, currencies.get(user_id) or "USD", day)
+            deltas[key] = deltas.get(key, 0.0) + sign * converted
+    return deltas
+
+
+def _apply(connection, CategorySpend, deltas):
+    table = CategorySpend.__table__
+    rows = [
+        {"user_id": u, "category": c, "month": m, "total": d}
+        for (u, c, m), d in deltas.items() if d
+    ]
+    if not rows:
+        return
+    upsert = _UPSERTS.get(connection.dialect.name)
+    if upsert is not None:
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.category, table.c.month],
+            set_={"total": table.c.total + stmt.excluded.total},
+        )
+        connection.execute(stmt, rows)
+        return
+    for row in rows:
+        key = (table.c.user_id == row["user_id"]) & (table.c.category == row["category"]) & (table.c.month == row["month"])
+        if not connection.execute(table.update().where(key).values(total=table.c.total + row["total"])).rowcount:
+            connection.execute(table.insert(), row)
+
+
+def record_spend(session, User, CategorySpend, FxRate, added=(), removed=()):
+    """Adjust running totals for transaction rows written by set-based statements.
+
+    Rows are ``(user_id, category, amount, currency, date, type)``.
+    """
+    connection = session.connection()
+    deltas = _deltas(connection, session, User, FxRate, list(added), list(removed))
+    _apply(connection, CategorySpend, deltas)
+    session.info.setdefault(_TOUCHED, set()).update(deltas)
+
+
+def register_cap_listeners(db, User, Budget, BudgetCap, CategorySpend, FxRate):
+    """Keep CategorySpend current on every flush and evaluate caps before commit."""
+
+    @event.listens_for(db.session, "after_flush")
+    def _track_spend(session, flush_context):
+        added, removed, series = [], [], []
+        for obj in session.new:
+            if isinstance(obj, Budget):
+                added.append(_spend_row(obj))
+                if obj.recurrence:
+                    series.append(added[-1])
+        for obj in session.deleted:
+            if isinstance(obj, Budget):
+                removed.append(_spend_row(obj, committed=True))
+                if _committed(obj, "recurrence"):
+                    series.append(removed[-1])
+        for obj in session.dirty:
+            if isinstance(obj, Budget) and session.is_modified(obj):
+                before, after = _spend_row(obj, committed=True), _spend_row(obj)
+                if before != after:
+                    removed.append(before)
+                    added.append(after)
+                if obj.recurrence or _committed(obj, "recurrence"):
+                    rule = (_committed(obj, "recurrence"), _committed(obj, "recurrence_exdates"))
+                    if before != after or rule != (obj.recurrence, obj.recurrence_exdates):
+                        series.extend((before, after))
+        if added or removed:
+            record_spend(session, User, CategorySpend, FxRate, added, removed)
+        if series:
+            # a changed series also changes this month's virtual occurrences
+            month = month_start(now_ist_naive())
+            session.info.setdefault(_TOUCHED, set()).update((r[0], r[1], month) for r in series)
+
+    @event.listens_for(db.session, "before_commit")
+    def _check_caps(session):
+        session.flush()
+        touched = session.info.pop(_TOUCHED, None)
+        if touched:
+            now = now_ist_naive()
+            month = month_start(now)
+            keys = {(u, c) for u, c, m in touched if m == month}
+            if keys:
+                evaluate_caps(session, User, Budget, BudgetCap, CategorySpend, FxRate, keys, now)
+
+    @event.listens_for(db.session, "after_rollback")
+    def _forget(session):
+        session.info.pop(_TOUCHED, None)
+        session.info.pop(_RAISED, None)
+
+
+def raised_alerts(session):
+    """``[(category, level)]`` of the alerts raised in this session so far (and forgets them)."""
+    return session.info.pop(_RAISED, [])
+
+
+def month_spend(session, User, Budget, CategorySpend, FxRate, user_id, categories, now):
+    """``{category: spend}`` of this month so far: running totals plus due recurring occurrences."""
+    month = month_start(now)
+    rows = session.execute(
+        select(CategorySpend.category, CategorySpend.total).where(
+            CategorySpend.user_id == user_id,
+            CategorySpend.month == month,
+            CategorySpend.category.in_(categories),
+        )
+    ).all()
+    spend = {c: 0.0 for c in categories}
+    spend.update(rows)
+
+    masters = session.query(Budget).filter(
+        Budget.user_id == user_id, Budget.type == "expense", Budget.category.in_(categories),
+    )
+    occurrences = budget_occurrences(masters, Budget, datetime.combine(month, datetime.min.time()), now)
+    if occurrences:
+        currency = session.execute(select(User.currency).where(User.id == user_id)).scalar() or "USD"
+        rates = rate_book(session, FxRate)
+        for t in occurrences:
+            spend[t.category] += rates.convert(t.amount, t.currency, currency, t.date)
+    return spend
+
+
+def evaluate_caps(session, User, Budget, BudgetCap, CategorySpend, FxRate, keys, now):
+    """Raise the alert level of caps on ``keys`` ((user_id, category) pairs) that crossed a threshold.
+
+    Returns the caps marked for an alert (also collected for ``raised_alerts``).
+    """
+    if not keys:
+        return []
+    month = month_start(now)
+    with session.no_autoflush:
+        caps = session.query(BudgetCap).filter(
+            BudgetCap.user_id.in_({u for u, _ in keys}),
+            BudgetCap.category.in_({c for _, c in keys}),
+        ).all()
+        caps = [cap for cap in caps if (cap.user_id, cap.category) in keys]
+        raised = []
+        for user_id in {cap.user_id for cap in caps}:
+            mine = [cap for cap in caps if cap.user_id == user_id]
+            spend = month_spend(session, User, Budget, CategorySpend, FxRate, user_id, [c.category for c in mine], now)
+            for cap in mine:
+                if cap.alert_month != month:
+                    cap.alert_month, cap.alert_level = month, 0
+                level = threshold_level(spend[cap.category], cap.amount)
+                if level > cap.alert_level:
+                    cap.alert_level = level
+                    cap.alert_spent = spend[cap.category]
+                    cap.alert_pending = True
+                    raised.append(cap)
+    session.info.setdefault(_RAISED, []).extend((c.category, c.alert_level) for c in raised)
+    return raised
+
+
+def cap_overview(session, User, Budget, BudgetCap, CategorySpend, FxRate, user_id, now):
+    """The user's caps with this month's spend, as plain data (dashboard / settings)."""
+    caps = session.execute(
+        select(BudgetCap.id, BudgetCap.category, BudgetCap.amount)
+        .where(BudgetCap.user_id == user_id)
+        .order_by(BudgetCap.category)
+    ).all()
+    if not caps:
+        return []
+    spend = month_spend(session, User, Budget, CategorySpend, FxRate, user_id, [c.category for c in caps], now)
+    return [
+        {
+            "id": c.id,
+            "category": c.category,
+            "cap": c.amount,
+            "spent": spend[c.category],
+            "percent": round(100 * spend[c.category] / c.amount) if c.amount else 0,
+            "level": threshold_level(spend[c.category], c.amount),
+        }
+        for c in caps
+    ]
+
+
+def rebuild_spend(session, User, Budget, BudgetSummary, CategorySpend, FxRate, user_ids=None):
+    """Recompute running totals from the stored transactions and compacted summaries (all users by default).
+
+    Returns the number of users rebuilt.
+    """
+    if user_ids is None:
+        user_ids = session.execute(
+            select(Budget.user_id).where(Budget.type == "expense")
+            .union(select(BudgetSummary.user_id).where(BudgetSummary.type == "expense"))
+        ).scalars().all()
+    table = CategorySpend.__table__
+    for user_id in user_ids:
+        session.execute(delete(table).where(table.c.user_id == user_id))
+        connection = session.connection()
+        for stmt in (
+            select(Budget.user_id, Budget.category, Budget.amount, Budget.currency, Budget.date, Budget.type)
+            .where(Budget.user_id == user_id, Budget.type == "expense"),
+            select(BudgetSummary.user_id, BudgetSummary.category, BudgetSummary.amount, BudgetSummary.currency,
+                   BudgetSummary.month, BudgetSummary.type)
+            .where(BudgetSummary.user_id == user_id, BudgetSummary.type == "expense"),
+        ):
+            for chunk in session.execute(stmt.execution_options(yield_per=1000)).partitions():
+                _apply(connection, CategorySpend, _deltas(connection, session, User, FxRate, list(chunk), []))
+    return len(user_ids)
+
+
+def send_cap_alerts(app, db, mail, User, BudgetCap):
+    """Scheduler job: email every pending cap alert, one message per user.
+
+    Returns the number of emails sent.
+    """
+    with app.app_context():
+        try:
+            rows = db.session.execute(
+                select(
+                    BudgetCap.id, BudgetCap.category, BudgetCap.amount, BudgetCap.alert_level,
+                    BudgetCap.alert_spent, BudgetCap.alert_month,
+                    User.id.label("user_id"), User.email, User.currency, User.notifications_enabled,
+                    User.email_verified, User.pending_deletion,
+                )
+                .join(User, User.id == BudgetCap.user_id)
+                .where(BudgetCap.alert_pending.is_(True))
+                .order_by(User.id, BudgetCap.alert_level.desc(), BudgetCap.category)
+            ).all()
+            if not rows:
+                return 0
+
+            by_user = {}
+            for r in rows:
+                by_user.setdefault(r.user_id, []).append(r)
+
+            template = app.jinja_env.get_template('emails/budget_alert.html')
+            sender = app.config['MAIL_DEFAULT_SENDER']
+            done, emails_sent = [], 0
+
+            with mail.connect() as conn:
+                for alerts in by_user.values():
+                    user = alerts[0]
+                    # alerts are dropped, not kept, for users who opted out of email
+                    if user.notifications_enabled and user.email_verified and not user.pending_deletion:
+                        over = any(a.alert_level >= 100 for a in alerts)
+                        msg = Message(
+                            f"Budget {'cap reached' if over else 'alert'}: {', '.join(a.category for a in alerts)}",
+                            sender=sender,
+                            recipients=[user.email],
+                        )
+                        msg.html = template.render(alerts=alerts, currency=user.currency or "USD", user_email=user.email)
+                        try:
+                            conn.send(msg)
+                        except Exception as e:
+                            print(f"Error sending budget alert to {user.email}: {e}")
+                            continue
+                        emails_sent += 1
+                    done.extend(a.id for a in alerts)
+
+            # a plain UPDATE: delivery is not a data change (no cache invalidation)
+            db.session.execute(
+                update(BudgetCap.__table__).where(BudgetCap.__table__.c.id.in_(done)).values(alert_pending=False)
+            )
+            db.session.commit()
+            if emails_sent:
+                print(f"💸 Sent {emails_sent} budget alert email(s)")
+            return emails_sent
+
+        except Exception as e:
+            print(f"Error sending budget alerts: {e}")
+            db.session.rollback()
+            return 0
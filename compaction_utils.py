@@ -0,0 +1,201 @@
+"""Compaction of old budget history into monthly summary rows.
+
+Users who opt in (``User.budget_compact_years``) have their transactions
+from before the month N years back rolled up into one BudgetSummary row per
+month, category, type and currency. Summaries, the dashboard, analytics and
+exports then read a few rows per month instead of rescanning every old
+transaction; the list and exports show the summaries where the rows were.
+
+The originals are stored gzipped (JSON lines) in a ``budget_history_archive`` row
+in the same transaction that deletes them, so nothing depends on the app's
+local disk, which a redeploy may wipe. ``restore_archive`` puts them back
+(under their ids where still free) and drops that archive's summary rows.
+
+- Whole months are compacted, oldest data only.
+- Recurring masters and rows other rows point to stay; a compacted
+  materialized occurrence becomes an exdate of its master, as a deleted
+  one does.
+- Sync clients get tombstones; restored rows come back with a new ``updated_at``.
+- Running category spend (cap_utils) is unchanged: the money was spent
+  either way.
+- Summaries keep the transactions' currency and are converted at the rate
+  of the month's first day rather than each transaction's day.
+"""
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from archive_utils import add_master_exdates
+from cache_utils import bump_data_version
+from models import now_ist_naive
+from read_models import ID_CHUNK_SIZE
+from sync_utils import record_tombstones
+
+YEAR_CHOICES = (1, 2, 3, 5, 10)
+
+
+def compaction_cutoff(now, years):
+    """First day of the month ``years`` back: everything before it is compacted."""
+    return datetime(now.year - years, now.month, 1)
+
+
+def _compactable(Budget, user_id, cutoff):
+    child = aliased(Budget)
+    return (
+        Budget.user_id == user_id,
+        Budget.date < cutoff,
+        Budget.recurrence.is_(None),
+        ~select(child.id).where(child.series_id == Budget.id).exists(),
+    )
+
+
+def _dump(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _load(row, columns):
+    values = {}
+    for column in columns:
+        value = row.get(column.name)
+        if value is not None and column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        values[column.name] = value
+    return values
+
+
+def compact_user(session, User, Budget, BudgetSummary, BudgetArchive, SyncTombstone, user_id, cutoff, now):
+    """Compact one user's transactions dated before ``cutoff``.
+
+    Returns the number of rows compacted; the caller commits.
+    """
+    table = Budget.__table__
+    columns = list(table.columns)
+    name = f"budget-u{user_id}-{now:%Y%m%d%H%M%S%f}"
+
+    totals, ids, slots = {}, [], {}
+    rows = session.execute(
+        select(*columns).where(*_compactable(Budget, user_id, cutoff))
+        .order_by(table.c.date)
+        .execution_options(yield_per=1000)
+    )
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as f:
+        for row in rows:
+            r = row._mapping
+            f.write((json.dumps({c.name: _dump(r[c.name]) for c in columns}) + "\n").encode("utf-8"))
+            key = (date(r["date"].year, r["date"].month, 1), r["category"], r["type"], r["currency"])
+            amount, count = totals.get(key, (0.0, 0))
+            totals[key] = (amount + r["amount"], count + 1)
+            ids.append(r["id"])
+            if r["series_id"]:
+                slots.setdefault(r["series_id"], []).append(r["occurrence_at"])
+    if not ids:
+        return 0
+
+    session.execute(BudgetArchive.__table__.insert().values(
+        user_id=user_id, name=name, count=len(ids), created_at=now, data=buffer.getvalue(),
+    ))
+    add_master_exdates(session, Budget, slots)
+    session.execute(BudgetSummary.__table__.insert(), [
+        {"user_id": user_id, "month": month, "category": category, "type": kind, "currency": currency,
+         "amount": round(amount, 2), "count": count, "archive": name}
+        for (month, category, kind, currency), (amount, count) in totals.items()
+    ])
+    connection = session.connection()
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        session.execute(table.delete().where(table.c.id.in_(chunk)))
+        record_tombstones(connection, SyncTombstone, user_id, "budget", chunk, now)
+    bump_data_version(connection, User, [user_id])
+    return len(ids)
+
+
+def user_archives(session, BudgetArchive, user_id):
+    """Names of the user's archives, oldest first."""
+    return session.execute(
+        select(BudgetArchive.name).where(BudgetArchive.user_id == user_id).order_by(BudgetArchive.id)
+    ).scalars().all()
+
+
+def restore_archive(session, User, Budget, BudgetSummary, BudgetArchive, name):
+    """Put the transactions of archive ``name`` back and drop it with its summary rows.
+
+    Returns the number of rows restored, or None if there is no such
+    archive. The caller commits.
+    """
+    data = session.execute(select(BudgetArchive.data).where(BudgetArchive.name == name)).scalar()
+    if data is None:
+        return None
+    table = Budget.__table__
+    columns = list(table.columns)
+    text = gzip.decompress(data).decode("utf-8")
+    rows = [_load(json.loads(line), columns) for line in text.splitlines() if line.strip()]
+
+    ids = [r["id"] for r in rows]
+    taken, masters = set(), set()
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        taken.update(session.execute(select(Budget.id).where(Budget.id.in_(chunk))).scalars())
+    series = list({r["series_id"] for r in rows if r["series_id"]})
+    for start in range(0, len(series), ID_CHUNK_SIZE):
+        chunk = series[start:start + ID_CHUNK_SIZE]
+        masters.update(session.execute(select(Budget.id).where(Budget.id.in_(chunk))).scalars())
+
+    now = now_ist_naive()
+    keep_id, new_id = [], []
+    for r in rows:
+        r["updated_at"] = now
+        if r["series_id"] not in masters:
+            r["series_id"] = None
+        if r["id"] in taken:
+            del r["id"]
+            new_id.append(r)
+        else:
+            keep_id.append(r)
+    for group in (keep_id, new_id):
+        if group:
+            session.execute(table.insert(), group)
+
+    summary, archive = BudgetSummary.__table__, BudgetArchive.__table__
+    session.execute(summary.delete().where(summary.c.archive == name))
+    session.execute(archive.delete().where(archive.c.name == name))
+    user_ids = {r["user_id"] for r in rows}
+    if user_ids:
+        bump_data_version(session.connection(), User, list(user_ids))
+    return len(rows)
+
+
+def compact_budget_history(app, db, User, Budget, BudgetSummary, BudgetArchive, SyncTombstone):
+    """Scheduler job: compact the history of every user who opted in.
+
+    Each user is one transaction. Returns the number of transactions compacted.
+    """
+    with app.app_context():
+        now = now_ist_naive()
+        compacted = 0
+        users = db.session.execute(
+            select(User.id, User.budget_compact_years)
+            .where(User.budget_compact_years > 0, User.pending_deletion.is_(False))
+        ).all()
+        for user_id, years in users:
+            cutoff = compaction_cutoff(now, years)
+            if not db.session.execute(
+                select(Budget.id).where(*_compactable(Budget, user_id, cutoff)).limit(1)
+            ).first():
+                continue
+            try:
+                compacted += compact_user(
+                    db.session, User, Budget, BudgetSummary, BudgetArchive, SyncTombstone, user_id, cutoff, now,
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error compacting budget history of user {user_id}: {e}")
+
+        if compacted:
+            print(f"🗜️ Compacted {compacted} old transaction(s) into monthly summaries")
+        return compacted
@@ -27,6 +27,23 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Optional read replica (see replica_utils): read-only pages and the
+    # notification scan query it; a browser stays on the primary for
+    # REPLICA_STICKY_SECONDS after its own writes
+    replica_url = os.environ.get('REPLICA_DATABASE_URL')
+    if replica_url and replica_url.startswith('postgres://'):
+        replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_BINDS = {'replica': replica_url} if replica_url else {}
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+    
+    # SQLite installs (see sqlite_utils): 'performance' = WAL, tuned pragmas
+    # and an in-process writer queue; 'default' = SQLite's stock settings
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'performance')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 32 * 1024))  # per connection
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_MAINTENANCE_MINUTES = int(os.environ.get('SQLITE_MAINTENANCE_MINUTES', 15))
+    
     # Email configuration (Flask-Mail)
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
@@ -41,9 +58,73 @@ class Config:
     # Security settings
     SECURITY_PASSWORD_SALT = os.environ.get('SECURITY_PASSWORD_SALT') or 'dev-salt-change-in-production'
     
+    # Rate limiting (Flask-Limiter); disable for local load testing
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True').lower() == 'true'
+    
     # Server configuration for url_for with _external=True
     SERVER_NAME = os.environ.get('SERVER_NAME')  # e.g., 'localhost:8000' for dev
     PREFERRED_URL_SCHEME = os.environ.get('PREFERRED_URL_SCHEME', 'http')  # 'https' for production
     
+    # Server-side cache for dashboard/budget summaries ('memory' or 'redis')
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 2048))
+    # Dashboard counts depend on the current time (overdue, due soon), so expire them
+    DASHBOARD_CACHE_SECONDS = int(os.environ.get('DASHBOARD_CACHE_SECONDS', 60))
+    
+    # Maximum number of ids/items accepted by one bulk API request
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+    
+    # Account deletion: accounts with more task+budget rows than this are purged
+    # in the background, ACCOUNT_PURGE_CHUNK_SIZE rows per transaction
+    ACCOUNT_PURGE_INLINE_LIMIT = int(os.environ.get('ACCOUNT_PURGE_INLINE_LIMIT', 5000))
+    ACCOUNT_PURGE_CHUNK_SIZE = int(os.environ.get('ACCOUNT_PURGE_CHUNK_SIZE', 1000))
+    ACCOUNT_PURGE_INTERVAL_MINUTES = int(os.environ.get('ACCOUNT_PURGE_INTERVAL_MINUTES', 30))
+    
+    # How often tags no longer used by any task are pruned
+    TAG_GC_INTERVAL_HOURS = int(os.environ.get('TAG_GC_INTERVAL_HOURS', 24))
+    # Memory budget (bytes) for the per-user tag bitmaps behind the task tag filter
+    TAG_INDEX_MAX_BYTES = int(os.environ.get('TAG_INDEX_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Historical FX rates: optional date,currency,rate CSV loaded into an empty
+    # fx_rate table at startup (none is shipped; or load one any time with
+    # `flask fx-import rates.csv`), plus a provider refresh of today's rates
+    FX_SEED_CSV = os.environ.get('FX_SEED_CSV')
+    FX_REFRESH_INTERVAL_HOURS = int(os.environ.get('FX_REFRESH_INTERVAL_HOURS', 24))
+    
+    # Recurring tasks: virtual occurrences are expanded from this many days
+    # back (still-open past ones) to this many days ahead in task views
+    TASK_OCCURRENCE_LOOKBACK_DAYS = int(os.environ.get('TASK_OCCURRENCE_LOOKBACK_DAYS', 7))
+    TASK_OCCURRENCE_HORIZON_DAYS = int(os.environ.get('TASK_OCCURRENCE_HORIZON_DAYS', 30))
+    
+    # iCalendar task feed: recurring tasks are expanded up to this many days
+    # ahead; bodies up to CALENDAR_FEED_CACHE_MAX_BYTES are cached per data version
+    CALENDAR_FEED_HORIZON_DAYS = int(os.environ.get('CALENDAR_FEED_HORIZON_DAYS', 90))
+    CALENDAR_FEED_CACHE_MAX_BYTES = int(os.environ.get('CALENDAR_FEED_CACHE_MAX_BYTES', 256 * 1024))
+    
+    # Delta sync API: rows per stream per response; how far cursors stay behind
+    # now (late commits); how long deletes are remembered for clients
+    SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', 500))
+    SYNC_SETTLE_SECONDS = int(os.environ.get('SYNC_SETTLE_SECONDS', 5))
+    SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', 30))
+    
+    # PostgreSQL: once `flask budget-partition-migrate` has partitioned budget
+    # by month, partitions are created this many months ahead by a periodic job
+    BUDGET_PARTITION_MONTHS_AHEAD = int(os.environ.get('BUDGET_PARTITION_MONTHS_AHEAD', 3))
+    BUDGET_PARTITION_INTERVAL_HOURS = int(os.environ.get('BUDGET_PARTITION_INTERVAL_HOURS', 24))
+    
+    # Completed tasks untouched for this many days are moved to the archive
+    # table (0 disables), TASK_ARCHIVE_BATCH_SIZE tasks per transaction
+    TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get('TASK_ARCHIVE_AFTER_DAYS', 90))
+    TASK_ARCHIVE_BATCH_SIZE = int(os.environ.get('TASK_ARCHIVE_BATCH_SIZE', 500))
+    TASK_ARCHIVE_INTERVAL_HOURS = int(os.environ.get('TASK_ARCHIVE_INTERVAL_HOURS', 24))
+    
+    # Budget history compaction (opt-in per user); originals are kept gzipped
+    # in the database (budget_history_archive) for restores
+    BUDGET_COMPACT_INTERVAL_HOURS = int(os.environ.get('BUDGET_COMPACT_INTERVAL_HOURS', 24))
+    
+    # Monthly category caps: alerts raised by writes are emailed this often
+    BUDGET_ALERT_INTERVAL_MINUTES = int(os.environ.get('BUDGET_ALERT_INTERVAL_MINUTES', 5))
+    
     # Notification scheduler configuration
     NOTIFICATION_CHECK_INTERVAL_HOURS = int(os.environ.get('NOTIFICATION_CHECK_INTERVAL_HOURS', 1))  # Check every 1 hour by default
\ No newline at end of file
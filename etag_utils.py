@@ -0,0 +1,71 @@
+"""Conditional GET helpers (weak ETags / Last-Modified) for AJAX partials and JSON.
+
+Views compute an ETag from cheap inputs (the user's data version, request
+arguments, ...) and call ``not_modified()`` *before* running their queries,
+so a matching ``If-None-Match`` is answered with an empty 304.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from flask import current_app, request, session
+
+from cache_utils import make_cache_key
+from models import IST
+
+
+def make_etag(*parts):
+    """Hash arbitrary key parts into an opaque ETag value."""
+    return hashlib.sha1(make_cache_key(*parts).encode("utf-8")).hexdigest()
+
+
+def _csrf_window():
+    limit = current_app.config.get("WTF_CSRF_TIME_LIMIT") or 3600
+    return max(limit // 2, 1)
+
+
+def csrf_epoch():
+    """Key part for responses that embed a CSRF token.
+
+    Changes with the session's CSRF secret and twice per token lifetime, so a
+    revalidated cached copy never carries an expired token.
+    """
+    return make_cache_key(session.get("csrf_token"), int(time.time() // _csrf_window()))
+
+
+def csrf_last_modified(changed_at):
+    """Last-Modified for CSRF-bearing responses: never older than the current epoch."""
+    window = _csrf_window()
+    epoch_start = datetime.fromtimestamp(time.time() // window * window, IST).replace(tzinfo=None)
+    return max(changed_at, epoch_start) if changed_at else epoch_start
+
+
+def _to_http_date(dt):
+    """Naive IST datetime -> aware UTC datetime, truncated to whole seconds."""
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=IST, microsecond=0).astimezone(timezone.utc)
+
+
+def not_modified(etag, last_modified=None):
+    """Return a 304 response if the client's validators match, else None."""
+    if request.if_none_match:
+        if not request.if_none_match.contains_weak(etag):
+            return None
+    elif last_modified is not None and request.if_modified_since:
+        if _to_http_date(last_modified) > request.if_modified_since:
+            return None
+    else:
+        return None
+
+    response = current_app.response_class(status=304)
+    return add_validators(response, etag, last_modified)
+
+
+def add_validators(response, etag, last_modified=None):
+    """Attach a weak ETag, Last-Modified and a revalidate-always Cache-Control."""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = _to_http_date(last_modified)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
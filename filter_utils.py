@@ -0,0 +1,158 @@
+"""Transaction filters: date range, categories, type, amount range and text.
+
+``BudgetFilter.from_args`` reads them from a query string and normalizes
+them: invalid values are dropped, categories sorted and de-duplicated,
+amount bounds ordered, text reduced to lower-cased search terms. Any two
+spellings of the same filter therefore share one ``key``, which is what the
+summary cache is keyed on.
+
+Amounts are compared as stored, in each transaction's own currency (as the
+table shows them). Text matches the category through the full-text index
+(see search_utils).
+
+Monthly summaries of compacted history are matched on their month: a month
+the date range covers even partly is included on either side. An amount
+range describes single transactions, which a summary cannot answer, so
+summaries are left out while one is set.
+"""
+import math
+from datetime import datetime, timedelta
+
+from search_utils import parse_terms, text_matches, transaction_match
+
+TYPES = ("income", "expense")
+
+
+def _parse_day(value):
+    """A YYYY-MM-DD value as a datetime, or None if missing or invalid."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d") if value else None
+    except ValueError:
+        return None
+
+
+def _parse_amount(value):
+    try:
+        amount = round(float(value), 2)
+    except (TypeError, ValueError):
+        return None
+    return amount if math.isfinite(amount) else None
+
+
+class BudgetFilter:
+    """A normalized transaction filter; attributes are None/empty when not filtering."""
+
+    __slots__ = ("from_date", "to_date", "categories", "type", "min_amount", "max_amount", "terms")
+
+    def __init__(self, from_date=None, to_date=None, categories=(), type=None,
+                 min_amount=None, max_amount=None, terms=()):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.categories = tuple(sorted({c.strip() for c in categories if c and c.strip()}))
+        self.type = type if type in TYPES else None
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            min_amount, max_amount = max_amount, min_amount
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.terms = tuple(t.lower() for t in terms)
+
+    @classmethod
+    def from_args(cls, args):
+        """From request args (a MultiDict: ``category`` may repeat)."""
+        return cls(
+            from_date=_parse_day(args.get("from_date")),
+            to_date=_parse_day(args.get("to_date")),
+            categories=args.getlist("category"),
+            type=args.get("type"),
+            min_amount=_parse_amount(args.get("min_amount")),
+            max_amount=_parse_amount(args.get("max_amount")),
+            terms=parse_terms(args.get("q")),
+        )
+
+    def query_args(self):
+        """Canonical query-string arguments (for url_for) reproducing this filter."""
+        args = {
+            "from_date": self.from_date.strftime("%Y-%m-%d") if self.from_date else None,
+            "to_date": self.to_date.strftime("%Y-%m-%d") if self.to_date else None,
+            "category": list(self.categories) or None,
+            "type": self.type,
+            "min_amount": f"{self.min_amount:.2f}" if self.min_amount is not None else None,
+            "max_amount": f"{self.max_amount:.2f}" if self.max_amount is not None else None,
+            "q": " ".join(self.terms) or None,
+        }
+        return {k: v for k, v in args.items() if v is not None}
+
+    def key(self):
+        """Canonical string form, equal for equal filters."""
+        return "&".join(
+            f"{k}={','.join(v) if isinstance(v, list) else v}" for k, v in sorted(self.query_args().items())
+        )
+
+    @property
+    def active(self):
+        return bool(self.query_args())
+
+    @property
+    def window(self):
+        """[start, end) of the date range, for expanding recurring transactions."""
+        start = self.from_date or datetime.min
+        end = self.to_date + timedelta(seconds=1) if self.to_date else datetime.max
+        return start, end
+
+    def apply_attributes(self, query, Budget):
+        """Filter ``query`` on everything but the date (what recurring masters share with their occurrences)."""
+        if self.categories:
+            query = query.filter(Budget.category.in_(self.categories))
+        if self.type:
+            query = query.filter(Budget.type == self.type)
+        if self.min_amount is not None:
+            query = query.filter(Budget.amount >= self.min_amount)
+        if self.max_amount is not None:
+            query = query.filter(Budget.amount <= self.max_amount)
+        if self.terms:
+            query = query.filter(transaction_match(Budget, self.terms))
+        return query
+
+    def apply(self, query, Budget):
+        query = self.apply_attributes(query, Budget)
+        if self.from_date:
+            query = query.filter(Budget.date >= self.from_date)
+        if self.to_date:
+            query = query.filter(Budget.date <= self.to_date)
+        return query
+
+    def apply_summaries(self, query, BudgetSummary):
+        """Filter a BudgetSummary query; text terms are left to ``matches``.
+
+        Returns None when no summary can match (amount bounds apply to single
+        transactions, which a monthly total no longer tells apart).
+        """
+        if self.min_amount is not None or self.max_amount is not None:
+            return None
+        if self.categories:
+            query = query.filter(BudgetSummary.category.in_(self.categories))
+        if self.type:
+            query = query.filter(BudgetSummary.type == self.type)
+        if self.from_date:
+            # a partially covered month is included, as at the to_date end
+            query = query.filter(BudgetSummary.month >= self.from_date.date().replace(day=1))
+        if self.to_date:
+            query = query.filter(BudgetSummary.month <= self.to_date.date())
+        return query
+
+    def matches(self, t):
+        """Whether one transaction (a row, an occurrence or a summary) passes the filter."""
+        from_date = self.from_date
+        if from_date is not None and getattr(t, "compacted", None):
+            # a summary (dated the 1st) stands for its whole month
+            from_date = datetime(from_date.year, from_date.month, 1)
+        return (
+            t.date is not None
+            and (from_date is None or t.date >= from_date)
+            and (self.to_date is None or t.date <= self.to_date)
+            and (not self.categories or t.category in self.categories)
+            and (not self.type or t.type == self.type)
+            and (self.min_amount is None or t.amount >= self.min_amount)
+            and (self.max_amount is None or t.amount <= self.max_amount)
+            and (not self.terms or text_matches(t.category, self.terms))
+        )
@@ -4,6 +4,16 @@ from wtforms import DecimalField, SelectField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, NumberRange
 from wtforms.fields import DateTimeLocalField, DateField
 
+REPEAT_CHOICES = [
+    ('', 'Does not repeat'),
+    ('daily', 'Daily'),
+    ('weekdays', 'Every weekday'),
+    ('weekly', 'Weekly'),
+    ('biweekly', 'Every 2 weeks'),
+    ('monthly', 'Monthly'),
+    ('yearly', 'Yearly'),
+]
+
 class LoginForm(FlaskForm):
     email = StringField('Email', validators=[DataRequired(), Email(), Length(max=150)])
     password = PasswordField('Password', validators=[DataRequired(), Length(min=6)])
@@ -41,6 +51,8 @@ class TaskForm(FlaskForm):
 
     tags = StringField('Tags (comma-separated)', validators=[Length(max=200)])
 
+    recurrence = SelectField('Repeat', choices=REPEAT_CHOICES, default='', validate_choice=False)
+
     submit = SubmitField('Save Task')
 
 
@@ -63,4 +75,6 @@ class BudgetForm(FlaskForm):
 
     date = DateField('Date', format='%Y-%m-%d')
 
+    recurrence = SelectField('Repeat', choices=REPEAT_CHOICES, default='', validate_choice=False)
+
     submit = SubmitField('Add Transaction')
@@ -0,0 +1,199 @@
+"""Dated FX rates and as-of currency conversion.
+
+``fx_rate`` stores, per currency and day, how many units of that currency
+one USD bought. Rows are insert-only: once a day's rate is stored it never
+changes, so converting a past transaction always gives the same result and
+can be cached indefinitely.
+
+Rates come from an offline CSV (``date,currency,rate``; none is shipped:
+set FX_SEED_CSV or run ``flask fx-import``) and from a daily provider
+refresh. Lookups use an in-memory ``RateBook`` holding a sorted
+series per currency: ``bisect`` for single conversions and NumPy
+``searchsorted`` for whole columns.
+"""
+import csv
+import threading
+from bisect import bisect_right
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import func, select
+
+from models import now_ist_naive
+
+INSERT_CHUNK_SIZE = 1000
+
+
+def _day(value):
+    """Ordinal day number for a date/datetime."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class RateBook:
+    """Sorted per-currency rate series loaded from fx_rate.
+
+    The rate used for a day is the latest one on or before it; days before
+    the first known rate use the earliest one. USD is always 1.0. Unknown
+    currencies convert 1:1, as the app always has without rates.
+    """
+
+    def __init__(self, version, rows):
+        self.version = version
+        series = {}
+        for currency, day, rate in rows:
+            days, rates = series.setdefault(currency, ([], []))
+            days.append(_day(day))
+            rates.append(rate)
+        self.days = {c: np.array(d, dtype=np.int64) for c, (d, _) in series.items()}
+        self.rates = {c: np.array(r, dtype=np.float64) for c, (_, r) in series.items()}
+        self._lists = series
+
+    def __bool__(self):
+        return bool(self._lists)
+
+    def currencies(self):
+        return sorted(set(self._lists) | {"USD"})
+
+    def rate(self, currency, day):
+        """Units of ``currency`` per USD on ``day`` (None if unknown)."""
+        if currency == "USD":
+            return 1.0
+        series = self._lists.get(currency)
+        if not series:
+            return None
+        days, rates = series
+        return rates[max(bisect_right(days, _day(day)) - 1, 0)]
+
+    def convert(self, amount, from_cur, to_cur, day):
+        """Convert ``amount`` at the rates in force on ``day``."""
+        if from_cur == to_cur or not from_cur or not to_cur:
+            return float(amount)
+        rf, rt = self.rate(from_cur, day), self.rate(to_cur, day)
+        if not rf or not rt:
+            return float(amount)
+        return float(amount) / rf * rt
+
+    def _rates_for(self, currency, ordinals):
+        if currency == "USD" or currency not in self.days:
+            return None
+        index = np.searchsorted(self.days[currency], ordinals, side="right") - 1
+        return self.rates[currency][np.maximum(index, 0)]
+
+    def convert_many(self, amounts, currencies, days, to_cur):
+        """Vectorised ``convert`` over columns (days as numpy datetime64[D])."""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        ordinals = days.astype(np.int64) + date(1970, 1, 1).toordinal()
+        currencies = np.asarray(currencies, dtype=object)
+        out = amounts.copy()
+
+        to_rates = self._rates_for(to_cur, ordinals)
+        if to_cur != "USD" and to_rates is None:
+            to_rates = np.full(len(amounts), np.nan)
+        for currency in set(currencies.tolist()):
+            if currency == to_cur or not currency:
+                continue
+            mask = currencies == currency
+            from_rates = self._rates_for(currency, ordinals[mask])
+            if currency != "USD" and from_rates is None:
+                continue
+            usd = amounts[mask] / (1.0 if from_rates is None else from_rates)
+            converted = usd * (1.0 if to_rates is None else to_rates[mask])
+            # unknown target currency: leave amounts as they are
+            out[mask] = np.where(np.isnan(converted), amounts[mask], converted)
+        return out
+
+
+_book = {"book": None}
+_book_lock = threading.Lock()
+
+
+def rate_book(session, FxRate):
+    """The current RateBook, reloaded whenever fx_rate has gained rows.
+
+    Rows are insert-only, so ``max(id)`` identifies the table contents.
+    """
+    version = session.execute(select(func.max(FxRate.id))).scalar() or 0
+    book = _book["book"]
+    if book is not None and book.version == version:
+        return book
+
+    with _book_lock:
+        book = _book["book"]
+        if book is None or book.version != version:
+            rows = session.execute(
+                select(FxRate.currency, FxRate.date, FxRate.rate).order_by(FxRate.currency, FxRate.date)
+            ).all()
+            book = RateBook(version, rows)
+            _book["book"] = book
+    return book
+
+
+def import_rates(session, FxRate, rows, source):
+    """Bulk-insert ``(day, currency, rate)`` rows, skipping days already stored.
+
+    Returns the number of rows inserted; the caller commits.
+    """
+    wanted = {}
+    for day, currency, rate in rows:
+        currency = currency.strip().upper()
+        if isinstance(day, datetime):
+            day = day.date()
+        if currency and rate and rate > 0:
+            wanted.setdefault((currency, day), float(rate))
+    if not wanted:
+        return 0
+
+    days = [d for _, d in wanted]
+    existing = {
+        (r.currency, r.date) for r in session.execute(
+            select(FxRate.currency, FxRate.date).where(
+                FxRate.currency.in_({c for c, _ in wanted}),
+                FxRate.date.between(min(days), max(days)),
+            )
+        )
+    }
+    new_rows = [
+        {"currency": c, "date": d, "rate": r, "source": source}
+        for (c, d), r in sorted(wanted.items())
+        if (c, d) not in existing
+    ]
+    table = FxRate.__table__
+    for start in range(0, len(new_rows), INSERT_CHUNK_SIZE):
+        session.execute(table.insert(), new_rows[start:start + INSERT_CHUNK_SIZE])
+    return len(new_rows)
+
+
+def read_rates_csv(path):
+    """Yield ``(date, currency, rate)`` from a CSV with date,currency,rate columns."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                yield (
+                    datetime.strptime(row["date"].strip(), "%Y-%m-%d").date(),
+                    row["currency"],
+                    float(row["rate"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+
+
+def refresh_rates(app, db, FxRate, fetch):
+    """Scheduler job: store today's provider rates (``fetch()`` -> {currency: rate per USD})."""
+    with app.app_context():
+        try:
+            rates = fetch() or {}
+            today = now_ist_naive().date()
+            inserted = import_rates(
+                db.session, FxRate, [(today, c, r) for c, r in rates.items() if c != "USD"], "provider"
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error refreshing FX rates: {e}")
+            return 0
+
+        if inserted:
+            print(f"💱 Stored {inserted} FX rate(s) for {today}")
+        return inserted
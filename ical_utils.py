@@ -0,0 +1,132 @@
+"""iCalendar (RFC 5545) feed of a user's pending tasks.
+
+Each pending task becomes a 30-minute VEVENT at its deadline, with the
+task's priority and tags. Recurring tasks are expanded into one event per
+virtual occurrence inside the feed window, like the task list does, so
+calendar clients need no RRULE support.
+
+The body is produced in chunks (``feed_chunks``) so a large feed never has
+to be built in one piece; tags are looked up per chunk of tasks.
+"""
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from models import IST
+from read_models import ID_CHUNK_SIZE, materialized_slots, tag_names_by_task
+from recurrence_utils import expand, to_stamp
+
+EVENT_DURATION = "PT30M"
+
+# iCalendar PRIORITY: 1 = highest, 9 = lowest
+PRIORITIES = {"High": 1, "Medium": 5, "Low": 9}
+
+
+def new_calendar_token():
+    return secrets.token_urlsafe(32)
+
+
+def _utc(dt):
+    """Naive IST datetime -> iCalendar UTC form (20261019T043000Z)."""
+    return dt.replace(tzinfo=IST).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def escape_text(value):
+    return (
+        (value or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Fold a content line at 75 octets (continuation lines start with a space)."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _event(uid, row, deadline, tags, stamp):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_utc(deadline)}",
+        f"DURATION:{EVENT_DURATION}",
+        f"SUMMARY:{escape_text(row.title)}",
+        f"PRIORITY:{PRIORITIES.get(row.priority, 5)}",
+    ]
+    if row.description:
+        lines.append(f"DESCRIPTION:{escape_text(row.description)}")
+    if tags:
+        lines.append("CATEGORIES:" + ",".join(escape_text(t) for t in tags))
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def feed_chunks(query, Task, Tag, task_tag, start, end, now, domain):
+    """Yield the calendar for the user's tasks in ``query`` as text chunks.
+
+    Pending tasks are listed whatever their deadline; occurrences of
+    recurring tasks only within [start, end).
+    """
+    stamp = _utc(now)
+    yield "".join(fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:-//{domain}//Task & Budget Manager//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:Tasks",
+    ))
+
+    columns = (Task.id, Task.title, Task.description, Task.deadline, Task.priority, Task.recurrence)
+    rows = query.filter(Task.status == "pending").with_entities(*columns).order_by(Task.deadline, Task.id)
+
+    chunk = []
+
+    def flush(chunk):
+        tags = tag_names_by_task(query.session, [r.id for r in chunk], Tag, task_tag)
+        return "".join(
+            _event(f"task-{r.id}@{domain}", r, r.deadline, tags.get(r.id), stamp) for r in chunk
+        )
+
+    for row in rows.yield_per(ID_CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) == ID_CHUNK_SIZE:
+            yield flush(chunk)
+            chunk = []
+    if chunk:
+        yield flush(chunk)
+
+    # later occurrences of recurring tasks (any status: it describes the first one only)
+    masters = query.filter(Task.recurrence.isnot(None)).with_entities(*columns, Task.recurrence_exdates).all()
+    if masters:
+        ids = [m.id for m in masters]
+        skip = materialized_slots(query.session, Task, ids)
+        tags = tag_names_by_task(query.session, ids, Tag, task_tag)
+        for m in masters:
+            events = [
+                _event(f"task-{m.id}-{to_stamp(dt)}@{domain}", m, dt, tags.get(m.id), stamp)
+                for dt in expand(m, "deadline", start, end, skip.get(m.id, ()))
+            ]
+            if events:
+                yield "".join(events)
+
+    yield fold("END:VCALENDAR")
+
+
+def feed_window(today, lookback_days, horizon_days):
+    """[start, end) of expanded occurrences for a feed generated on ``today``."""
+    midnight = datetime.combine(today, datetime.min.time())
+    return midnight - timedelta(days=lookback_days), midnight + timedelta(days=horizon_days + 1)
@@ -4,6 +4,9 @@ from datetime import datetime, timedelta, timezone
 # Timezone: IST (UTC +5:30)
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# updated_at of rows written before the column existed
+SYNC_EPOCH = '2000-01-01 00:00:00'
+
 def now_ist_naive():
     """Return IST datetime (naive so it matches DB naive DateTime)."""
     return datetime.now(IST).replace(tzinfo=None)
@@ -25,6 +28,17 @@ def create_models(db):
         # Task notification preferences
         notifications_enabled = db.Column(db.Boolean, default=True, nullable=False)
         notification_hours = db.Column(db.Integer, default=24, nullable=False)
+        # 'digest': one email per sweep listing every due task; 'immediate': one per task
+        notification_mode = db.Column(db.String(10), default='digest', nullable=False, server_default='digest')
+        # Bumped on every task/budget change; used to key per-user caches
+        data_version = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+        data_changed_at = db.Column(db.DateTime, nullable=True)
+        # Set when a large account is deleted; rows are purged in the background
+        pending_deletion = db.Column(db.Boolean, default=False, nullable=False, server_default='0')
+        # Secret in the iCalendar feed URL (None = feed disabled)
+        calendar_token = db.Column(db.String(64), nullable=True, unique=True, index=True)
+        # Transactions older than this many years are compacted (None = never; see compaction_utils)
+        budget_compact_years = db.Column(db.Integer, nullable=True)
 
         tasks = db.relationship('Task', backref='user', lazy=True, cascade='all, delete-orphan')
         budgets = db.relationship('Budget', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -42,6 +56,16 @@ def create_models(db):
         created_at = db.Column(db.DateTime, default=now_ist_naive)
         user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
         last_notification_sent = db.Column(db.DateTime, nullable=True)
+        # Recurrence (see recurrence_utils): rule on the series master, deleted
+        # occurrences, and series/slot on occurrences materialized as rows
+        recurrence = db.Column(db.String(200), nullable=True)
+        recurrence_exdates = db.Column(db.Text, nullable=True)
+        series_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=True, index=True)
+        occurrence_at = db.Column(db.DateTime, nullable=True)
+        # Last write, including tag changes (see sync_utils); rows older than
+        # the column hold SYNC_EPOCH
+        updated_at = db.Column(db.DateTime, nullable=False, default=now_ist_naive, onupdate=now_ist_naive,
+                               server_default=SYNC_EPOCH)
 
         def to_dict(self):
             """Return safe JSON-friendly task payload."""
@@ -99,11 +123,72 @@ def create_models(db):
 
     class Tag(db.Model):
         id = db.Column(db.Integer, primary_key=True)
-        name = db.Column(db.String(100), unique=True, nullable=False)
+        user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+        name = db.Column(db.String(100), nullable=False)
+        # Number of tasks carrying this tag, maintained by triggers on task_tag
+        usage_count = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+
+    # Per-user, case-insensitive names; also serves prefix suggestions
+    db.Index('ix_tag_user_lower_name', Tag.user_id, db.func.lower(Tag.name), unique=True)
+
+    # Composite indexes matching the per-user predicates: task list filters and
+    # sorting, dashboard counts, the reminder sweep
+    db.Index('ix_task_user_status_deadline', Task.user_id, Task.status, Task.deadline)
+    db.Index('ix_task_user_deadline', Task.user_id, Task.deadline)
+    # Partial: open tasks only (overdue, due soon, reminders)
+    open_task = Task.status != 'done'
+    db.Index('ix_task_open_user_deadline', Task.user_id, Task.deadline,
+             postgresql_where=open_task, sqlite_where=open_task)
+    # Partial: recurring series masters
+    recurring_task = Task.recurrence.isnot(None)
+    db.Index('ix_task_recurring_user', Task.user_id,
+             postgresql_where=recurring_task, sqlite_where=recurring_task)
+    # Tag -> tasks (the primary key only serves task -> tags)
+    db.Index('ix_task_tag_tag_id', task_tag.c.tag_id, task_tag.c.task_id)
+    # Delta sync: one user's rows changed since a cursor
+    db.Index('ix_task_user_updated', Task.user_id, Task.updated_at, Task.id)
+    # Partial: completed tasks waiting for the archiver
+    done_task = Task.status == 'done'
+    db.Index('ix_task_done_updated', Task.updated_at,
+             postgresql_where=done_task, sqlite_where=done_task)
 
     # add relationship on Task dynamically to avoid name conflict
     Task.tags_rel = db.relationship('Tag', secondary=task_tag, backref=db.backref('tasks', lazy='dynamic'))
 
+    # -----------------------
+    # ARCHIVED TASKS
+    # -----------------------
+    class ArchivedTask(db.Model):
+        # Completed tasks moved out of `task` by the archiver (see archive_utils);
+        # same columns plus the original id, read only until restored
+        id = db.Column(db.Integer, primary_key=True)
+        task_id = db.Column(db.Integer, nullable=False)
+        title = db.Column(db.String(100), nullable=False)
+        description = db.Column(db.Text, nullable=True)
+        deadline = db.Column(db.DateTime, nullable=False)
+        priority = db.Column(db.String(10), default='Medium')
+        status = db.Column(db.String(20), default='done')
+        created_at = db.Column(db.DateTime, nullable=True)
+        user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+        last_notification_sent = db.Column(db.DateTime, nullable=True)
+        recurrence = db.Column(db.String(200), nullable=True)
+        recurrence_exdates = db.Column(db.Text, nullable=True)
+        series_id = db.Column(db.Integer, nullable=True)
+        occurrence_at = db.Column(db.DateTime, nullable=True)
+        updated_at = db.Column(db.DateTime, nullable=False)
+        archived_at = db.Column(db.DateTime, nullable=False, default=now_ist_naive)
+
+    db.Index('ix_archived_task_user_deadline', ArchivedTask.user_id, ArchivedTask.deadline)
+    db.Index('ix_archived_task_task_id', ArchivedTask.task_id)
+
+    # The archived tasks' tag links, moved out of task_tag with them
+    archived_task_tag = db.Table(
+        'archived_task_tag',
+        db.Column('task_id', db.Integer, db.ForeignKey('archived_task.id'), primary_key=True),
+        db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True),
+    )
+    db.Index('ix_archived_task_tag_tag_id', archived_task_tag.c.tag_id)
+
     # -----------------------
     # BUDGET MODEL
     # -----------------------
@@ -115,5 +200,111 @@ def create_models(db):
         type = db.Column(db.String(20), nullable=False, index=True)
         date = db.Column(db.DateTime, default=now_ist_naive, index=True)
         user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+        # Recurrence, as on Task
+        recurrence = db.Column(db.String(200), nullable=True)
+        recurrence_exdates = db.Column(db.Text, nullable=True)
+        series_id = db.Column(db.Integer, db.ForeignKey('budget.id'), nullable=True, index=True)
+        occurrence_at = db.Column(db.DateTime, nullable=True)
+        updated_at = db.Column(db.DateTime, nullable=False, default=now_ist_naive, onupdate=now_ist_naive,
+                               server_default=SYNC_EPOCH)
+
+    # Transactions table, summaries and export: one user's date range
+    db.Index('ix_budget_user_date', Budget.user_id, Budget.date)
+    recurring_budget = Budget.recurrence.isnot(None)
+    db.Index('ix_budget_recurring_user', Budget.user_id,
+             postgresql_where=recurring_budget, sqlite_where=recurring_budget)
+    db.Index('ix_budget_user_updated', Budget.user_id, Budget.updated_at, Budget.id)
+    # Transaction filters: categories / type within a date range, amount ranges
+    db.Index('ix_budget_user_category_date', Budget.user_id, Budget.category, Budget.date)
+    db.Index('ix_budget_user_type_date', Budget.user_id, Budget.type, Budget.date)
+    db.Index('ix_budget_user_amount', Budget.user_id, Budget.amount)
+
+    # -----------------------
+    # COMPACTED BUDGET HISTORY
+    # -----------------------
+    class BudgetSummary(db.Model):
+        # Monthly per-category total of compacted transactions; the originals
+        # are in the BudgetArchive named `archive` (see compaction_utils)
+        id = db.Column(db.Integer, primary_key=True)
+        user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+        month = db.Column(db.Date, nullable=False)  # first day of the month
+        category = db.Column(db.String(100), nullable=False)
+        type = db.Column(db.String(20), nullable=False)
+        currency = db.Column(db.String(10), nullable=False)
+        amount = db.Column(db.Float, nullable=False)
+        count = db.Column(db.Integer, nullable=False)
+        archive = db.Column(db.String(200), nullable=False)
+
+    db.Index('ix_budget_summary_user_month', BudgetSummary.user_id, BudgetSummary.month)
+    db.Index('ix_budget_summary_archive', BudgetSummary.archive)
+
+    class BudgetArchive(db.Model):
+        # Gzipped JSON lines of one compaction run's original transactions,
+        # kept in the database so restores survive redeploys
+        __tablename__ = 'budget_history_archive'
+        id = db.Column(db.Integer, primary_key=True)
+        user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+        name = db.Column(db.String(200), nullable=False, unique=True)
+        count = db.Column(db.Integer, nullable=False)
+        created_at = db.Column(db.DateTime, default=now_ist_naive, nullable=False)
+        data = db.Column(db.LargeBinary, nullable=False)
+
+    # -----------------------
+    # CATEGORY CAPS
+    # -----------------------
+    class BudgetCap(db.Model):
+        # Monthly spending cap for one category, in the user's currency (see cap_utils)
+        id = db.Column(db.Integer, primary_key=True)
+        user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+        category = db.Column(db.String(100), nullable=False)
+        amount = db.Column(db.Float, nullable=False)
+        # Highest threshold (percent) crossed in alert_month, and the spend at that point
+        alert_month = db.Column(db.Date, nullable=True)
+        alert_level = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+        alert_spent = db.Column(db.Float, nullable=True)
+        # Crossed but not emailed yet
+        alert_pending = db.Column(db.Boolean, default=False, nullable=False, server_default='0')
+
+        __table_args__ = (db.UniqueConstraint('user_id', 'category', name='uq_budget_cap_user_category'),)
+
+    # Partial: alerts waiting for delivery
+    pending_alert = BudgetCap.alert_pending.is_(True)
+    db.Index('ix_budget_cap_pending', BudgetCap.user_id,
+             postgresql_where=pending_alert, sqlite_where=pending_alert)
+
+    class CategorySpend(db.Model):
+        # Running expense total per category and month, in the user's currency;
+        # adjusted by every transaction write instead of re-summed (see cap_utils)
+        user_id = db.Column(db.Integer, primary_key=True)
+        category = db.Column(db.String(100), primary_key=True)
+        month = db.Column(db.Date, primary_key=True)  # first day of the month
+        total = db.Column(db.Float, nullable=False, default=0.0)
+
+    # -----------------------
+    # SYNC TOMBSTONE MODEL
+    # -----------------------
+    class SyncTombstone(db.Model):
+        # A deleted task/transaction, reported to sync clients until pruned
+        id = db.Column(db.Integer, primary_key=True)
+        user_id = db.Column(db.Integer, nullable=False)
+        kind = db.Column(db.String(10), nullable=False)  # 'task' | 'budget'
+        object_id = db.Column(db.Integer, nullable=False)
+        deleted_at = db.Column(db.DateTime, nullable=False, default=now_ist_naive)
+
+    db.Index('ix_sync_tombstone_user_deleted', SyncTombstone.user_id, SyncTombstone.deleted_at, SyncTombstone.id)
+
+    # -----------------------
+    # FX RATE MODEL
+    # -----------------------
+    class FxRate(db.Model):
+        # Units of `currency` per 1 USD on `date`; rows are never updated
+        id = db.Column(db.Integer, primary_key=True)
+        currency = db.Column(db.String(10), nullable=False)
+        date = db.Column(db.Date, nullable=False)
+        rate = db.Column(db.Float, nullable=False)
+        source = db.Column(db.String(20), nullable=False, default='provider')
+
+        __table_args__ = (db.UniqueConstraint('currency', 'date', name='uq_fx_rate_currency_date'),)
 
-    return User, Task, Budget, Tag
+    return (User, Task, Budget, Tag, FxRate, SyncTombstone, BudgetCap, CategorySpend, ArchivedTask, BudgetSummary,
+            BudgetArchive)
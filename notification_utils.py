@@ -1,48 +1,86 @@
 """Task notification system for sending deadline reminders.
+
+Each sweep renders from templates compiled once and sends everything over a
+single SMTP connection. Users in 'digest' mode get one email listing all
+their due tasks, grouped by priority; 'immediate' users get one per task.
 """
-from flask import render_template
 from flask_mail import Message
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+
+from read_models import ID_CHUNK_SIZE, materialized_slots
+from recurrence_utils import expand
+from replica_utils import replica_reads
 
 # Timezone: IST (UTC +5:30)
 IST = timezone(timedelta(hours=5, minutes=30))
 
+NOTIFICATION_MODES = ('digest', 'immediate')
+PRIORITY_ORDER = ('High', 'Medium', 'Low')
+
+# A task is not reminded again within this many hours
+REMIND_AGAIN_HOURS = 12
+
 def now_ist_naive():
     """Return IST datetime (naive so it matches DB naive DateTime)."""
     return datetime.now(IST).replace(tzinfo=None)
 
+def format_time_left(deadline, now):
+    """Human time until ``deadline`` for reminder emails."""
+    hours_left = int((deadline - now).total_seconds() / 3600)
+    if hours_left < 0:
+        return "OVERDUE"
+    if hours_left < 24:
+        return f"{hours_left} hours"
+    days_left = hours_left // 24
+    return f"{days_left} day{'s' if days_left > 1 else ''}"
+
+def reminder_message(template, sender, user_email, task_title, task_deadline, task_priority, task_description, now):
+    """Build a single-task reminder from a compiled template."""
+    msg = Message(f'Task Reminder: {task_title}', sender=sender, recipients=[user_email])
+    msg.html = template.render(
+        task_title=task_title,
+        task_deadline=task_deadline.strftime('%B %d, %Y at %I:%M %p'),
+        task_priority=task_priority,
+        task_description=task_description,
+        time_left=format_time_left(task_deadline, now),
+        user_email=user_email,
+    )
+    return msg
+
+def digest_message(template, sender, user_email, due, hours, now):
+    """Build one email listing every ``(task, deadline)`` in ``due``, grouped by priority."""
+    groups = []
+    for priority in PRIORITY_ORDER:
+        items = sorted(
+            ((t, d) for t, d in due if (t.priority if t.priority in PRIORITY_ORDER else 'Medium') == priority),
+            key=lambda item: item[1],
+        )
+        if items:
+            groups.append((priority, [
+                {
+                    'title': t.title,
+                    'description': t.description,
+                    'deadline': d.strftime('%b %d, %Y at %I:%M %p'),
+                    'time_left': format_time_left(d, now),
+                }
+                for t, d in items
+            ]))
+
+    msg = Message(f'Task Reminder: {len(due)} tasks due soon', sender=sender, recipients=[user_email])
+    msg.html = template.render(groups=groups, task_count=len(due), hours=hours, user_email=user_email)
+    return msg
+
 def send_task_reminder(mail, user_email, task_title, task_deadline, task_priority, task_description=None):
     """Send task deadline reminder email"""
     try:
         from flask import current_app
-        
-        msg = Message(
-            f'Task Reminder: {task_title}',
-            sender=current_app.config['MAIL_DEFAULT_SENDER'],
-            recipients=[user_email]
+
+        msg = reminder_message(
+            current_app.jinja_env.get_template('emails/task_reminder.html'),
+            current_app.config['MAIL_DEFAULT_SENDER'],
+            user_email, task_title, task_deadline, task_priority, task_description, now_ist_naive(),
         )
-        
-        # Calculate time remaining
-        now = now_ist_naive()
-        time_left = task_deadline - now
-        hours_left = int(time_left.total_seconds() / 3600)
-        
-        if hours_left < 0:
-            time_left_str = "OVERDUE"
-        elif hours_left < 24:
-            time_left_str = f"{hours_left} hours"
-        else:
-            days_left = hours_left // 24
-            time_left_str = f"{days_left} day{'s' if days_left > 1 else ''}"
-        
-        msg.html = render_template('emails/task_reminder.html',
-                                   task_title=task_title,
-                                   task_deadline=task_deadline.strftime('%B %d, %Y at %I:%M %p'),
-                                   task_priority=task_priority,
-                                   task_description=task_description,
-                                   time_left=time_left_str,
-                                   user_email=user_email)
-        
         mail.send(msg)
         return True
     except Exception as e:
@@ -51,62 +89,120 @@ def send_task_reminder(mail, user_email, task_title, task_deadline, task_priorit
         traceback.print_exc()
         return False
 
+def due_reminders(db, Task, user, now):
+    """``[(row, deadline)]`` a user should be reminded about now.
+
+    Pending tasks due within the user's window that were not reminded in the
+    last REMIND_AGAIN_HOURS, plus the next virtual occurrence of each
+    recurring task (once per occurrence, tracked on the series master).
+    """
+    notification_time = now + timedelta(hours=user.notification_hours)
+    recent = now - timedelta(hours=REMIND_AGAIN_HOURS)
+
+    tasks = Task.query.filter(
+        Task.user_id == user.id,
+        Task.status == 'pending',
+        Task.deadline <= notification_time,
+        Task.deadline > now  # Not overdue yet
+    ).all()
+    due = [
+        (task, task.deadline) for task in tasks
+        if not task.last_notification_sent or task.last_notification_sent <= recent
+    ]
+
+    masters = Task.query.filter(Task.user_id == user.id, Task.recurrence.isnot(None)).all()
+    skip = materialized_slots(db.session, Task, [m.id for m in masters]) if masters else {}
+    seen = {id(task) for task, _ in due}
+    for master in masters:
+        deadline = next(expand(
+            master, 'deadline', now + timedelta(seconds=1),
+            notification_time + timedelta(seconds=1), skip.get(master.id, ()),
+        ), None)
+        if deadline is None or id(master) in seen:
+            continue
+        window_start = deadline - timedelta(hours=user.notification_hours)
+        if master.last_notification_sent and master.last_notification_sent >= window_start:
+            continue
+        due.append((master, deadline))
+    return due
+
 def check_and_send_notifications(app, db, mail, User, Task):
-    """Check for tasks that need notifications and send them"""
+    """Check for tasks that need notifications and send them.
+
+    Returns the number of emails sent.
+    """
     with app.app_context():
         try:
             now = now_ist_naive()
-            
-            # Get all users with notifications enabled
-            users = User.query.filter_by(notifications_enabled=True, email_verified=True).all()
-            
-            notifications_sent = 0
-            
-            for user in users:
-                # Calculate notification threshold
-                notification_time = now + timedelta(hours=user.notification_hours)
-                
-                # Find tasks that:
-                # 1. Are pending
-                # 2. Deadline is within notification window
-                # 3. Haven't been notified yet (or last notification was > 12 hours ago)
-                tasks = Task.query.filter(
-                    Task.user_id == user.id,
-                    Task.status == 'pending',
-                    Task.deadline <= notification_time,
-                    Task.deadline > now  # Not overdue yet
-                ).all()
-                
-                for task in tasks:
-                    # Check if we already sent a notification recently (within 12 hours)
-                    should_send = True
-                    if task.last_notification_sent:
-                        time_since_last = now - task.last_notification_sent
-                        if time_since_last.total_seconds() < 12 * 3600:  # 12 hours
-                            should_send = False
-                    
-                    if should_send:
-                        success = send_task_reminder(
-                            mail,
-                            user.email,
-                            task.title,
-                            task.deadline,
-                            task.priority,
-                            task.description
-                        )
-                        
-                        if success:
-                            task.last_notification_sent = now
-                            notifications_sent += 1
-            
-            # Commit all updates
+            sender = app.config['MAIL_DEFAULT_SENDER']
+
+            # Scan users with notifications enabled (on the read replica, if
+            # configured) before anything is written
+            with replica_reads(db.session):
+                users = User.query.filter_by(notifications_enabled=True, email_verified=True).all()
+                scan = [(user, due_reminders(db, Task, user, now)) for user in users]
+
+            # Only talk to the mail server when something is due
+            if not any(due for _, due in scan):
+                return 0
+
+            # Compiled once per sweep, rendered per message
+            reminder_template = app.jinja_env.get_template('emails/task_reminder.html')
+            digest_template = app.jinja_env.get_template('emails/task_digest.html')
+
+            emails_sent = 0
+            tasks_reminded = 0
+            sent_ids = []
+
+            # One SMTP connection per sweep; failed sends are skipped per
+            # message, and a connection failure keeps what was already sent
+            try:
+                with mail.connect() as conn:
+                    for user, due in scan:
+                        if not due:
+                            continue
+
+                        if user.notification_mode == 'immediate' or len(due) == 1:
+                            batches = [
+                                ([task], reminder_message(
+                                    reminder_template, sender, user.email,
+                                    task.title, deadline, task.priority, task.description, now,
+                                ))
+                                for task, deadline in due
+                            ]
+                        else:
+                            batches = [(
+                                [task for task, _ in due],
+                                digest_message(digest_template, sender, user.email, due, user.notification_hours, now),
+                            )]
+
+                        for tasks, msg in batches:
+                            try:
+                                conn.send(msg)
+                            except Exception as e:
+                                print(f"Error sending task reminder to {user.email}: {e}")
+                                continue
+                            sent_ids.extend(task.id for task in tasks)
+                            emails_sent += 1
+                            tasks_reminded += len(tasks)
+            except OSError as e:
+                print(f"Error connecting to the mail server: {e}")
+
+            # A plain UPDATE: a reminder is not a data change (no version bump,
+            # and updated_at is kept so sync clients don't see the task as edited)
+            table = Task.__table__
+            for start in range(0, len(sent_ids), ID_CHUNK_SIZE):
+                db.session.execute(
+                    update(table).where(table.c.id.in_(sent_ids[start:start + ID_CHUNK_SIZE]))
+                    .values(last_notification_sent=now, updated_at=table.c.updated_at)
+                )
             db.session.commit()
-            
-            if notifications_sent > 0:
-                print(f"✅ Sent {notifications_sent} task reminder(s)")
-            
-            return notifications_sent
-            
+
+            if emails_sent > 0:
+                print(f"✅ Sent {emails_sent} reminder email(s) covering {tasks_reminded} task(s)")
+
+            return emails_sent
+
         except Exception as e:
             print(f"Error in notification check: {e}")
             import traceback
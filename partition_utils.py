@@ -0,0 +1,252 @@
+"""Monthly range partitioning of ``budget`` on PostgreSQL.
+
+``budget`` becomes a table partitioned by ``RANGE (date)`` with one
+partition per month (``budget_p2026_10``) plus a default partition for
+dates outside them. Budget queries already filter on ``user_id`` and plain
+``date`` ranges, so the planner only touches the months a page asks for.
+
+Partitions are created ahead of time by a scheduler job. That job also
+splits any rows that landed in the default partition into their own
+months. Old months can be detached and moved to an archive schema, where
+the app no longer sees them.
+
+Converting an existing plain table rewrites it under an exclusive lock, so
+it is never done at startup: run ``flask budget-partition-migrate`` once,
+ideally during a quiet period. Startup and the job only add months to a
+table that is already partitioned.
+
+A partitioned table's primary key must include the partition key, so the
+key is ``(id, date)`` and ``date`` is NOT NULL. The ``user_id`` foreign key
+is re-created on the new table, but foreign keys cannot reference a
+partitioned table by ``id`` alone, so the ``series_id`` self-reference is
+not enforced by the database here.
+
+Other databases keep a plain table; every function is a no-op there.
+"""
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+from models import now_ist_naive
+from search_utils import create_postgres_search
+
+PARENT = "budget"
+DEFAULT_PARTITION = "budget_p_default"
+ARCHIVE_SCHEMA = "budget_archive"
+
+_PARTITION_RE = re.compile(r"^budget_p(\d{4})_(\d{2})$")
+
+# pg_advisory_xact_lock key serializing partition DDL across workers and CLI calls
+_LOCK_KEY = 0x62756467  # "budg"
+
+
+def _is_postgres(db):
+    return db.engine.dialect.name == "postgresql"
+
+
+def _month(value):
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _add_months(month, n):
+    for _ in range(n):
+        month = _next_month(month)
+    return month
+
+
+def partition_name(month):
+    return f"budget_p{month.year:04d}_{month.month:02d}"
+
+
+def _lock(conn):
+    """Hold the partition lock until the transaction ends."""
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+
+def _is_partitioned(conn):
+    kind = conn.execute(text(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = :name AND n.nspname = current_schema()"
+    ), {"name": PARENT}).scalar()
+    return kind == "p"
+
+
+def _insertable_columns(conn, table):
+    """Column list for copying rows (generated columns are computed, not copied)."""
+    rows = conn.execute(text(
+        "SELECT attname FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) "
+        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum"
+    ), {"table": table}).scalars().all()
+    return ", ".join('"%s"' % name for name in rows)
+
+
+def attached_months(conn):
+    """Months that currently have their own attached partition."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT}).scalars().all()
+    months = set()
+    for name in names:
+        m = _PARTITION_RE.match(name)
+        if m:
+            months.add(date(int(m.group(1)), int(m.group(2)), 1))
+    return months
+
+
+def _create_partition(conn, month):
+    """Attach a partition for ``month``, moving its rows out of the default partition."""
+    name, lo, hi = partition_name(month), month.isoformat(), _next_month(month).isoformat()
+    bounds = {"lo": lo, "hi": hi}
+    stranded = conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= :lo AND date < :hi)"
+    ), bounds).scalar()
+
+    if not stranded:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} FOR VALUES FROM ('{lo}') TO ('{hi}')"
+        ))
+        return
+
+    # The default partition may not hold rows of a new partition's range:
+    # detach it, add the month, move the rows, reattach.
+    columns = _insertable_columns(conn, PARENT)
+    conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+    conn.execute(text(
+        f"INSERT INTO {PARENT} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} "
+        f"WHERE date >= :lo AND date < :hi"
+    ), bounds)
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE date >= :lo AND date < :hi"), bounds)
+    conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def _ensure(conn, today, months_ahead):
+    existing = attached_months(conn)
+    wanted = {_add_months(_month(today), i) for i in range(months_ahead + 1)}
+    # months of rows that fell into the default partition (back-dated or far-future entries)
+    wanted.update(
+        _month(d) for d in conn.execute(text(
+            f"SELECT DISTINCT date_trunc('month', date) FROM {DEFAULT_PARTITION}"
+        )).scalars()
+    )
+    created = sorted(wanted - existing)
+    for month in created:
+        _create_partition(conn, month)
+    return created
+
+
+def _migrate(conn, Budget, today, months_ahead):
+    """Replace a plain ``budget`` table with a partitioned one holding the same rows."""
+    legacy = "budget_unpartitioned"
+    conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {legacy}"))
+    conn.execute(text(f"UPDATE {legacy} SET date = :now WHERE date IS NULL"), {"now": now_ist_naive()})
+
+    # same columns, defaults (the id sequence) and generated columns; no indexes or FKs
+    conn.execute(text(
+        f"CREATE TABLE {PARENT} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING GENERATED) "
+        f"PARTITION BY RANGE (date)"
+    ))
+    conn.execute(text(f"ALTER TABLE {PARENT} ALTER COLUMN date SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {PARENT} ADD PRIMARY KEY (id, date)"))
+    conn.execute(text(f'ALTER TABLE {PARENT} ADD FOREIGN KEY (user_id) REFERENCES "user" (id)'))
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+    months = {
+        _month(d) for d in conn.execute(text(f"SELECT DISTINCT date_trunc('month', date) FROM {legacy}")).scalars()
+    }
+    months.update(_add_months(_month(today), i) for i in range(months_ahead + 1))
+    for month in sorted(months):
+        _create_partition(conn, month)
+
+    columns = _insertable_columns(conn, legacy)
+    conn.execute(text(f"INSERT INTO {PARENT} ({columns}) SELECT {columns} FROM {legacy}"))
+
+    sequence = conn.execute(text(f"SELECT pg_get_serial_sequence('{legacy}', 'id')")).scalar()
+    if sequence:
+        # keep the id sequence when the old table (its owner) is dropped
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT}.id"))
+    conn.execute(text(f"DROP TABLE {legacy}"))
+
+    # the model's indexes, now created once on the parent and inherited by every partition
+    for index in Budget.__table__.indexes:
+        index.create(conn, checkfirst=True)
+    # and the raw-SQL search index, dropped with the old table
+    create_postgres_search(conn)
+    return len(months)
+
+
+def init_budget_partitions(db, months_ahead):
+    """Create upcoming months if ``budget`` is partitioned (startup; never migrates)."""
+    if not _is_postgres(db):
+        return
+    with db.engine.begin() as conn:
+        if not _is_partitioned(conn):
+            return
+        _lock(conn)
+        _ensure(conn, now_ist_naive().date(), months_ahead)
+
+
+def migrate_budget_partitions(db, Budget, months_ahead):
+    """Convert a plain ``budget`` table to a partitioned one.
+
+    Returns the number of partitions created, or None if there was nothing
+    to do (not PostgreSQL, or already partitioned).
+    """
+    if not _is_postgres(db):
+        return None
+    with db.engine.begin() as conn:
+        _lock(conn)
+        # re-checked under the lock: another process may have just migrated
+        if _is_partitioned(conn):
+            return None
+        return _migrate(conn, Budget, now_ist_naive().date(), months_ahead)
+
+
+def ensure_budget_partitions(app, db, months_ahead):
+    """Scheduler job: create partitions ahead of time and split the default partition."""
+    with app.app_context():
+        if not _is_postgres(db):
+            return []
+        try:
+            with db.engine.begin() as conn:
+                if not _is_partitioned(conn):
+                    return []
+                _lock(conn)
+                created = _ensure(conn, now_ist_naive().date(), months_ahead)
+        except Exception as e:
+            print(f"Error creating budget partitions: {e}")
+            return []
+        if created:
+            print(f"🗂️ Created {len(created)} budget partition(s)")
+        return created
+
+
+def archive_budget_partitions(db, before):
+    """Detach monthly partitions ending on or before ``before`` into the archive schema.
+
+    Archived months stay queryable as ``budget_archive.budget_pYYYY_MM`` but
+    disappear from the app. Returns the archived table names.
+    """
+    if not _is_postgres(db):
+        return []
+    before = _month(before)
+    archived = []
+    with db.engine.begin() as conn:
+        if not _is_partitioned(conn):
+            return []
+        _lock(conn)
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        for month in sorted(attached_months(conn)):
+            if _next_month(month) > before:
+                continue
+            name = partition_name(month)
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            archived.append(name)
+    return archived
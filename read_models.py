@@ -0,0 +1,212 @@
+"""Read-only projections for list and summary views.
+
+List pages only need a handful of columns, so instead of hydrating full ORM
+objects (identity map, change tracking) they select just those columns into
+small ``__slots__`` views or SQLAlchemy ``Row`` named tuples.
+
+Virtual occurrences of recurring tasks/transactions (see recurrence_utils)
+are projected into the same shapes, carrying their ``occurrence`` stamp, as
+are the monthly summaries of compacted transactions (see compaction_utils).
+"""
+from datetime import datetime
+
+from sqlalchemy import func
+
+from recurrence_utils import expand, to_stamp
+
+# Keep IN (...) lists well under database parameter limits
+ID_CHUNK_SIZE = 500
+
+
+def format_time_left(deadline, status, now):
+    """Return (is_overdue, time_left) for a task deadline relative to ``now``."""
+    if not deadline or status == "done":
+        return False, ""
+    if deadline < now:
+        sec = int((now - deadline).total_seconds())
+        return True, f"Overdue by {sec // 86400}d {(sec % 86400) // 3600}h {(sec % 3600) // 60}m"
+    sec = int((deadline - now).total_seconds())
+    return False, f"{sec // 86400}d {(sec % 86400) // 3600}h {(sec % 3600) // 60}m left"
+
+
+class TaskView:
+    """Immutable-ish row for the task list; no ORM state attached."""
+
+    __slots__ = (
+        "id", "title", "description", "deadline", "priority", "status", "is_overdue", "time_left", "tags",
+        "recurrence", "occurrence", "archived",
+    )
+
+    def __init__(self, row, tags, now, occurrence=None, archived=False):
+        """``occurrence``: datetime of a virtual occurrence of the master ``row``.
+
+        ``archived``: ``row`` is an ArchivedTask (read only, can be restored).
+        """
+        self.id = row.id
+        self.title = row.title
+        self.description = row.description
+        self.deadline = row.deadline if occurrence is None else occurrence
+        self.priority = row.priority
+        self.status = row.status if occurrence is None else "pending"
+        self.is_overdue, self.time_left = format_time_left(self.deadline, self.status, now)
+        self.tags = tags
+        self.recurrence = row.recurrence
+        self.occurrence = None if occurrence is None else to_stamp(occurrence)
+        self.archived = archived
+
+
+def tag_names_by_task(session, task_ids, Tag, task_tag):
+    """Map task id -> list of tag names.
+
+    Links are read by task id, then names by tag id (primary key lookups
+    either way), rather than joining: the planner would pick the join order
+    from table sizes and scan ``tag`` once it is small next to ``task_tag``.
+    """
+    links = []
+    for start in range(0, len(task_ids), ID_CHUNK_SIZE):
+        chunk = task_ids[start:start + ID_CHUNK_SIZE]
+        links.extend(session.query(task_tag.c.task_id, task_tag.c.tag_id).filter(task_tag.c.task_id.in_(chunk)))
+
+    tag_ids = list({tag_id for _, tag_id in links})
+    tag_names = {}
+    for start in range(0, len(tag_ids), ID_CHUNK_SIZE):
+        chunk = tag_ids[start:start + ID_CHUNK_SIZE]
+        tag_names.update(session.query(Tag.id, Tag.name).filter(Tag.id.in_(chunk)))
+
+    names = {}
+    for task_id, tag_id in links:
+        names.setdefault(task_id, []).append(tag_names[tag_id])
+    return names
+
+
+def task_views(query, Task, Tag, task_tag, now):
+    """Project a (filtered, ordered) Task query into TaskView objects."""
+    rows = query.with_entities(
+        Task.id, Task.title, Task.description, Task.deadline, Task.priority, Task.status, Task.recurrence,
+    ).all()
+    tags = tag_names_by_task(query.session, [r.id for r in rows], Tag, task_tag)
+    return [TaskView(r, tags.get(r.id, []), now) for r in rows]
+
+
+def archived_task_views(query, ArchivedTask, Tag, archived_task_tag, now):
+    """``task_views`` for a (filtered, ordered) ArchivedTask query."""
+    rows = query.with_entities(
+        ArchivedTask.id, ArchivedTask.title, ArchivedTask.description, ArchivedTask.deadline,
+        ArchivedTask.priority, ArchivedTask.status, ArchivedTask.recurrence,
+    ).all()
+    tags = tag_names_by_task(query.session, [r.id for r in rows], Tag, archived_task_tag)
+    return [TaskView(r, tags.get(r.id, []), now, archived=True) for r in rows]
+
+
+def materialized_slots(session, Model, master_ids):
+    """Map master id -> occurrence datetimes already stored as their own rows."""
+    slots = {}
+    for start in range(0, len(master_ids), ID_CHUNK_SIZE):
+        chunk = master_ids[start:start + ID_CHUNK_SIZE]
+        rows = session.query(Model.series_id, Model.occurrence_at).filter(Model.series_id.in_(chunk))
+        for series_id, occurrence_at in rows:
+            slots.setdefault(series_id, set()).add(occurrence_at)
+    return slots
+
+
+def occurrence_views(query, Task, Tag, task_tag, start, end, now):
+    """TaskViews for virtual occurrences of the recurring tasks in ``query`` within [start, end).
+
+    ``query`` selects candidate masters (it must not filter on deadline or
+    status, which describe only the first occurrence).
+    """
+    masters = query.filter(Task.recurrence.isnot(None)).with_entities(
+        Task.id, Task.title, Task.description, Task.deadline, Task.priority, Task.status,
+        Task.recurrence, Task.recurrence_exdates,
+    ).all()
+    if not masters:
+        return []
+    ids = [m.id for m in masters]
+    skip = materialized_slots(query.session, Task, ids)
+    tags = tag_names_by_task(query.session, ids, Tag, task_tag)
+    return [
+        TaskView(m, tags.get(m.id, []), now, occurrence=dt)
+        for m in masters
+        for dt in expand(m, "deadline", start, end, skip.get(m.id, ()))
+    ]
+
+
+def budget_rows(query, Budget):
+    """Columns shown in the transactions table / export, as named-tuple rows."""
+    return query.with_entities(
+        Budget.id, Budget.date, Budget.category, Budget.type, Budget.amount, Budget.currency,
+    ).all()
+
+
+class BudgetOccurrence:
+    """A virtual transaction, shaped like a ``budget_rows`` row."""
+
+    __slots__ = ("id", "date", "category", "type", "amount", "currency", "occurrence")
+
+    def __init__(self, row, date):
+        self.id = row.id
+        self.date = date
+        self.category = row.category
+        self.type = row.type
+        self.amount = row.amount
+        self.currency = row.currency
+        self.occurrence = to_stamp(date)
+
+
+class BudgetSummaryRow:
+    """One month's compacted transactions of a category, shaped like a ``budget_rows`` row.
+
+    ``compacted`` is the number of transactions it stands for.
+    """
+
+    __slots__ = ("id", "date", "category", "type", "amount", "currency", "occurrence", "compacted")
+
+    def __init__(self, month, category, type, currency, amount, compacted):
+        self.id = None
+        self.date = datetime.combine(month, datetime.min.time())
+        self.category = category
+        self.type = type
+        self.amount = amount
+        self.currency = currency
+        self.occurrence = None
+        self.compacted = compacted
+
+
+def summary_rows(query, BudgetSummary):
+    """BudgetSummaryRows of a BudgetSummary query, newest first.
+
+    Months compacted in several runs are merged into one row.
+    """
+    rows = query.with_entities(
+        BudgetSummary.month, BudgetSummary.category, BudgetSummary.type, BudgetSummary.currency,
+        func.sum(BudgetSummary.amount), func.sum(BudgetSummary.count),
+    ).group_by(
+        BudgetSummary.month, BudgetSummary.category, BudgetSummary.type, BudgetSummary.currency,
+    ).order_by(BudgetSummary.month.desc()).all()
+    return [BudgetSummaryRow(*r) for r in rows]
+
+
+def budget_occurrences(query, Budget, start, end):
+    """Virtual transactions of the recurring masters in ``query`` within [start, end), newest first.
+
+    As with tasks, ``query`` must not filter on the master's own date.
+    """
+    masters = query.filter(Budget.recurrence.isnot(None)).with_entities(
+        Budget.id, Budget.date, Budget.category, Budget.type, Budget.amount, Budget.currency,
+        Budget.recurrence, Budget.recurrence_exdates,
+    ).all()
+    if not masters:
+        return []
+    skip = materialized_slots(query.session, Budget, [m.id for m in masters])
+    rows = [
+        BudgetOccurrence(m, dt)
+        for m in masters
+        for dt in expand(m, "date", start, end, skip.get(m.id, ()))
+    ]
+    rows.sort(key=lambda r: r.date, reverse=True)
+    return rows
+
+
+def budget_amounts(query, Budget):
+    """Just the columns needed to total a set of transactions (dated for as-of conversion)."""
+    return query.with_entities(Budget.amount, Budget.currency, Budget.type, Budget.category, Budget.date).all()
@@ -0,0 +1,234 @@
+"""Recurrence rules for tasks and transactions.
+
+A recurring row is the *master* of a series: its own deadline/date is the
+first occurrence and ``recurrence`` holds an RRULE-like rule
+(``FREQ=DAILY|WEEKLY|MONTHLY|YEARLY;INTERVAL=n;BYDAY=MO,WE;COUNT=n;UNTIL=YYYYMMDD``).
+Later occurrences are never stored up front: generators expand them only
+inside the window a view asks for, skipping straight to it arithmetically.
+An occurrence becomes a real row (``series_id`` + ``occurrence_at``) only
+when it is completed or edited; deleting one records it in
+``recurrence_exdates``.
+
+Monthly and yearly rules clamp to the last day of shorter months (rent on
+the 31st falls on Feb 28/29).
+"""
+import calendar
+from datetime import datetime, timedelta
+
+FREQS = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Choices offered by the forms -> stored rule
+PRESETS = {
+    "daily": "FREQ=DAILY",
+    "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "weekly": "FREQ=WEEKLY",
+    "biweekly": "FREQ=WEEKLY;INTERVAL=2",
+    "monthly": "FREQ=MONTHLY",
+    "yearly": "FREQ=YEARLY",
+}
+
+STAMP_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class Rule:
+    __slots__ = ("freq", "interval", "byday", "count", "until")
+
+    def __init__(self, freq, interval=1, byday=(), count=None, until=None):
+        self.freq = freq
+        self.interval = interval
+        self.byday = byday
+        self.count = count
+        self.until = until
+
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[d] for d in self.byday))
+        if self.count:
+            parts.append(f"COUNT={self.count}")
+        if self.until:
+            parts.append("UNTIL=" + self.until.strftime("%Y%m%d"))
+        return ";".join(parts)
+
+
+def parse_rule(text):
+    """Parse a preset name or RRULE-like string; raises ValueError."""
+    text = (text or "").strip()
+    text = PRESETS.get(text.lower(), text)
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+
+    fields = {}
+    for part in text.split(";"):
+        if not part.strip():
+            continue
+        key, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"invalid rule part: {part!r}")
+        fields[key.strip().upper()] = value.strip().upper()
+
+    freq = fields.pop("FREQ", None)
+    if freq not in FREQS:
+        raise ValueError("FREQ must be one of " + ", ".join(FREQS))
+    try:
+        interval = int(fields.pop("INTERVAL", 1))
+        count = int(fields["COUNT"]) if "COUNT" in fields else None
+        fields.pop("COUNT", None)
+        until = datetime.strptime(fields.pop("UNTIL")[:8], "%Y%m%d") if "UNTIL" in fields else None
+    except ValueError:
+        raise ValueError("INTERVAL/COUNT must be integers and UNTIL a YYYYMMDD date")
+    if not 1 <= interval <= 365 or (count is not None and count < 1):
+        raise ValueError("INTERVAL must be 1-365 and COUNT positive")
+
+    byday = ()
+    if "BYDAY" in fields:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+        try:
+            byday = tuple(sorted({WEEKDAYS.index(d.strip()) for d in fields.pop("BYDAY").split(",")}))
+        except ValueError:
+            raise ValueError("BYDAY takes MO,TU,WE,TH,FR,SA,SU")
+    if fields:
+        raise ValueError("unsupported rule parts: " + ", ".join(sorted(fields)))
+
+    return Rule(freq, interval, byday, count, until)
+
+
+def normalize_rule(text):
+    """Canonical rule string for storage, or None for no recurrence."""
+    if not (text or "").strip():
+        return None
+    return str(parse_rule(text))
+
+
+def preset_name(rule_text):
+    """Form choice matching a stored rule ('' if none, the rule itself if custom)."""
+    if not rule_text:
+        return ""
+    for name, rule in PRESETS.items():
+        if rule == rule_text:
+            return name
+    return rule_text
+
+
+def _add_months(dt, months, day):
+    month0 = dt.month - 1 + months
+    year, month = dt.year + month0 // 12, month0 % 12 + 1
+    return dt.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+
+def _nth(rule, dtstart):
+    """(first period index worth trying for a window start, nth-occurrence function)."""
+    if rule.freq in ("DAILY", "WEEKLY"):
+        step = timedelta(days=rule.interval * (7 if rule.freq == "WEEKLY" else 1))
+
+        def first(start):
+            if start <= dtstart:
+                return 0
+            return -(-(start - dtstart) // step)  # ceil
+
+        return first, lambda k: dtstart + k * step
+
+    months = rule.interval * (12 if rule.freq == "YEARLY" else 1)
+
+    def first(start):
+        diff = (start.year - dtstart.year) * 12 + start.month - dtstart.month
+        return max(diff // months - 1, 0)
+
+    return first, lambda k: _add_months(dtstart, k * months, dtstart.day)
+
+
+def _weekly_byday(rule, dtstart, start, end):
+    """WEEKLY;BYDAY=...: every listed weekday of every ``interval``-th week."""
+    monday = dtstart - timedelta(days=dtstart.weekday())
+    first_week = [monday + timedelta(days=d) for d in rule.byday]
+    first_week = [dt for dt in first_week if dt >= dtstart]
+    period = timedelta(weeks=rule.interval)
+
+    week = 0
+    if start > monday:
+        week = max((start - monday) // period - 1, 0)
+    index = 0 if week == 0 else len(first_week) + (week - 1) * len(rule.byday)
+
+    while True:
+        days = first_week if week == 0 else [monday + week * period + timedelta(days=d) for d in rule.byday]
+        for dt in days:
+            if rule.count is not None and index >= rule.count:
+                return
+            if dt >= end or (rule.until and dt.date() > rule.until.date()):
+                return
+            index += 1
+            if dt >= start:
+                yield dt
+        week += 1
+
+
+def occurrences(rule, dtstart, start, end):
+    """Yield occurrence datetimes of ``rule`` from ``dtstart`` within [start, end)."""
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+    if rule.freq == "WEEKLY" and rule.byday:
+        yield from _weekly_byday(rule, dtstart, start, end)
+        return
+
+    first, nth = _nth(rule, dtstart)
+    k = first(start)
+    while True:
+        if rule.count is not None and k >= rule.count:
+            return
+        dt = nth(k)
+        if dt >= end or (rule.until and dt.date() > rule.until.date()):
+            return
+        if dt >= start:
+            yield dt
+        k += 1
+
+
+def to_stamp(dt):
+    return dt.strftime(STAMP_FORMAT)
+
+
+def from_stamp(stamp):
+    """Parse an occurrence stamp; raises ValueError."""
+    return datetime.strptime(stamp or "", STAMP_FORMAT)
+
+
+def exdates(row):
+    """Deleted occurrences of a master row."""
+    return {from_stamp(s) for s in (row.recurrence_exdates or "").split(",") if s}
+
+
+def merge_exdates(text, dts):
+    """``recurrence_exdates`` text with the datetimes ``dts`` added."""
+    stamps = {s for s in (text or "").split(",") if s}
+    stamps.update(to_stamp(dt) for dt in dts)
+    return ",".join(sorted(stamps))
+
+
+def add_exdate(row, dt):
+    row.recurrence_exdates = merge_exdates(row.recurrence_exdates, [dt])
+
+
+def is_occurrence(row, start_column, dt):
+    """True if ``dt`` is a (non-first) occurrence of the master ``row``."""
+    if not row.recurrence or dt == getattr(row, start_column):
+        return False
+    return next(occurrences(row.recurrence, getattr(row, start_column), dt, dt + timedelta(seconds=1)), None) == dt
+
+
+def expand(master, start_column, start, end, skip=()):
+    """Virtual occurrences of a master row within [start, end).
+
+    The master's own first occurrence, deleted occurrences and those in
+    ``skip`` (already materialized) are left out.
+    """
+    dtstart = getattr(master, start_column)
+    if not master.recurrence or dtstart is None:
+        return
+    excluded = exdates(master) | set(skip)
+    for dt in occurrences(master.recurrence, dtstart, start, end):
+        if dt != dtstart and dt not in excluded:
+            yield dt
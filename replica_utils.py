@@ -0,0 +1,104 @@
+"""Read-replica routing for read-only endpoints.
+
+When ``SQLALCHEMY_BINDS["replica"]`` is configured, sessions marked for
+replica reads (``@read_only`` views, ``replica_reads()`` blocks) run their
+SELECTs on the replica engine. Flushes and DML statements always go to the
+primary, and so does everything in a session once it has written.
+
+Replicas lag, so a browser whose request wrote something is pinned to the
+primary for ``REPLICA_STICKY_SECONDS`` (a timestamp in the signed session
+cookie) and reads its own writes.
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, request, session as flask_session
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = "replica"
+
+_USE_REPLICA = "use_replica"
+_WROTE = "wrote"
+_STICKY_KEY = "_primary_until"
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that can send reads to the replica bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or getattr(clause, "is_dml", False):
+                self.info[_WROTE] = True
+            elif self.info.get(_USE_REPLICA) and not self.info.get(_WROTE):
+                engine = self._db.engines.get(REPLICA_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_configured():
+    return REPLICA_BIND in current_app.config.get("SQLALCHEMY_BINDS", {})
+
+
+@contextmanager
+def replica_reads(session):
+    """Route this session's reads to the replica (if any) inside the block."""
+    previous = session.info.get(_USE_REPLICA)
+    session.info[_USE_REPLICA] = replica_configured()
+    try:
+        yield
+    finally:
+        session.info[_USE_REPLICA] = previous
+
+
+def read_only(db):
+    """Decorator for GET views that may read from the replica.
+
+    Requests from a browser that wrote within the sticky window stay on the
+    primary.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            pinned = flask_session.get(_STICKY_KEY, 0) > time.time()
+            if request.method != "GET" or pinned or not replica_configured():
+                return view(*args, **kwargs)
+            with replica_reads(db.session):
+                return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def register_sticky_writes(app, db):
+    """Pin a browser to the primary for a while after a request that wrote."""
+
+    @app.after_request
+    def _pin_after_write(response):
+        if db.session.info.pop(_WROTE, False) and replica_configured():
+            flask_session[_STICKY_KEY] = time.time() + app.config["REPLICA_STICKY_SECONDS"]
+        return response
+
+    return _pin_after_write
+
+
+def sync_sqlite_replica(primary_url, replica_url):
+    """Copy a SQLite primary onto a SQLite replica (a stand-in for replication in local testing)."""
+    prefix = "sqlite:///"
+    if not (primary_url.startswith(prefix) and replica_url.startswith(prefix)):
+        raise ValueError("replica sync only supports two SQLite file databases")
+    primary_path, replica_path = primary_url[len(prefix):], replica_url[len(prefix):]
+    if primary_path == replica_path:
+        raise ValueError("primary and replica are the same file")
+
+    # the backup API rewrites the replica in place, so open connections see the copy
+    src, dst = sqlite3.connect(primary_path), sqlite3.connect(replica_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
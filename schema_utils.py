@@ -0,0 +1,81 @@
+"""Lightweight in-place schema upgrades.
+
+``db.create_all()`` creates missing tables but never alters existing ones,
+so columns added to existing models are listed here and added on startup.
+"""
+from sqlalchemy import inspect, text
+
+# table name -> list of (column name, column DDL)
+ADDED_COLUMNS = {
+    "user": [
+        ("data_version", "INTEGER NOT NULL DEFAULT 0"),
+        ("data_changed_at", "TIMESTAMP"),
+        ("pending_deletion", "BOOLEAN NOT NULL DEFAULT FALSE"),
+        ("notification_mode", "VARCHAR(10) NOT NULL DEFAULT 'digest'"),
+        ("calendar_token", "VARCHAR(64)"),
+        ("budget_compact_years", "INTEGER"),
+    ],
+    "task": [
+        ("recurrence", "VARCHAR(200)"),
+        ("recurrence_exdates", "TEXT"),
+        ("series_id", "INTEGER"),
+        ("occurrence_at", "TIMESTAMP"),
+        ("updated_at", "TIMESTAMP NOT NULL DEFAULT '2000-01-01 00:00:00'"),
+    ],
+    "budget": [
+        ("recurrence", "VARCHAR(200)"),
+        ("recurrence_exdates", "TEXT"),
+        ("series_id", "INTEGER"),
+        ("occurrence_at", "TIMESTAMP"),
+        ("updated_at", "TIMESTAMP NOT NULL DEFAULT '2000-01-01 00:00:00'"),
+    ],
+}
+
+
+# Indexes declared on the models after their tables already existed in
+# deployed databases; created by name if missing
+ADDED_INDEXES = [
+    "ix_task_series_id",
+    "ix_budget_series_id",
+    "ix_task_user_status_deadline",
+    "ix_task_user_deadline",
+    "ix_task_open_user_deadline",
+    "ix_task_recurring_user",
+    "ix_task_tag_tag_id",
+    "ix_budget_user_date",
+    "ix_budget_recurring_user",
+    "ix_user_calendar_token",
+    "ix_task_user_updated",
+    "ix_budget_user_updated",
+    "ix_budget_user_category_date",
+    "ix_budget_user_type_date",
+    "ix_budget_user_amount",
+    "ix_task_done_updated",
+]
+
+
+def upgrade_schema(db):
+    """Add any columns from ``ADDED_COLUMNS`` and indexes from ``ADDED_INDEXES`` that the live database lacks."""
+    inspector = inspect(db.engine)
+    quote = db.engine.dialect.identifier_preparer.quote
+    existing_tables = set(inspector.get_table_names())
+
+    with db.engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            if table not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table)}
+            for name, ddl in columns:
+                if name not in present:
+                    conn.execute(text(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(name)} {ddl}"))
+                    print(f"🛠️ Added column {table}.{name}")
+
+        indexes = {i.name: i for t in db.metadata.tables.values() for i in t.indexes}
+        for name in ADDED_INDEXES:
+            index = indexes.get(name)
+            if index is None or index.table.name not in existing_tables:
+                continue
+            present = {i["name"] for i in inspector.get_indexes(index.table.name)}
+            if name not in present:
+                index.create(conn)
+                print(f"🛠️ Added index {name}")
@@ -0,0 +1,205 @@
+"""Full-text search over task titles/descriptions and transaction categories.
+
+PostgreSQL: a generated, stored ``search_vector`` tsvector column on ``task``
+and ``budget`` with GIN indexes, queried with ``@@`` and ranked by ``ts_rank``.
+
+SQLite: FTS5 external-content tables (``task_fts``, ``budget_fts``) that
+triggers keep in sync on insert/update/delete, ranked by ``bm25``.
+
+Other backends (or SQLite builds without FTS5) fall back to LIKE scans.
+"""
+import re
+
+from sqlalchemy import DateTime, and_, column, select, table, text
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TERMS = 8
+
+_backend = {"kind": None}
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS budget_fts USING fts5("
+    "category, content='budget', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS budget_fts_ai AFTER INSERT ON budget BEGIN "
+    "INSERT INTO budget_fts(rowid, category) VALUES (new.id, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS budget_fts_ad AFTER DELETE ON budget BEGIN "
+    "INSERT INTO budget_fts(budget_fts, rowid, category) VALUES ('delete', old.id, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS budget_fts_au AFTER UPDATE OF category ON budget BEGIN "
+    "INSERT INTO budget_fts(budget_fts, rowid, category) VALUES ('delete', old.id, old.category); "
+    "INSERT INTO budget_fts(rowid, category) VALUES (new.id, new.category); END",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_task_search_vector ON task USING GIN (search_vector)",
+    "ALTER TABLE budget ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "to_tsvector('simple', coalesce(category, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_budget_search_vector ON budget USING GIN (search_vector)",
+]
+
+
+def create_postgres_search(conn):
+    """Create (idempotently) the PostgreSQL search columns and indexes on ``conn``."""
+    for ddl in POSTGRES_DDL:
+        conn.execute(text(ddl))
+
+
+def init_search(db):
+    """Create (idempotently) the search structures for the current backend."""
+    dialect = db.engine.dialect.name
+    try:
+        if dialect == "postgresql":
+            with db.engine.begin() as conn:
+                create_postgres_search(conn)
+            _backend["kind"] = "postgresql"
+        elif dialect == "sqlite":
+            with db.engine.begin() as conn:
+                existing = {r[0] for r in conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE name IN ('task_fts', 'budget_fts')"
+                ))}
+                for ddl in SQLITE_DDL:
+                    conn.execute(text(ddl))
+                # index rows written before the FTS tables existed
+                if "task_fts" not in existing:
+                    conn.execute(text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+                if "budget_fts" not in existing:
+                    conn.execute(text("INSERT INTO budget_fts(budget_fts) VALUES ('rebuild')"))
+            _backend["kind"] = "sqlite"
+        else:
+            _backend["kind"] = "like"
+    except Exception as e:
+        print(f"Full-text search unavailable, falling back to LIKE: {e}")
+        _backend["kind"] = "like"
+    return _backend["kind"]
+
+
+def parse_terms(query):
+    """Extract up to MAX_TERMS word tokens; everything else is dropped."""
+    return TOKEN_RE.findall(query or "")[:MAX_TERMS]
+
+
+def _fts5_query(terms):
+    # quote every term, last one is a prefix match (search-as-you-type)
+    quoted = ['"%s"' % t.replace('"', '""') for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _tsquery(terms):
+    return " & ".join(terms[:-1] + [terms[-1] + ":*"])
+
+
+def _page(session, sql_rows, sql_count, params, datetime_column):
+    total = session.execute(text(sql_count), params).scalar() or 0
+    # typed so SQLite returns datetimes rather than raw strings
+    stmt = text(sql_rows).columns(**{datetime_column: DateTime})
+    rows = [dict(r._mapping) for r in session.execute(stmt, params)]
+    return {"total": total, "items": rows}
+
+
+def search_tasks(session, user_id, terms, limit, offset):
+    params = {"uid": user_id, "limit": limit, "offset": offset}
+    kind = _backend["kind"]
+
+    if kind == "sqlite":
+        params["q"] = _fts5_query(terms)
+        base = "FROM task_fts JOIN task t ON t.id = task_fts.rowid WHERE task_fts MATCH :q AND t.user_id = :uid"
+        return _page(
+            session,
+            "SELECT t.id, t.title, t.deadline, t.status, t.priority, "
+            "snippet(task_fts, -1, '[', ']', '…', 12) AS snippet, bm25(task_fts, 10.0, 1.0) AS rank "
+            + base + " ORDER BY rank, t.id DESC LIMIT :limit OFFSET :offset",
+            "SELECT count(*) " + base,
+            params, "deadline",
+        )
+
+    if kind == "postgresql":
+        params["q"] = _tsquery(terms)
+        base = "FROM task t, to_tsquery('simple', :q) query WHERE t.user_id = :uid AND t.search_vector @@ query"
+        return _page(
+            session,
+            "SELECT t.id, t.title, t.deadline, t.status, t.priority, "
+            "ts_headline('simple', coalesce(t.description, t.title), query) AS snippet, "
+            "ts_rank(t.search_vector, query) AS rank "
+            + base + " ORDER BY rank DESC, t.id DESC LIMIT :limit OFFSET :offset",
+            "SELECT count(*) " + base,
+            params, "deadline",
+        )
+
+    params["q"] = "%" + "%".join(terms) + "%"
+    base = "FROM task t WHERE t.user_id = :uid AND (t.title LIKE :q OR t.description LIKE :q)"
+    return _page(
+        session,
+        "SELECT t.id, t.title, t.deadline, t.status, t.priority, t.title AS snippet, 0 AS rank "
+        + base + " ORDER BY t.deadline DESC LIMIT :limit OFFSET :offset",
+        "SELECT count(*) " + base,
+        params, "deadline",
+    )
+
+
+def search_transactions(session, user_id, terms, limit, offset):
+    params = {"uid": user_id, "limit": limit, "offset": offset}
+    kind = _backend["kind"]
+    columns = "b.id, b.date, b.category, b.type, b.amount, b.currency"
+
+    if kind == "sqlite":
+        params["q"] = _fts5_query(terms)
+        base = "FROM budget_fts JOIN budget b ON b.id = budget_fts.rowid WHERE budget_fts MATCH :q AND b.user_id = :uid"
+        return _page(
+            session,
+            f"SELECT {columns}, bm25(budget_fts) AS rank " + base
+            + " ORDER BY rank, b.date DESC LIMIT :limit OFFSET :offset",
+            "SELECT count(*) " + base,
+            params, "date",
+        )
+
+    if kind == "postgresql":
+        params["q"] = _tsquery(terms)
+        base = "FROM budget b, to_tsquery('simple', :q) query WHERE b.user_id = :uid AND b.search_vector @@ query"
+        return _page(
+            session,
+            f"SELECT {columns}, ts_rank(b.search_vector, query) AS rank " + base
+            + " ORDER BY rank DESC, b.date DESC LIMIT :limit OFFSET :offset",
+            "SELECT count(*) " + base,
+            params, "date",
+        )
+
+    params["q"] = "%" + "%".join(terms) + "%"
+    base = "FROM budget b WHERE b.user_id = :uid AND b.category LIKE :q"
+    return _page(
+        session,
+        f"SELECT {columns}, 0 AS rank " + base + " ORDER BY b.date DESC LIMIT :limit OFFSET :offset",
+        "SELECT count(*) " + base,
+        params, "date",
+    )
+
+
+def transaction_match(Budget, terms):
+    """Filter clause for transactions whose category matches ``terms`` (as in search_transactions)."""
+    kind = _backend["kind"]
+    if kind == "sqlite":
+        fts = table("budget_fts", column("rowid"))
+        return Budget.id.in_(
+            select(fts.c.rowid).where(text("budget_fts MATCH :fts_q").bindparams(fts_q=_fts5_query(terms)))
+        )
+    if kind == "postgresql":
+        return text("budget.search_vector @@ to_tsquery('simple', :ts_q)").bindparams(ts_q=_tsquery(terms))
+    return and_(*(Budget.category.ilike(f"%{t}%") for t in terms))
+
+
+def text_matches(value, terms):
+    """In-memory counterpart of the full-text match: every term a word, the last one a prefix."""
+    words = {w.lower() for w in TOKEN_RE.findall(value or "")}
+    *whole, last = [t.lower() for t in terms]
+    return all(t in words for t in whole) and any(w.startswith(last) for w in words)
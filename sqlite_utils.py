@@ -0,0 +1,171 @@
+"""SQLite deployment profile for small installs.
+
+Several gunicorn workers sharing one SQLite file otherwise run into
+"database is locked" and an fsync per commit. With
+``SQLITE_PROFILE='performance'`` every SQLite connection gets:
+
+- ``journal_mode=WAL``: readers and the writer no longer block each other;
+- ``synchronous=NORMAL``: fsync only at checkpoints (safe against app
+  crashes; a power loss can drop the last few commits);
+- ``mmap_size`` / ``cache_size``: hot pages served from memory;
+- ``busy_timeout``: wait for another process's write lock instead of failing.
+
+SQLite allows one writer at a time, so within a process sessions queue for
+it in arrival order (``WriterQueue``) from their first write until commit
+or rollback, rather than all spinning in SQLite's busy handler. A periodic
+job checkpoints the WAL and runs ``PRAGMA optimize``.
+
+``SQLITE_PROFILE='default'`` leaves SQLite as it is. The journal mode is
+stored in the database file, so going back from WAL needs
+``PRAGMA journal_mode=DELETE``.
+"""
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+PROFILES = ("performance", "default")
+
+_HOLDS_WRITER = "sqlite_writer"
+
+
+def is_sqlite(engine):
+    return engine.dialect.name == "sqlite"
+
+
+def is_busy_error(error):
+    """True for SQLite lock timeouts ("database is locked")."""
+    return isinstance(error, OperationalError) and "is locked" in str(getattr(error, "orig", error))
+
+
+def sqlite_pragmas(config):
+    """``[(pragma, value)]`` of the performance profile, in the order they are set."""
+    return [
+        ("busy_timeout", int(config["SQLITE_BUSY_TIMEOUT_MS"])),
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("cache_size", -int(config["SQLITE_CACHE_SIZE_KB"])),
+        ("mmap_size", int(config["SQLITE_MMAP_SIZE"])),
+        ("temp_store", "MEMORY"),
+    ]
+
+
+def apply_pragmas(dbapi_connection, pragmas, in_memory=False):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            if name == "journal_mode" and in_memory:
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+class WriterQueue:
+    """FIFO lock for SQLite's single writer, shared by a process's threads.
+
+    ``acquire`` gives up after ``timeout`` seconds and lets the caller go on
+    to SQLite's own busy handling, so a leaked hold cannot stall writes.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiting = deque()
+        self._held = False
+
+    def acquire(self, timeout):
+        ticket = object()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while self._held or self._waiting[0] is not ticket:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self._held = True
+                return True
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self._held = False
+            self._cond.notify_all()
+
+    @property
+    def waiting(self):
+        return len(self._waiting)
+
+
+def _register_writer_queue(db, queue, timeout):
+    def hold(session):
+        if _HOLDS_WRITER not in session.info:
+            session.info[_HOLDS_WRITER] = queue.acquire(timeout)
+
+    @event.listens_for(db.session, "before_flush")
+    def _queue_flush(session, flush_context, instances):
+        hold(session)
+
+    @event.listens_for(db.session, "do_orm_execute")
+    def _queue_dml(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            hold(orm_execute_state.session)
+
+    @event.listens_for(db.session, "after_transaction_end")
+    def _release(session, transaction):
+        if transaction.parent is None and session.info.pop(_HOLDS_WRITER, False):
+            queue.release()
+
+
+def register_sqlite_profile(app, db):
+    """Apply ``SQLITE_PROFILE`` to the app's SQLite engines (call in an app context).
+
+    Returns the process's WriterQueue, or None when the profile is not in
+    use or the primary database is not SQLite.
+    """
+    if app.config["SQLITE_PROFILE"] != "performance":
+        return None
+    pragmas = sqlite_pragmas(app.config)
+
+    for engine in db.engines.values():
+        if not is_sqlite(engine):
+            continue
+        in_memory = engine.url.database in (None, "", ":memory:")
+
+        @event.listens_for(engine, "connect")
+        def _set_pragmas(dbapi_connection, connection_record, in_memory=in_memory):
+            apply_pragmas(dbapi_connection, pragmas, in_memory)
+
+    if not is_sqlite(db.engine):
+        return None
+    queue = WriterQueue()
+    _register_writer_queue(db, queue, app.config["SQLITE_BUSY_TIMEOUT_MS"] / 1000.0)
+    return queue
+
+
+def sqlite_maintenance(app, db):
+    """Scheduler job: checkpoint and truncate the WAL, refresh planner statistics.
+
+    Returns ``{bind: (busy, wal_frames, checkpointed_frames)}``.
+    """
+    results = {}
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            if not is_sqlite(engine) or engine.url.database in (None, "", ":memory:"):
+                continue
+            try:
+                with engine.connect() as conn:
+                    busy, log, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one()
+                    conn.exec_driver_sql("PRAGMA optimize")
+            except Exception as e:
+                print(f"Error in SQLite maintenance: {e}")
+                continue
+            results[bind or "default"] = (busy, log, checkpointed)
+            if busy:
+                print(f"🧹 WAL checkpoint of {bind or 'default'} incomplete ({checkpointed}/{log} frames), readers active")
+    return results
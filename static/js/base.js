@@ -0,0 +1,54 @@
+// Conditional fetch for AJAX partials/JSON: remembers each URL's ETag and
+// body in sessionStorage, sends If-None-Match and reuses the body on 304.
+async function fetchWithETag(url, options = {}) {
+    const key = 'etag:' + url;
+    let cached = null;
+    try { cached = JSON.parse(sessionStorage.getItem(key)); } catch (e) {}
+
+    const headers = Object.assign({}, options.headers || {});
+    if (cached) headers['If-None-Match'] = cached.etag;
+    const res = await fetch(url, Object.assign(
+        { credentials: 'same-origin', cache: 'no-store' }, options, { headers }
+    ));
+
+    let body;
+    if (res.status === 304 && cached) {
+        body = cached.body;
+    } else {
+        body = await res.text();
+        const etag = res.headers.get('ETag');
+        if (res.ok && etag) {
+            try { sessionStorage.setItem(key, JSON.stringify({ etag, body })); } catch (e) {}
+        }
+    }
+    const ok = res.ok || (res.status === 304 && cached !== null);
+    return { ok, status: ok ? 200 : res.status, text: async () => body, json: async () => JSON.parse(body) };
+}
+
+// Mobile menu toggle
+function toggleMobileMenu() {
+    const navLinks = document.getElementById('navLinks');
+    navLinks.classList.toggle('mobile-active');
+}
+
+// Close mobile menu when clicking outside
+document.addEventListener('click', function(event) {
+    const navLinks = document.getElementById('navLinks');
+    const menuBtn = document.querySelector('.mobile-menu-btn');
+    
+    if (navLinks && !navLinks.contains(event.target) && !menuBtn.contains(event.target)) {
+        navLinks.classList.remove('mobile-active');
+    }
+});
+
+// Highlight active nav link
+document.addEventListener('DOMContentLoaded', function() {
+    const currentPath = window.location.pathname;
+    const navLinks = document.querySelectorAll('.nav-link');
+    
+    navLinks.forEach(link => {
+        if (link.getAttribute('href') === currentPath) {
+            link.classList.add('active');
+        }
+    });
+});
@@ -0,0 +1,185 @@
+// AJAX pagination for budgets table
+function attachAjaxPagination(){
+    document.querySelectorAll('.ajax-page').forEach(a=>{
+        a.removeEventListener('click', ajaxPageHandler);
+        a.addEventListener('click', ajaxPageHandler);
+    });
+}
+
+function attachAjaxEdit(){
+    document.querySelectorAll('.ajax-edit').forEach(a=>{
+        a.removeEventListener('click', ajaxEditHandler);
+        a.addEventListener('click', ajaxEditHandler);
+    });
+}
+
+// Reload the table partial for the page currently shown
+async function reloadBudgetsTable(){
+    const container = document.getElementById('budgetsTableContainer');
+    const reloadUrl = (container && container.dataset.currentUrl) ? container.dataset.currentUrl : window.location.pathname + window.location.search;
+    const fetchUrl = reloadUrl + (reloadUrl.includes('?') ? '&ajax=1' : '?ajax=1');
+    const r2 = await fetchWithETag(fetchUrl);
+    if(r2.ok && container){
+        container.innerHTML = await r2.text();
+        attachAjaxPagination();
+        attachAjaxEdit();
+    } else {
+        window.location.reload();
+    }
+}
+
+function updateBudgetSummary(summary){
+    const sym = summary.currency_symbol;
+    ['incomes', 'expenses', 'balance'].forEach(key=>{
+        const el = document.querySelector(`[data-summary="${key}"]`);
+        if(el) el.textContent = sym + Number(summary[key]).toFixed(2);
+    });
+    const card = document.querySelector('.summary-card.balance');
+    if(card){
+        card.classList.toggle('positive', summary.balance >= 0);
+        card.classList.toggle('negative', summary.balance < 0);
+    }
+    const icon = document.querySelector('[data-summary="balance-icon"]');
+    if(icon) icon.textContent = summary.balance >= 0 ? '✅' : '⚠️';
+}
+
+// Show messages the way flashed ones are rendered (see base.html)
+function showFlashMessages(messages){
+    if(!messages || !messages.length) return;
+    let box = document.querySelector('.flash-container');
+    if(!box){
+        box = document.createElement('div');
+        box.className = 'flash-container';
+        document.querySelector('main').prepend(box);
+    }
+    const icons = {success: '✅', error: '❌', warning: '⚠️'};
+    messages.forEach(m=>{
+        const el = document.createElement('div');
+        el.className = `modern-flash modern-flash-${m.category}`;
+        const icon = document.createElement('span');
+        icon.className = 'flash-icon';
+        icon.textContent = icons[m.category] || 'ℹ️';
+        const text = document.createElement('span');
+        text.className = 'flash-message';
+        text.textContent = m.message;
+        const close = document.createElement('button');
+        close.className = 'flash-close';
+        close.innerHTML = '&times;';
+        close.addEventListener('click', ()=>el.remove());
+        el.append(icon, text, close);
+        box.appendChild(el);
+    });
+}
+
+// Patch a table row with an edit's fragment response (see _budget_fragment)
+async function applyBudgetFragment(row, data){
+    if(data.summary) updateBudgetSummary(data.summary);
+    showFlashMessages(data.alerts);
+    if(!row || !data.html || data.moved){
+        // the row left the filter or changed its place: page contents shift
+        await reloadBudgetsTable();
+        return;
+    }
+    const tpl = document.createElement('template');
+    tpl.innerHTML = data.html.trim();
+    const fresh = tpl.content.firstElementChild;
+    row.replaceWith(fresh);
+    attachAjaxEdit();
+}
+
+function closeModal(){
+    const modal = document.getElementById('ajaxModal');
+    modal.style.display = 'none';
+    document.getElementById('ajaxModalContent').innerHTML = '';
+}
+
+async function ajaxEditHandler(e){
+    e.preventDefault();
+    const href = e.currentTarget.href;
+    const row = e.currentTarget.closest('tr');
+    const url = href + (href.includes('?') ? '&ajax=1' : '?ajax=1');
+    try{
+        const res = await fetchWithETag(url);
+        if(!res.ok) throw new Error('Network error');
+        const html = await res.text();
+        const modal = document.getElementById('ajaxModal');
+        const content = document.getElementById('ajaxModalContent');
+        content.innerHTML = html;
+        modal.style.display = 'flex';
+
+        const cancelBtn = document.getElementById('ajax-edit-cancel');
+        if(cancelBtn) cancelBtn.addEventListener('click', closeModal);
+
+        const form = document.getElementById('ajax-edit-budget-form');
+        if(form){
+            form.addEventListener('submit', async function(ev){
+                ev.preventDefault();
+                const fd = new FormData(form);
+                try{
+                    const postRes = await fetch(form.action + (form.action.includes('?') ? '&' : '?') + 'ajax=1&fragment=1', {
+                        method: 'POST',
+                        body: fd,
+                        credentials: 'same-origin',
+                        headers: { 'X-Requested-With': 'XMLHttpRequest' }
+                    });
+                    const data = await postRes.json();
+                    if(data && data.success){
+                        closeModal();
+                        await applyBudgetFragment(row, data);
+                    } else {
+                        window.location.reload();
+                    }
+                }catch(err){
+                    console.error('AJAX edit submit failed', err);
+                    window.location.reload();
+                }
+            });
+        }
+
+    }catch(err){
+        console.error('Failed to load edit form', err);
+        window.location.href = href;
+    }
+}
+
+async function ajaxPageHandler(e){
+    e.preventDefault();
+    const href = e.currentTarget.href;
+    const url = href + (href.includes('?') ? '&ajax=1' : '?ajax=1');
+    try{
+        const res = await fetchWithETag(url);
+        if(!res.ok) throw new Error('Network error');
+        const html = await res.text();
+        const container = document.getElementById('budgetsTableContainer');
+        if(container){
+            container.innerHTML = html;
+            container.dataset.currentUrl = href;
+            attachAjaxPagination();
+            attachAjaxEdit();
+        } else {
+            window.location.href = href;
+        }
+    }catch(err){
+        console.error('AJAX page load failed', err);
+        window.location.href = href;
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function(){
+    attachAjaxPagination();
+    attachAjaxEdit();
+    
+    // Save scroll position before form submission
+    document.querySelectorAll('form[data-preserve-scroll]').forEach(form => {
+        form.addEventListener('submit', function() {
+            sessionStorage.setItem('scrollPosition', window.scrollY);
+        });
+    });
+    
+    // Restore scroll position after page load
+    const savedScrollPosition = sessionStorage.getItem('scrollPosition');
+    if (savedScrollPosition) {
+        window.scrollTo(0, parseInt(savedScrollPosition));
+        sessionStorage.removeItem('scrollPosition');
+    }
+});
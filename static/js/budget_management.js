@@ -0,0 +1,184 @@
+// Toggle Transaction Form
+function toggleTransactionForm() {
+    const formContainer = document.getElementById('transactionFormContainer');
+    const formHelper = document.getElementById('formHelper');
+    const fabButton = document.getElementById('fabButton');
+    
+    if (formContainer.style.display === 'none') {
+        // Show form
+        formContainer.style.display = 'block';
+        if (formHelper) formHelper.style.display = 'none';
+        if (fabButton) fabButton.classList.add('active');
+        
+        // Smooth scroll to form
+        setTimeout(() => {
+            formContainer.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+        }, 100);
+        
+        // Focus on category input
+        setTimeout(() => {
+            const categoryInput = document.querySelector('#transactionFormContainer select[name="category"]');
+            if (categoryInput) categoryInput.focus();
+        }, 400);
+    } else {
+        // Hide form
+        formContainer.style.display = 'none';
+        if (formHelper) formHelper.style.display = 'block';
+        if (fabButton) fabButton.classList.remove('active');
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function(){
+
+    /* Custom Category */
+    const sel = document.querySelector('#transactionFormContainer select[name="category"]');
+    const customGroup = document.getElementById('customCatGroup');
+
+    function toggleCustom(){
+        if(sel && sel.value === 'Other'){
+            if (customGroup) customGroup.style.display = 'flex';
+        } else {
+            if (customGroup) customGroup.style.display = 'none';
+        }
+    }
+    if (sel) {
+        sel.addEventListener("change", toggleCustom);
+        toggleCustom();
+    }
+
+
+    /* DOWNLOAD MENU */
+    const btn = document.getElementById("downloadBtn");
+    const menu = document.getElementById("downloadMenu");
+
+    btn.addEventListener("click", () => {
+        menu.style.display = menu.style.display === "block" ? "none" : "block";
+    });
+
+    document.addEventListener("click", e => {
+        if (!btn.contains(e.target) && !menu.contains(e.target)) {
+            menu.style.display = "none";
+        }
+    });
+
+
+    /* CHARTS */
+    const chartData = JSON.parse(document.getElementById('budgetChartData').textContent);
+    const breakdownAll = chartData.breakdown;
+    const breakdownExpenses = chartData.breakdown_expenses;
+
+    if(breakdownAll){
+
+        // Improved palette: use blues/oranges/purples for clarity (avoid many greens)
+        const colors = [
+            '#2563eb','#06b6d4','#f59e0b','#7c3aed','#ef4444',
+            '#60a5fa','#f97316','#a78bfa','#84cc16','#f472b6'
+        ];
+
+        /* PIE: show expenses by category plus an Income slice; display percentages */
+        const pieLabels = breakdownExpenses.map(x => x[0]).concat(['Income']);
+        const expenseValues = breakdownExpenses.map(x => Number(x[1]));
+        const totalIncome = Number(chartData.incomes);
+        const pieData = expenseValues.concat([totalIncome]);
+
+        // compute total for percentage calculations
+        const pieTotal = pieData.reduce((a,b)=>a+(Number(b)||0), 0) || 1;
+        const pieColors = colors.slice(0, pieLabels.length);
+
+        new Chart(document.getElementById("categoryPie"), {
+            type: "pie",
+            data: {
+                labels: pieLabels,
+                datasets: [{
+                    data: pieData,
+                    backgroundColor: pieColors
+                }]
+            },
+            options: { 
+                responsive:true, 
+                maintainAspectRatio:false,
+                plugins:{ 
+                    legend:{ display:false },
+                    tooltip: {
+                        callbacks: {
+                            label: function(ctx){
+                                const label = ctx.label || '';
+                                const val = Number(ctx.parsed) || 0;
+                                const pct = ((val / pieTotal) * 100).toFixed(1);
+                                const sym = chartData.currency_symbol;
+                                return `${label}: ${sym}${val.toFixed(2)} (${pct}%)`;
+                            }
+                        }
+                    }
+                }
+            }
+        });
+
+        /* BAR (rounded) */
+        const expLabels = breakdownExpenses.map(x => x[0]);
+        const expData = breakdownExpenses.map(x => x[1]);
+
+        new Chart(document.getElementById("expenseBar"), {
+            type: "bar",
+            data: {
+                labels: expLabels,
+                datasets: [{
+                    data: expData,
+                    backgroundColor: colors.slice(0, expLabels.length),
+                    borderRadius: 12,
+                    borderSkipped: false
+                }]
+            },
+            options:{
+                responsive:true, 
+                maintainAspectRatio:false,
+                scales:{ y:{ beginAtZero:true } },
+                plugins:{ legend:{ display:false } }
+            }
+        });
+
+        /* Legend */
+        const legend = document.getElementById("chartLegend");
+        pieLabels.forEach((label,i)=>{
+            const item = document.createElement("li");
+            item.innerHTML = `
+                <span style="background:${colors[i]}"></span>
+                ${label}
+            `;
+            legend.appendChild(item);
+        });
+
+        /* TREND: monthly income/expense from the analytics API */
+        const trendCanvas = document.getElementById("trendLine");
+        if (trendCanvas) {
+            fetchWithETag(trendCanvas.dataset.url)
+                .then(res => res.ok ? res.json() : null)
+                .then(data => {
+                    if (!data) return;
+                    const series = data.series;
+                    new Chart(trendCanvas, {
+                        type: "line",
+                        data: {
+                            labels: series.labels,
+                            datasets: [
+                                { label: "Income", data: series.income, borderColor: "#06b6d4", tension: 0.3 },
+                                { label: "Expense", data: series.expense, borderColor: "#ef4444", tension: 0.3 }
+                            ]
+                        },
+                        options: {
+                            responsive: true,
+                            maintainAspectRatio: false,
+                            animation: false,
+                            elements: { point: { radius: series.labels.length > 36 ? 0 : 3 } },
+                            scales: { y: { beginAtZero: true } }
+                        }
+                    });
+
+                    const f = data.forecast;
+                    const sym = chartData.currency_symbol;
+                    document.getElementById("trendForecast").textContent =
+                        `This month: ${sym}${f.spent.toFixed(2)} spent, ~${sym}${f.projected.toFixed(2)} projected`;
+                });
+        }
+    }
+});
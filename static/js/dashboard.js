@@ -0,0 +1,40 @@
+const chartData = JSON.parse(document.getElementById('dashboardChartData').textContent);
+const taskData = chartData.task;
+const financeData = chartData.finance;
+
+/* TASK PIE */
+new Chart(document.getElementById('taskChart'), {
+    type: 'pie',
+    data: {
+        labels: taskData.labels,
+        datasets: [{
+            data: taskData.values,
+            // Pending (yellow), Completed (blue), Overdue (red)
+            backgroundColor: ['#facc15', '#2563eb', '#ef4444']
+        }]
+    },
+    options:{
+        plugins: { legend:{ position:'bottom' } },
+        responsive:true
+    }
+});
+
+/* FINANCE BAR */
+new Chart(document.getElementById('financeChart'), {
+    type: 'bar',
+    data: {
+        labels: financeData.labels,
+        datasets: [{
+            data: financeData.values,
+            // Income (blue), Expenses (red)
+            backgroundColor: ['#2563eb', '#ef4444'],
+            borderRadius: 12,
+            borderSkipped: false
+        }]
+    },
+    options:{
+        plugins:{ legend:{ display:false } },
+        responsive:true,
+        scales:{ y:{ beginAtZero:true } }
+    }
+});
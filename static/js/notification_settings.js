@@ -0,0 +1,36 @@
+document.getElementById('checkNotificationsBtn').addEventListener('click', async function() {
+    const btn = this;
+    const result = document.getElementById('notificationResult');
+    
+    // Disable button and show loading
+    btn.disabled = true;
+    btn.textContent = '⏳ Checking...';
+    result.style.display = 'none';
+    
+    try {
+        const response = await fetch('/api/check-notifications', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': btn.dataset.csrfToken
+            }
+        });
+        
+        const data = await response.json();
+        
+        if (data.success) {
+            result.className = 'notification-result success';
+            result.textContent = `✅ ${data.message}`;
+        } else {
+            result.className = 'notification-result error';
+            result.textContent = `❌ ${data.message || 'Failed to check notifications'}`;
+        }
+    } catch (error) {
+        result.className = 'notification-result error';
+        result.textContent = '❌ Error checking notifications. Please try again.';
+    } finally {
+        // Re-enable button
+        btn.disabled = false;
+        btn.textContent = '📧 Check for Notifications Now';
+    }
+});
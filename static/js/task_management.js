@@ -0,0 +1,205 @@
+// Toggle Task Form
+function toggleTaskForm() {
+    const formContainer = document.getElementById('taskFormContainer');
+    const formHelper = document.getElementById('formHelper');
+    const fabButton = document.getElementById('fabButton');
+    
+    if (formContainer.style.display === 'none') {
+        // Show form
+        formContainer.style.display = 'block';
+        if (formHelper) formHelper.style.display = 'none';
+        if (fabButton) fabButton.classList.add('active');
+        
+        // Smooth scroll to form
+        setTimeout(() => {
+            formContainer.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+        }, 100);
+        
+        // Focus on title input
+        setTimeout(() => {
+            const titleInput = document.querySelector('#taskFormContainer input[name="title"]');
+            if (titleInput) titleInput.focus();
+        }, 400);
+    } else {
+        // Hide form
+        formContainer.style.display = 'none';
+        if (formHelper) formHelper.style.display = 'block';
+        if (fabButton) fabButton.classList.remove('active');
+    }
+}
+
+// AJAX Edit functionality for tasks
+function attachAjaxEdit(root = document){
+    root.querySelectorAll('.ajax-edit').forEach(a=>{
+        a.removeEventListener('click', ajaxEditHandler);
+        a.addEventListener('click', ajaxEditHandler);
+    });
+}
+
+function attachAjaxToggle(root = document){
+    root.querySelectorAll('form.ajax-toggle').forEach(f=>{
+        f.removeEventListener('submit', ajaxToggleHandler);
+        f.addEventListener('submit', ajaxToggleHandler);
+    });
+}
+
+function withFragment(url){
+    return url + (url.includes('?') ? '&' : '?') + 'ajax=1&fragment=1';
+}
+
+// Patch a task card with a mutation's fragment response (see _task_fragment)
+function applyTaskFragment(card, data){
+    if(!card || data.moved || data.html === undefined){
+        window.location.reload();
+        return;
+    }
+    if(data.html === null){
+        // no longer matches the list's filters
+        card.remove();
+        const count = document.getElementById('taskCount');
+        const left = count ? parseInt(count.textContent, 10) - 1 : 0;
+        if(left <= 0){
+            window.location.reload();
+            return;
+        }
+        count.textContent = left;
+        return;
+    }
+    const tpl = document.createElement('template');
+    tpl.innerHTML = data.html.trim();
+    const fresh = tpl.content.firstElementChild;
+    card.replaceWith(fresh);
+    attachAjaxEdit(fresh);
+    attachAjaxToggle(fresh);
+}
+
+async function ajaxToggleHandler(e){
+    e.preventDefault();
+    const form = e.currentTarget;
+    const card = form.closest('.modern-task-card');
+    try{
+        const res = await fetch(withFragment(form.action), {
+            method: 'POST',
+            body: new FormData(form),
+            credentials: 'same-origin',
+            headers: { 'X-Requested-With': 'XMLHttpRequest' }
+        });
+        if(!res.ok) throw new Error('Network error');
+        applyTaskFragment(card, await res.json());
+    }catch(err){
+        console.error('AJAX toggle failed', err);
+        sessionStorage.setItem('scrollPosition', window.scrollY);
+        form.submit();
+    }
+}
+
+function closeModal(){
+    const modal = document.getElementById('ajaxModal');
+    modal.style.display = 'none';
+    document.getElementById('ajaxModalContent').innerHTML = '';
+}
+
+async function ajaxEditHandler(e){
+    e.preventDefault();
+    const href = e.currentTarget.href;
+    const card = e.currentTarget.closest('.modern-task-card');
+    const url = href + (href.includes('?') ? '&ajax=1' : '?ajax=1');
+    try{
+        const res = await fetchWithETag(url);
+        if(!res.ok) throw new Error('Network error');
+        const html = await res.text();
+        const modal = document.getElementById('ajaxModal');
+        const content = document.getElementById('ajaxModalContent');
+        content.innerHTML = html;
+        modal.style.display = 'flex';
+
+        const cancelBtn = document.getElementById('ajax-edit-cancel');
+        if(cancelBtn) cancelBtn.addEventListener('click', closeModal);
+
+        const form = document.getElementById('ajax-edit-task-form');
+        if(form){
+            form.addEventListener('submit', async function(ev){
+                ev.preventDefault();
+                const fd = new FormData(form);
+                try{
+                    const postRes = await fetch(withFragment(form.action), {
+                        method: 'POST',
+                        body: fd,
+                        credentials: 'same-origin',
+                        headers: { 'X-Requested-With': 'XMLHttpRequest' }
+                    });
+                    const data = await postRes.json();
+                    if(data && data.success){
+                        closeModal();
+                        applyTaskFragment(card, data);
+                    } else {
+                        window.location.reload();
+                    }
+                }catch(err){
+                    console.error('AJAX edit submit failed', err);
+                    window.location.reload();
+                }
+            });
+        }
+
+    }catch(err){
+        console.error('Failed to load edit form', err);
+        window.location.href = href;
+    }
+}
+
+// Close modal when clicking outside
+document.addEventListener('click', function(e) {
+    const modal = document.getElementById('ajaxModal');
+    if (e.target === modal) {
+        closeModal();
+    }
+});
+
+// Tag suggestions for the new-task form (revalidated with ETags)
+async function loadTagSuggestions(){
+    const input = document.getElementById('tags-input');
+    const list = document.getElementById('tag-suggestions');
+    if(!input || !list) return;
+    // suggest for the token currently being typed (after the last comma)
+    const prefix = input.value.split(',').pop().trim();
+    try{
+        const res = await fetchWithETag(input.dataset.suggestUrl + '?q=' + encodeURIComponent(prefix));
+        if(!res.ok) return;
+        const names = await res.json();
+        const head = input.value.includes(',') ? input.value.slice(0, input.value.lastIndexOf(',') + 1) + ' ' : '';
+        list.innerHTML = '';
+        names.forEach(name => {
+            const opt = document.createElement('option');
+            opt.value = head + name;
+            list.appendChild(opt);
+        });
+    }catch(err){
+        console.error('Tag suggestions failed', err);
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function(){
+    attachAjaxEdit();
+    attachAjaxToggle();
+
+    const tagsInput = document.getElementById('tags-input');
+    if(tagsInput){
+        tagsInput.addEventListener('focus', loadTagSuggestions);
+        tagsInput.addEventListener('input', loadTagSuggestions);
+    }
+    
+    // Save scroll position before form submission
+    document.querySelectorAll('form[data-preserve-scroll]').forEach(form => {
+        form.addEventListener('submit', function() {
+            sessionStorage.setItem('scrollPosition', window.scrollY);
+        });
+    });
+    
+    // Restore scroll position after page load
+    const savedScrollPosition = sessionStorage.getItem('scrollPosition');
+    if (savedScrollPosition) {
+        window.scrollTo(0, parseInt(savedScrollPosition));
+        sessionStorage.removeItem('scrollPosition');
+    }
+});
@@ -0,0 +1,208 @@
+"""Delta sync for clients that keep a local copy of tasks and transactions.
+
+``/api/sync`` returns the rows changed since a cursor plus tombstones for
+deleted ones, instead of clients refetching whole pages after every edit.
+
+- Changes are found through ``updated_at`` (index ``(user_id, updated_at, id)``).
+  Tag changes bump the task's ``updated_at``; tasks carry their tag list.
+- Deletes leave a SyncTombstone, kept for SYNC_TOMBSTONE_DAYS. Older cursors
+  get a full resync (``reset``).
+
+The cursor holds a keyset position ``(updated_at, id)`` per stream plus the
+user's data version. A poll made with the current data version is answered
+without touching the database. When a stream is exhausted its position is
+held back to ``now - SYNC_SETTLE_SECONDS``, so rows stamped by a
+transaction that commits a moment later are still picked up. Recent rows
+may therefore arrive twice: clients apply rows as upserts by id.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import attributes
+
+from models import now_ist_naive
+from read_models import tag_names_by_task
+
+TASK_FIELDS = (
+    "id", "title", "description", "deadline", "priority", "status", "tags",
+    "recurrence", "recurrence_exdates", "series_id", "occurrence_at", "updated_at",
+)
+BUDGET_FIELDS = (
+    "id", "date", "category", "type", "amount", "currency",
+    "recurrence", "recurrence_exdates", "series_id", "occurrence_at", "updated_at",
+)
+
+_EPOCH = datetime(1970, 1, 1)
+_STREAMS = ("tasks", "budgets", "deleted")
+
+
+def _micros(dt):
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def encode_cursor(version, positions):
+    """``version`` is None while more pages are pending (never matches a data version)."""
+    parts = [str(-1 if version is None else version)]
+    parts.extend(f"{_micros(positions[s][0])}-{positions[s][1]}" for s in _STREAMS)
+    return ".".join(parts)
+
+
+def decode_cursor(text):
+    """``(version, {stream: (updated_at, id)})``; raises ValueError."""
+    parts = (text or "").split(".")
+    if len(parts) != len(_STREAMS) + 1:
+        raise ValueError("malformed cursor")
+    positions = {}
+    for stream, part in zip(_STREAMS, parts[1:]):
+        micros, _, last_id = part.partition("-")
+        positions[stream] = (_EPOCH + timedelta(microseconds=int(micros)), int(last_id))
+    return int(parts[0]), positions
+
+
+def record_tombstones(connection, SyncTombstone, user_id, kind, ids, now=None):
+    """Insert tombstones for rows deleted by set-based statements."""
+    now = now or now_ist_naive()
+    if ids:
+        connection.execute(SyncTombstone.__table__.insert(), [
+            {"user_id": user_id, "kind": kind, "object_id": i, "deleted_at": now} for i in ids
+        ])
+
+
+def register_sync_listeners(db, Task, Budget, SyncTombstone):
+    """Stamp tag changes on their task and leave tombstones for ORM deletes."""
+    kinds = ((Task, "task"), (Budget, "budget"))
+
+    @event.listens_for(db.session, "before_flush")
+    def _touch_retagged(session, flush_context, instances):
+        for obj in session.dirty:
+            if isinstance(obj, Task) and attributes.get_history(
+                obj, "tags_rel", passive=attributes.PASSIVE_NO_INITIALIZE
+            ).has_changes():
+                obj.updated_at = now_ist_naive()
+
+    @event.listens_for(db.session, "after_flush")
+    def _tombstones(session, flush_context):
+        now = now_ist_naive()
+        rows = [
+            {"user_id": obj.user_id, "kind": kind, "object_id": obj.id, "deleted_at": now}
+            for obj in session.deleted
+            for model, kind in kinds
+            if isinstance(obj, model) and obj.user_id
+        ]
+        if rows:
+            session.connection().execute(SyncTombstone.__table__.insert(), rows)
+
+    return _tombstones
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _page(query, ts_col, id_col, position, limit):
+    ts, last_id = position
+    return (
+        query.filter(or_(ts_col > ts, and_(ts_col == ts, id_col > last_id)))
+        .order_by(ts_col, id_col)
+        .limit(limit + 1)
+        .all()
+    )
+
+
+def changes_since(session, Task, Budget, Tag, task_tag, SyncTombstone, user_id, data_version, cursor, now,
+                  page_size, settle_seconds, retention_days):
+    """The sync response for one user: changed rows, deleted ids and the next cursor."""
+    horizon = now - timedelta(seconds=settle_seconds)
+    reset = False
+    try:
+        version, positions = decode_cursor(cursor)
+        # tombstones older than the retention window may be gone
+        reset = positions["deleted"][0] < now - timedelta(days=retention_days)
+    except ValueError:
+        reset = True
+    if reset:
+        version = None
+        positions = {"tasks": (_EPOCH, 0), "budgets": (_EPOCH, 0), "deleted": (horizon, 0)}
+
+    payload = {
+        "reset": reset,
+        "has_more": False,
+        "tasks": {"fields": TASK_FIELDS, "rows": []},
+        "budgets": {"fields": BUDGET_FIELDS, "rows": []},
+        "deleted": {"tasks": [], "budgets": []},
+    }
+    if version == data_version:
+        payload["cursor"] = cursor
+        return payload
+
+    tasks = _page(
+        session.query(
+            Task.id, Task.title, Task.description, Task.deadline, Task.priority, Task.status,
+            Task.recurrence, Task.recurrence_exdates, Task.series_id, Task.occurrence_at, Task.updated_at,
+        ).filter(Task.user_id == user_id),
+        Task.updated_at, Task.id, positions["tasks"], page_size,
+    )
+    budgets = _page(
+        session.query(
+            Budget.id, Budget.date, Budget.category, Budget.type, Budget.amount, Budget.currency,
+            Budget.recurrence, Budget.recurrence_exdates, Budget.series_id, Budget.occurrence_at, Budget.updated_at,
+        ).filter(Budget.user_id == user_id),
+        Budget.updated_at, Budget.id, positions["budgets"], page_size,
+    )
+    tombstones = _page(
+        session.query(
+            SyncTombstone.id, SyncTombstone.kind, SyncTombstone.object_id,
+            SyncTombstone.deleted_at.label("updated_at"),
+        ).filter(SyncTombstone.user_id == user_id),
+        SyncTombstone.deleted_at, SyncTombstone.id, positions["deleted"], page_size,
+    )
+
+    def advance(stream, rows):
+        if len(rows) > page_size:
+            del rows[page_size:]
+            payload["has_more"] = True
+            positions[stream] = (rows[-1].updated_at, rows[-1].id)
+        else:
+            positions[stream] = max(positions[stream], (horizon, 0))
+
+    advance("tasks", tasks)
+    advance("budgets", budgets)
+    advance("deleted", tombstones)
+
+    tags = tag_names_by_task(session, [t.id for t in tasks], Tag, task_tag)
+    payload["tasks"]["rows"] = [
+        [t.id, t.title, t.description, _iso(t.deadline), t.priority, t.status, tags.get(t.id, []),
+         t.recurrence, t.recurrence_exdates, t.series_id, _iso(t.occurrence_at), _iso(t.updated_at)]
+        for t in tasks
+    ]
+    payload["budgets"]["rows"] = [
+        [b.id, _iso(b.date), b.category, b.type, b.amount, b.currency,
+         b.recurrence, b.recurrence_exdates, b.series_id, _iso(b.occurrence_at), _iso(b.updated_at)]
+        for b in budgets
+    ]
+
+    # SQLite may reuse the id of a deleted row: skip tombstones of ids the user has again
+    for kind, model, key in (("task", Task, "tasks"), ("budget", Budget, "budgets")):
+        ids = {t.object_id for t in tombstones if t.kind == kind}
+        if ids:
+            live = {r.id for r in session.query(model.id).filter(model.user_id == user_id, model.id.in_(ids))}
+            payload["deleted"][key] = sorted(ids - live)
+
+    payload["cursor"] = encode_cursor(None if payload["has_more"] else data_version, positions)
+    return payload
+
+
+def prune_tombstones(app, db, SyncTombstone, retention_days):
+    """Scheduler job: drop tombstones past the retention window."""
+    with app.app_context():
+        try:
+            cutoff = now_ist_naive() - timedelta(days=retention_days)
+            deleted = SyncTombstone.query.filter(SyncTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error pruning sync tombstones: {e}")
+            return 0
+        if deleted:
+            print(f"🪦 Pruned {deleted} sync tombstone(s)")
+        return deleted
@@ -0,0 +1,155 @@
+"""Per-user tags with maintained usage counts.
+
+Every tag belongs to one user and is unique per ``(user_id, lower(name))``.
+``tag.usage_count`` is the number of tasks carrying the tag; database
+triggers on ``task_tag`` keep it current for ORM and set-based writes alike.
+Tags whose count drops to zero are pruned by ``gc_unused_tags``, unless
+archived tasks still carry them.
+"""
+from sqlalchemy import MetaData, func, inspect, select, text
+
+SQLITE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS task_tag_usage_ai AFTER INSERT ON task_tag BEGIN "
+    "UPDATE tag SET usage_count = usage_count + 1 WHERE id = new.tag_id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_tag_usage_ad AFTER DELETE ON task_tag BEGIN "
+    "UPDATE tag SET usage_count = usage_count - 1 WHERE id = old.tag_id; END",
+]
+
+POSTGRES_TRIGGERS = [
+    "CREATE OR REPLACE FUNCTION task_tag_usage() RETURNS trigger AS $$ BEGIN "
+    "IF TG_OP = 'INSERT' THEN UPDATE tag SET usage_count = usage_count + 1 WHERE id = NEW.tag_id; RETURN NEW; "
+    "ELSE UPDATE tag SET usage_count = usage_count - 1 WHERE id = OLD.tag_id; RETURN OLD; END IF; "
+    "END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS task_tag_usage ON task_tag",
+    "CREATE TRIGGER task_tag_usage AFTER INSERT OR DELETE ON task_tag "
+    "FOR EACH ROW EXECUTE PROCEDURE task_tag_usage()",
+]
+
+# LIKE prefix scans on PostgreSQL: under a non-C collation the plain
+# lower(name) index cannot serve them (SQLite uses a range instead)
+POSTGRES_PREFIX_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_tag_user_lower_name_pattern ON tag (user_id, lower(name) text_pattern_ops)"
+)
+
+_counts = {"triggers": False}
+
+
+def _split_global_tags(db, Task, Tag, task_tag):
+    """One-time upgrade of the old global ``tag`` table to per-user tags.
+
+    Each user gets their own copy of every tag used on their tasks (names
+    merged case-insensitively); tags no task uses are dropped.
+    """
+    dialect = db.engine.dialect.name
+    scratch = MetaData()
+    Tag.__table__.metadata.tables["user"].to_metadata(scratch)  # FK target
+    new_table = Tag.__table__.to_metadata(scratch, name="tag_new")
+    quote = db.engine.dialect.identifier_preparer.quote
+
+    with db.engine.begin() as conn:
+        new_table.create(conn)
+
+        conn.execute(text(
+            "INSERT INTO tag_new (user_id, name, usage_count) "
+            "SELECT t.user_id, MIN(g.name), COUNT(DISTINCT tt.task_id) "
+            "FROM task_tag tt JOIN task t ON t.id = tt.task_id JOIN tag g ON g.id = tt.tag_id "
+            "GROUP BY t.user_id, lower(g.name)"
+        ))
+        links = [dict(r._mapping) for r in conn.execute(text(
+            "SELECT DISTINCT tt.task_id AS task_id, n.id AS tag_id "
+            "FROM task_tag tt JOIN task t ON t.id = tt.task_id JOIN tag g ON g.id = tt.tag_id "
+            "JOIN tag_new n ON n.user_id = t.user_id AND lower(n.name) = lower(g.name)"
+        ))]
+        conn.execute(task_tag.delete())
+
+        if dialect == "postgresql":
+            # CASCADE drops task_tag's foreign key, re-added below
+            conn.execute(text("DROP TABLE tag CASCADE"))
+            conn.execute(text("ALTER TABLE tag_new RENAME TO tag"))
+            conn.execute(text("ALTER TABLE task_tag ADD FOREIGN KEY (tag_id) REFERENCES tag (id)"))
+        else:
+            conn.execute(text("DROP TABLE tag"))
+            conn.execute(text(f"ALTER TABLE tag_new RENAME TO {quote('tag')}"))
+
+        if links:
+            conn.execute(task_tag.insert(), links)
+
+    print(f"🏷️ Migrated tags to per-user namespaces ({len(links)} task tag(s))")
+
+
+def init_tags(db, Task, Tag, task_tag):
+    """Upgrade legacy global tags if needed and install the usage-count triggers."""
+    columns = {c["name"] for c in inspect(db.engine).get_columns("tag")}
+    if "user_id" not in columns:
+        _split_global_tags(db, Task, Tag, task_tag)
+
+    dialect = db.engine.dialect.name
+    ddl = {"sqlite": SQLITE_TRIGGERS, "postgresql": POSTGRES_TRIGGERS}.get(dialect)
+    if ddl:
+        try:
+            with db.engine.begin() as conn:
+                for stmt in ddl:
+                    conn.execute(text(stmt))
+            _counts["triggers"] = True
+        except Exception as e:
+            print(f"Tag usage triggers unavailable, counts refreshed by GC: {e}")
+    if dialect == "postgresql":
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text(POSTGRES_PREFIX_INDEX))
+        except Exception as e:
+            print(f"Tag prefix index unavailable: {e}")
+    return _counts["triggers"]
+
+
+def recount_usage(db, Tag, task_tag):
+    """Recompute every usage_count from task_tag (fallback without triggers)."""
+    usage = (
+        select(func.count())
+        .select_from(task_tag)
+        .where(task_tag.c.tag_id == Tag.id)
+        .scalar_subquery()
+    )
+    db.session.execute(Tag.__table__.update().values(usage_count=usage))
+
+
+def gc_unused_tags(app, db, Tag, task_tag, archived_task_tag):
+    """Scheduler job: delete tags no task (active or archived) uses any more."""
+    with app.app_context():
+        try:
+            if not _counts["triggers"]:
+                recount_usage(db, Tag, task_tag)
+            in_use = select(task_tag.c.tag_id).where(task_tag.c.tag_id == Tag.id).exists()
+            archived = select(archived_task_tag.c.tag_id).where(archived_task_tag.c.tag_id == Tag.id).exists()
+            result = db.session.execute(
+                Tag.__table__.delete().where(Tag.usage_count <= 0, ~in_use, ~archived)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error pruning unused tags: {e}")
+            return 0
+
+        if result.rowcount:
+            print(f"🏷️ Pruned {result.rowcount} unused tag(s)")
+        return result.rowcount
+
+
+def suggest_tags_for(session, Tag, user_id, prefix, limit=50):
+    """A user's tags starting with ``prefix``, most used first.
+
+    On PostgreSQL the prefix is an escaped LIKE served by the
+    text_pattern_ops index (a range bound would depend on the collation).
+    On SQLite it is a range on ``lower(name)``, so the (user_id, lower(name))
+    index serves both the equality and the prefix scan.
+    """
+    lowered = func.lower(Tag.name)
+    query = session.query(Tag.name).filter(Tag.user_id == user_id, Tag.usage_count > 0)
+    if prefix:
+        prefix = prefix.lower()
+        if session.get_bind().dialect.name == "postgresql":
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.filter(lowered.like(escaped + "%", escape="\\"))
+        else:
+            query = query.filter(lowered >= prefix, lowered < prefix + "\uffff")
+    return [r.name for r in query.order_by(Tag.usage_count.desc(), lowered).limit(limit)]